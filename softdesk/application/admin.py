@@ -1,57 +1,89 @@
 from django.contrib import admin
+
+from common.admin import (PaginatedInlineFormSet, PaginatedInlineMixin, ScalableModelAdmin, TombstoneDeleteMixin,
+                          related_id_filter)
+from .cascade import delete_issues, delete_comments, delete_contributors, delete_projects
 from .models import Project, Issue, Comment
 from user.models import Contributor
 
 
+class TombstoneInlineFormSet(PaginatedInlineFormSet):
+    delete_rows = None
+
+    def delete_existing(self, obj, commit=True):
+        if commit:
+            self.delete_rows([obj])
+
+
+class ContributorInlineFormSet(TombstoneInlineFormSet):
+    delete_rows = staticmethod(delete_contributors)
+
+
+class CommentInlineFormSet(TombstoneInlineFormSet):
+    delete_rows = staticmethod(delete_comments)
+
+
 # ContributorInline - Gestion des contributeurs liés à un projet
-class ContributorInline(admin.TabularInline):
+class ContributorInline(PaginatedInlineMixin, admin.TabularInline):
     """
     Inline view for managing contributors within the Project admin page.
     - Enables adding contributors directly when managing a project.
+    - Shows the contributors one page at a time.
     """
     model = Contributor
     extra = 1  # Number of empty forms displayed by default
+    autocomplete_fields = ('user',)
+    formset = ContributorInlineFormSet
 
 
 # ProjectAdmin - Gestion des projets
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(TombstoneDeleteMixin, ScalableModelAdmin):
     """
     Admin interface for managing projects.
     - Displays key fields such as name, author, and created_time.
     - Includes contributors inline for better visibility.
     """
     list_display = ('name', 'author', 'type', 'created_time')  # Columns in the admin list view
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
     list_filter = ('type', 'created_time')  # Filters by project type and creation date
     search_fields = ('name', 'description', 'author__username')  # Enables search by these fields
     ordering = ('-created_time',)  # Orders projects by creation date, newest first
+    delete_rows = staticmethod(delete_projects)
 
     # Inline contributors management
     inlines = [ContributorInline]
 
 
 # CommentInline - Gestion des commentaires liés à un ticket
-class CommentInline(admin.TabularInline):
+class CommentInline(PaginatedInlineMixin, admin.TabularInline):
     """
     Inline view for managing comments within the Issue admin page.
     - Enables adding comments directly when managing an issue.
+    - Shows the comments one page at a time.
     """
     model = Comment
     extra = 1  # Number of empty forms displayed by default
+    raw_id_fields = ('author',)
+    formset = CommentInlineFormSet
 
 
 # IssueAdmin - Gestion des tickets
 @admin.register(Issue)
-class IssueAdmin(admin.ModelAdmin):
+class IssueAdmin(TombstoneDeleteMixin, ScalableModelAdmin):
     """
     Admin interface for managing issues (tickets).
     - Displays ticket name, status, priority, author, and project.
     - Provides filters for status, priority, and associated project.
     """
     list_display = ('name', 'status', 'priority', 'author', 'project')  # Columns in the admin list view
-    list_filter = ('status', 'priority', 'project')  # Filters by these fields
+    list_select_related = ('author', 'project')
+    list_filter = ('status', 'priority', related_id_filter('project', "project id"))  # Filters by these fields
     search_fields = ('name', 'description', 'author__username', 'project__name')  # Searchable fields
-    ordering = ('-created_time',)  # Orders issues by creation date, newest first
+    autocomplete_fields = ('author', 'project', 'assignee')
+    ordering = ('-id',)  # Newest first, along the primary key (same order as created_time)
+    delete_rows = staticmethod(delete_issues)
 
     # Inline comments management
     inlines = [CommentInline]
@@ -59,27 +91,35 @@ class IssueAdmin(admin.ModelAdmin):
 
 # ContributorAdmin - Gestion directe des contributeurs
 @admin.register(Contributor)
-class ContributorAdmin(admin.ModelAdmin):
+class ContributorAdmin(TombstoneDeleteMixin, ScalableModelAdmin):
     """
     Admin interface for managing contributors.
     - Displays contributors, their associated project, and their role.
     - Provides filters for role and project.
     """
     list_display = ('user', 'project', 'role')  # Columns in the admin list view
-    list_filter = ('role', 'project')  # Filters by role and project
+    list_select_related = ('user', 'project')
+    list_filter = ('role', related_id_filter('project', "project id"))  # Filters by role and project
     search_fields = ('user__username', 'project__name')  # Searchable fields
-    ordering = ('project', 'user')  # Orders contributors by project and user
+    autocomplete_fields = ('user', 'project')
+    ordering = ('project_id', 'user_id')  # Orders contributors by project and user, without joining them
+    delete_rows = staticmethod(delete_contributors)
 
 
 # CommentAdmin - Gestion directe des commentaires
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(TombstoneDeleteMixin, ScalableModelAdmin):
     """
     Admin interface for managing comments.
     - Displays comment description, author, and associated issue.
     - Provides filters for issues, authors, and creation date.
     """
     list_display = ('description', 'author', 'issue', 'created_time')  # Columns in the admin list view
-    list_filter = ('issue', 'author', 'created_time')  # Filters by issue, author, and creation date
+    list_select_related = ('author', 'issue')
+    # Filters by issue, author, and creation date
+    list_filter = (related_id_filter('issue', "issue id"), related_id_filter('author', "author id"), 'created_time')
     search_fields = ('description', 'author__username', 'issue__name')  # Searchable fields
-    ordering = ('-created_time',)  # Orders comments by creation date, newest first
+    raw_id_fields = ('issue',)
+    autocomplete_fields = ('author',)
+    ordering = ('-id',)  # Newest first, along the time-ordered primary key
+    delete_rows = staticmethod(delete_comments)
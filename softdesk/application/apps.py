@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApplicationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'application'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401  (change-feed receivers and background tasks)
+        from common import slowqueries  # noqa: F401  (execute wrapper of the new database connections)
@@ -0,0 +1,98 @@
+"""
+Archival of old DONE issues.
+
+Issues in the DONE status whose last update is older than `ARCHIVE_DONE_ISSUES_AFTER_DAYS` are moved,
+with their comments, to `ArchivedIssue` / `ArchivedComment`. Each batch is copied and removed from the
+hot tables in one transaction, so the command can be stopped and resumed at any time. The removal is recorded
+in the sync log like a deletion, so that synced clients drop the archived rows.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cascade import raw_delete
+from .models import Issue, Comment, ArchivedIssue, ArchivedComment
+from .signals import record_bulk_deletion
+
+
+def _copy(instance, model, now):
+    values = {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+    return model(archived_time=now, **values)
+
+
+def archivable_issues(days=None):
+    days = settings.ARCHIVE_DONE_ISSUES_AFTER_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Issue.objects.filter(status='DONE', updated_time__lt=cutoff)
+
+
+def archive_batch(days=None, batch_size=500):
+    """
+    Archive up to `batch_size` issues with their comments. Returns (issues, comments) archived.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        issues = list(archivable_issues(days).order_by('id')[:batch_size])
+        if not issues:
+            return 0, 0
+        issue_ids = [issue.pk for issue in issues]
+        comments = list(Comment.objects.filter(issue_id__in=issue_ids))
+
+        ArchivedIssue.objects.bulk_create([_copy(issue, ArchivedIssue, now) for issue in issues])
+        ArchivedComment.objects.bulk_create([_copy(comment, ArchivedComment, now) for comment in comments],
+                                            batch_size=batch_size)
+        if comments:
+            raw_delete(Comment, [comment.pk for comment in comments])
+        raw_delete(Issue, issue_ids)
+        projects = {issue.pk: issue.project_id for issue in issues}
+        record_bulk_deletion('comment', [
+            (projects[comment.issue_id], comment.pk, {'issue': comment.issue_id}) for comment in comments
+        ])
+        record_bulk_deletion('issue', [(issue.project_id, issue.pk, {}) for issue in issues])
+    return len(issues), len(comments)
+
+
+class QuerySetChain:
+    """
+    Read-only concatenation of querysets, countable and sliceable, so that Django's paginator
+    can page through the hot issues first, then the archived ones.
+    """
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self._counts = None
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = [queryset.count() for queryset in self.querysets]
+        return self._counts
+
+    def count(self):
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        for queryset in self.querysets:
+            yield from queryset
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        items = []
+        offset = 0
+        for queryset, count in zip(self.querysets, self.counts()):
+            if stop is not None and stop <= offset:
+                break
+            if start < offset + count:
+                items += queryset[max(start - offset, 0):None if stop is None else min(stop - offset, count)]
+            offset += count
+        return items
+
+
+def wants_archived(request):
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,208 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework.exceptions import (APIException, AuthenticationFailed, MethodNotAllowed, NotAuthenticated,
+                                       PermissionDenied, Throttled)
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from common import visibility
+from common.authentication import AsyncJWTAuthentication
+from common.permissions import IsProjectContributorOrAdmin
+from common.throttling import BucketThrottle
+from .feed import get_broker, project_channel
+from .models import Project, Issue, Comment
+from .serializers import (ProjectDetailSerializer, ProjectListSerializer, IssueListSerializer, IssueDetailSerializer,
+                          CommentSerializer)
+
+
+class AsyncAPIView(View):
+    """
+    Base class for the ASGI-native read endpoints.
+    - Authenticates the JWT, checks permissions with the async ORM and applies the `common.throttling` budgets.
+    - Converts DRF exceptions to JSON responses, like the synchronous viewsets.
+    Querysets must load every relation used by the serializer (`select_related`),
+    because lazy loading is not allowed in an async context.
+    """
+    authentication = AsyncJWTAuthentication()
+    permission_classes = []
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True  # JWT only, no session cookie involved
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            authenticated = await self.authentication.aauthenticate(request)
+            if authenticated is None:
+                raise NotAuthenticated()
+            request.user = authenticated[0]
+            for permission in self.permission_classes:
+                await permission().ahas_permission(request, self)
+            # Same budgets as the DRF views (`read` for these GET endpoints, one token per opened feed)
+            throttle = BucketThrottle()
+            if not await throttle.aallow_request(request, self):
+                raise Throttled(throttle.wait())
+            # Like DRF: authentication comes first, an anonymous request gets a 401 whatever the method
+            handler = getattr(self, request.method.lower(), None)
+            if handler is None:
+                raise MethodNotAllowed(request.method)
+            return await handler(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(request, exc)
+        except Http404:
+            return JsonResponse({'detail': "No object matches the given query."}, status=404)
+
+    def handle_exception(self, request, exc):
+        """
+        Render an API exception like DRF's `exception_handler`: list and dict details as they are, others under
+        `detail`, with the `WWW-Authenticate` header of 401 responses, the `Allow` header of 405 responses and the
+        `Retry-After` header of 429 responses.
+        """
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            response['WWW-Authenticate'] = self.authentication.authenticate_header(request)
+        if isinstance(exc, MethodNotAllowed):
+            response['Allow'] = ', '.join(self._allowed_methods())
+        if getattr(exc, 'wait', None):
+            response['Retry-After'] = '%d' % exc.wait
+        return response
+
+
+async def _paginate(request, queryset):
+    """
+    Same response shape as the `PageNumberPagination` configured in `REST_FRAMEWORK`.
+    """
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        raise Http404
+    count = await queryset.acount()
+    offset = (page - 1) * page_size
+    if offset and offset >= count:
+        raise Http404
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+    results = [obj async for obj in queryset[offset:offset + page_size]]
+    return count, next_url, previous_url, results
+
+
+class AsyncProjectView(AsyncAPIView):
+    """
+    Async variant of `ProjectViewSet.list` and `ProjectViewSet.retrieve`, with the same `common.visibility` rules.
+    """
+
+    async def get(self, request, pk=None):
+        queryset = visibility.projects(request.user).select_related('author')
+        if pk is None:
+            projects = [project async for project in queryset]
+            if not projects and not request.user.is_staff:
+                raise PermissionDenied("Vous n'êtes pas associé à un projet.")
+            return JsonResponse(ProjectListSerializer(projects, many=True).data, safe=False)
+        try:
+            project = await queryset.aget(pk=pk)
+        except Project.DoesNotExist:
+            await sync_to_async(visibility.explain_project_denial)(request.user, pk)
+            raise Http404
+        return JsonResponse(ProjectDetailSerializer(project).data)
+
+
+class AsyncIssueView(AsyncAPIView):
+    """
+    Async variant of `IssueViewSet.list` and `IssueViewSet.retrieve`, with the same `common.visibility` rules.
+    """
+
+    async def get(self, request, project_pk, pk=None):
+        queryset = visibility.issues(request.user, project_pk).select_related('author', 'assignee__user')
+
+        if pk is None:
+            count, next_url, previous_url, issues = await _paginate(request, queryset.order_by('id'))
+            if not issues:
+                # Nothing visible: a missing project or membership, or a project without issues
+                await sync_to_async(visibility.explain_denial)(request.user, project_pk)
+            return JsonResponse({
+                'count': count,
+                'next': next_url,
+                'previous': previous_url,
+                'results': IssueListSerializer(issues, many=True).data,
+            })
+        try:
+            issue = await queryset.aget(pk=pk)
+        except Issue.DoesNotExist:
+            await sync_to_async(visibility.explain_denial)(request.user, project_pk)
+            raise PermissionDenied("Cette issue n'existe pas dans ce projet.")
+        return JsonResponse(IssueDetailSerializer(issue).data)
+
+
+class AsyncCommentView(AsyncAPIView):
+    """
+    Async variant of `CommentViewSet.list` and `CommentViewSet.retrieve`, with the same `common.visibility` rules.
+    """
+
+    async def get(self, request, project_pk, issue_pk, pk=None):
+        queryset = visibility.comments(request.user, project_pk, issue_pk).select_related('author')
+
+        if pk is None:
+            comments = [comment async for comment in queryset.order_by('created_time')]
+            if not comments:
+                # Nothing visible: a missing project, issue or membership, or an issue without comments
+                await sync_to_async(visibility.explain_denial)(request.user, project_pk, issue_pk)
+            return JsonResponse(CommentSerializer(comments, many=True).data, safe=False)
+        try:
+            comment = await queryset.aget(pk=pk)
+        except Comment.DoesNotExist:
+            await sync_to_async(visibility.explain_denial)(request.user, project_pk, issue_pk)
+            raise Http404
+        return JsonResponse(CommentSerializer(comment).data)
+
+
+class ProjectFeedView(AsyncAPIView):
+    """
+    Server-Sent Events stream of the issue, comment and contributor changes of a project.
+    - Access is checked once, when the connection is opened.
+    - Idle connections receive a keep-alive comment every `CHANGE_FEED_HEARTBEAT` seconds.
+    - If the client is too slow and its queue overflows, an `overflow` event is sent and the stream ends:
+      the client must reload the lists before reconnecting.
+    """
+    permission_classes = [IsProjectContributorOrAdmin]
+
+    async def get(self, request, project_pk):
+        if not await Project.objects.filter(pk=project_pk).aexists():
+            raise PermissionDenied("Le projet spécifié n'existe pas.")
+
+        response = StreamingHttpResponse(self.stream(project_pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+        return response
+
+    async def stream(self, project_pk):
+        heartbeat = settings.CHANGE_FEED_HEARTBEAT
+        async with get_broker().subscribe(project_channel(project_pk)) as subscription:
+            yield ': connected\n\n'
+            while True:
+                if subscription.overflowed:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+                try:
+                    event = await subscription.get(timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                data = json.dumps(event, cls=DjangoJSONEncoder)
+                yield f"id: {event['seq']}\nevent: {event['type']}.{event['action']}\ndata: {data}\n\n"
@@ -0,0 +1,218 @@
+"""
+Cascade-delete engine for projects and users.
+
+Django's collector loads every related object in memory and deletes the whole tree in one transaction.
+Here the children (hot and archived) are removed from the leaves up, by chunks of `JOBS_BATCH_SIZE` rows:
+- each chunk only holds the ids of its rows and is deleted with a raw `DELETE ... WHERE id IN (...)`,
+- each chunk is committed on its own, so the write lock is released between chunks,
+- tombstones and change-feed events are recorded for each deleted row, in bulk,
+- the cached bootstrap payload of the users whose membership is deleted is dropped once committed.
+The root row (project or user) is deleted last with the ORM, once it has no children left. The API runs these
+deletions in background jobs; the admin runs them in the request (`delete_projects`, `delete_users`).
+
+The API and the admin delete issues, comments and contributors with `delete_issues`, `delete_comments` and
+`delete_contributors`: Django's collector deletes the rows and their cascade, and the tombstones of every
+deleted row are written in bulk afterwards. These models have no `post_delete` receivers, which would load and
+signal the cascaded rows one by one: the comments of a deleted issue are fast-deleted with a single statement.
+"""
+from django.conf import settings
+from django.db import connection, router, transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector
+
+from user.bootstrap import invalidate
+from user.models import User, Contributor
+from .models import Project, Issue, Comment, ArchivedIssue, ArchivedComment
+from .signals import record_bulk_deletion
+
+
+class Step:
+    """
+    Rows of one model to delete.
+    `columns` are read with each id to build the tombstones: the project id first, then extra fields
+    of the change-feed event (e.g. the issue of a comment).
+    """
+
+    def __init__(self, kind, queryset, project, **extra):
+        self.kind = kind
+        self.queryset = queryset.order_by()
+        self.project = project
+        self.extra = extra
+
+    def next_chunk(self, size):
+        columns = ['pk', self.project, *self.extra.values()]
+        return list(self.queryset.values_list(*columns)[:size])
+
+
+def raw_delete(model, ids):
+    """
+    Delete rows by primary key with a single SQL statement, bypassing the collector and the signals.
+    """
+    pk = model._meta.pk
+    values = [pk.get_db_prep_value(value, connection) for value in ids]
+    placeholders = ', '.join(['%s'] * len(values))
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(pk.column)} IN ({placeholders})',
+                       values)
+        return cursor.rowcount
+
+
+def forget_members(user_ids):
+    """
+    Drop the cached bootstrap payload of users whose membership is deleted, once the deletion is committed.
+    """
+    if user_ids:
+        transaction.on_commit(lambda: invalidate(*user_ids))
+
+
+def run_step(step, progress=None, batch_size=None):
+    """
+    Delete every row of a step, chunk by chunk.
+    `progress(kind, count)` is called after each commit with the number of rows of the chunk.
+    """
+    batch_size = batch_size or settings.JOBS_BATCH_SIZE
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = step.next_chunk(batch_size)
+            if not rows:
+                return deleted
+            raw_delete(step.queryset.model, [row[0] for row in rows])
+            record_bulk_deletion(step.kind, [
+                (row[1], row[0], dict(zip(step.extra, row[2:]))) for row in rows
+            ])
+            if step.kind == 'contributor':
+                forget_members({row[2] for row in rows})
+        deleted += len(rows)
+        if progress:
+            progress(step.kind, len(rows))
+
+
+def project_steps(project_id):
+    return [
+        Step('comment', Comment.objects.filter(issue__project_id=project_id), 'issue__project_id', issue='issue_id'),
+        Step('issue', Issue.objects.filter(project_id=project_id), 'project_id'),
+        Step('comment', ArchivedComment.objects.filter(issue__project_id=project_id), 'issue__project_id',
+             issue='issue_id'),
+        Step('issue', ArchivedIssue.objects.filter(project_id=project_id), 'project_id'),
+        Step('contributor', Contributor.objects.filter(project_id=project_id), 'project_id', user='user_id'),
+    ]
+
+
+def user_steps(user_id):
+    issues = Issue.objects.filter(Q(author_id=user_id) | Q(assignee__user_id=user_id))
+    archived_issues = ArchivedIssue.objects.filter(Q(author_id=user_id) | Q(assignee__user_id=user_id))
+    return [
+        Step('comment', Comment.objects.filter(issue__in=issues.values('id')), 'issue__project_id',
+             issue='issue_id'),
+        Step('issue', issues, 'project_id'),
+        Step('comment', Comment.objects.filter(author_id=user_id), 'issue__project_id', issue='issue_id'),
+        Step('comment', ArchivedComment.objects.filter(issue__in=archived_issues.values('id')), 'issue__project_id',
+             issue='issue_id'),
+        Step('issue', archived_issues, 'project_id'),
+        Step('comment', ArchivedComment.objects.filter(author_id=user_id), 'issue__project_id', issue='issue_id'),
+        Step('contributor', Contributor.objects.filter(user_id=user_id), 'project_id', user='user_id'),
+    ]
+
+
+def delete_project(project_id, progress=None, batch_size=None):
+    """
+    Delete a project and its issues, comments and contributors by chunks.
+    """
+    for step in project_steps(project_id):
+        run_step(step, progress, batch_size)
+    Project.objects.filter(pk=project_id).delete()
+
+
+def delete_user(user_id, progress=None, batch_size=None):
+    """
+    Delete a user, the projects they authored, the issues they authored or are assigned to
+    (with their comments), their comments and contributions, by chunks.
+    """
+    for project_id in Project.objects.filter(author_id=user_id).values_list('id', flat=True):
+        delete_project(project_id, progress, batch_size)
+    for step in user_steps(user_id):
+        run_step(step, progress, batch_size)
+    User.objects.filter(pk=user_id).delete()
+
+
+def delete_projects(projects):
+    """
+    Delete projects one after the other with `delete_project` (the admin deletes).
+    """
+    for project in projects:
+        delete_project(project.pk)
+
+
+def delete_users(users):
+    """
+    Delete users one after the other with `delete_user` (the admin deletes).
+    """
+    for user in users:
+        delete_user(user.pk)
+
+
+def _delete(instances, issue_projects=None):
+    """
+    Delete `instances` (of one model) and their cascade like `Model.delete()`, then record the tombstones of the
+    deleted issues, comments and contributors in bulk: a constant number of queries, whatever the cascade.
+    `issue_projects` maps issue ids to project ids, for the comments deleted without their issue.
+    """
+    collector = Collector(using=router.db_for_write(type(instances[0])))
+    with transaction.atomic():
+        collector.collect(instances)
+        collected = collector.data.get(Issue, ())
+        issues = {issue.pk: issue.project_id for issue in collected if 'project_id' not in issue.get_deferred_fields()}
+        deferred = [issue.pk for issue in collected if issue.pk not in issues]
+        if deferred:
+            # Cascaded issues are loaded by the collector with their primary key only
+            issues.update(Issue.objects.filter(pk__in=deferred).values_list('pk', 'project_id'))
+        projects = {**(issue_projects or {}), **issues}
+        comments = {comment.pk: comment.issue_id for comment in collector.data.get(Comment, ())}
+        if issues:
+            # The comments of the deleted issues are fast-deleted, without being loaded: only read their ids
+            comments.update(Comment.objects.filter(issue_id__in=issues).values_list('pk', 'issue_id'))
+        contributors = [(contributor.project_id, contributor.pk, {'user': contributor.user_id})
+                        for contributor in collector.data.get(Contributor, ())]
+        collector.delete()
+        record_bulk_deletion('comment', [
+            (projects[issue_id], comment_id, {'issue': issue_id}) for comment_id, issue_id in comments.items()
+        ])
+        record_bulk_deletion('issue', [(project_id, issue_id, {}) for issue_id, project_id in issues.items()])
+        record_bulk_deletion('contributor', contributors)
+        forget_members({extra['user'] for _, _, extra in contributors})
+
+
+def delete_comments(comments):
+    """
+    Delete comments and record their tombstones.
+    The project of each comment is read from its issue when loaded, otherwise in one query for all of them.
+    """
+    comments = list(comments)
+    if not comments:
+        return
+    projects = {comment.issue_id: comment.issue.project_id for comment in comments
+                if 'issue' in comment._state.fields_cache}
+    missing = {comment.issue_id for comment in comments} - projects.keys()
+    if missing:
+        projects.update(Issue.objects.filter(pk__in=missing).values_list('pk', 'project_id'))
+    _delete(comments, projects)
+
+
+def delete_issues(issues):
+    """
+    Delete issues with their comments, and record the tombstones of both.
+    """
+    issues = list(issues)
+    if issues:
+        _delete(issues)
+
+
+def delete_contributors(contributors):
+    """
+    Delete contributors with the issues assigned to them (and their comments), and record the tombstones.
+    """
+    contributors = list(contributors)
+    if contributors:
+        _delete(contributors)
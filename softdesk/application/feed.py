@@ -0,0 +1,106 @@
+"""
+Change feed: model signals publish events into a broker, SSE connections subscribe to it.
+
+The broker is selected with the `CHANGE_FEED_BROKER` setting. `InMemoryBroker` only delivers events
+inside the current process; a multi-process deployment needs a broker backed by a shared service
+implementing the same two methods.
+"""
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Broker:
+    """
+    Interface of a change-feed broker.
+    - `publish` is called from synchronous code (signal handlers), from any thread.
+    - `subscribe` is an async context manager yielding a `Subscription` for one channel.
+    """
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+
+class Subscription:
+    """
+    Bounded queue of events for one connection.
+    When a slow client lets the queue fill up, the subscription is marked as overflowed
+    and the connection is closed, so the client knows it has to resynchronize.
+    """
+
+    def __init__(self, loop, max_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_size)
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class _SubscriptionContext:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.subscription = None
+
+    async def __aenter__(self):
+        self.subscription = Subscription(asyncio.get_running_loop(), self.broker.max_queue_size)
+        with self.broker.lock:
+            self.broker.subscribers.setdefault(self.channel, set()).add(self.subscription)
+        return self.subscription
+
+    async def __aexit__(self, *exc_info):
+        with self.broker.lock:
+            subscribers = self.broker.subscribers.get(self.channel, set())
+            subscribers.discard(self.subscription)
+            if not subscribers:
+                self.broker.subscribers.pop(self.channel, None)
+
+
+class InMemoryBroker(Broker):
+    """
+    In-process pub/sub: one bounded queue per connection, fed through the connection's event loop.
+    """
+    max_queue_size = 1000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.sequence = itertools.count(1)
+
+    def publish(self, channel, event):
+        event = dict(event, seq=next(self.sequence))
+        with self.lock:
+            subscriptions = list(self.subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            if not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+
+    def subscribe(self, channel):
+        return _SubscriptionContext(self, channel)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.CHANGE_FEED_BROKER)()
+    return _broker
+
+
+def project_channel(project_id):
+    return f'project:{project_id}'
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from application.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = ("Move the DONE issues not updated for ARCHIVE_DONE_ISSUES_AFTER_DAYS days, with their comments, "
+            "to the archive tables.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Age threshold (default: ARCHIVE_DONE_ISSUES_AFTER_DAYS).")
+        parser.add_argument('--batch-size', type=int, help="Issues per transaction (default: JOBS_BATCH_SIZE).")
+        parser.add_argument('--max-batches', type=int, help="Stop after this number of batches.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or settings.JOBS_BATCH_SIZE
+        total_issues = total_comments = batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            issues, comments = archive_batch(options['days'], batch_size)
+            if not issues:
+                break
+            batches += 1
+            total_issues += issues
+            total_comments += comments
+            self.stdout.write(f"{total_issues} issues and {total_comments} comments archived")
+        self.stdout.write(self.style.SUCCESS(f"{total_issues} issues and {total_comments} comments archived."))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import endpoints, runner, seed
+from benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway database and measure latency, throughput and query counts of every API route."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(seed.SCALES), default='small')
+        parser.add_argument('--seed', type=int, default=42, help="Random seed of the synthetic dataset.")
+        parser.add_argument('--transport', choices=['client', 'live'], default='client',
+                            help="Django test client (with query counts) or a local HTTP server.")
+        parser.add_argument('--concurrency', type=int, default=1, help="Concurrent requests (live transport).")
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help="Only run endpoints whose name starts with this value (repeatable).")
+        parser.add_argument('--db-path', help="Keep the seeded SQLite database at this path and reuse it.")
+        parser.add_argument('--output',
+                            help="Results file (default: benchmarks/results/<scale>-<transport>-<rev>.json).")
+        parser.add_argument('--compare', help="Previous results file to compare against.")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed p95 slowdown ratio before reporting a regression.")
+
+    def handle(self, *args, **options):
+        with test_database(options['db_path']):
+            if not seed.is_seeded():
+                self.stdout.write(f"Seeding the '{options['scale']}' dataset...")
+                seed.seed(options['scale'], options['seed'], stdout=self.stdout)
+            context = seed.build_context()
+
+            if options['transport'] == 'live':
+                transport = runner.LiveServerTransport(options['concurrency'])
+            else:
+                transport = runner.ClientTransport()
+            try:
+                results = runner.run(endpoints.select(options['endpoints']), context, transport,
+                                     iterations=options['iterations'], warmup=options['warmup'], stdout=self.stdout)
+            finally:
+                transport.close()
+
+        path = runner.save(results, options['scale'], transport, options['iterations'], options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
+
+        if options['compare']:
+            regressions = runner.compare(results, options['compare'], options['threshold'])
+            for name, message in regressions:
+                self.stdout.write(self.style.ERROR(f"{name}: {message}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} performance regression(s) detected.")
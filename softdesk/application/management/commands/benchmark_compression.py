@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import compression, seed
+from benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = "Measure the compression ratio and CPU time of each response codec on the API payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(seed.SCALES), default='small')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with test_database():
+            seed.seed(options['scale'])
+            rows = compression.run(seed.build_context(), options['iterations'])
+        for payload, encoding, level, raw, compressed, micros in rows:
+            self.stdout.write(f"{payload:<15} {encoding:<5} {level:>2}  {raw:>9} B -> {compressed:>8} B "
+                              f"({raw / compressed:>5.1f}x)  {micros:>9.1f} µs  {raw / micros:>7.1f} MB/s")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import concurrency, runner, seed
+from benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = "Compare the WSGI viewsets with the ASGI-native async read endpoints under concurrent clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(seed.SCALES), default='small')
+        parser.add_argument('--clients', type=int, action='append',
+                            help="Number of concurrent virtual clients (repeatable, default: 1, 8, 32).")
+        parser.add_argument('--requests', type=int, default=30, help="Requests sent by each virtual client.")
+        parser.add_argument('--db-path', help="Keep the seeded SQLite database at this path and reuse it.")
+
+    def handle(self, *args, **options):
+        with test_database(options['db_path']):
+            if not seed.is_seeded():
+                seed.seed(options['scale'])
+            context = seed.build_context()
+
+            for clients in options['clients'] or [1, 8, 32]:
+                for name, run in (('wsgi', concurrency.run_wsgi), ('asgi', concurrency.run_asgi)):
+                    summary = run(context, clients, options['requests'])
+                    self.stdout.write(f"{runner.format_line(f'{name} x{clients}', summary)} "
+                                      f"peak_threads={summary['peak_threads']}")
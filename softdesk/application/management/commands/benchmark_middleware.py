@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import middleware
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the full and path-aware middleware chains."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        results = middleware.run(options['iterations'])
+        for (stack, request_path), micros in results.items():
+            overhead = micros - results['none', request_path]
+            self.stdout.write(f"{stack:<11} {request_path:<12} {micros:>7.1f} µs/request  "
+                              f"(middleware: {overhead:>5.1f} µs)")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import startup
+
+
+class Command(BaseCommand):
+    help = "Measure the import time and the first request of a fresh worker, for each deployment mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help="Cold starts per mode (the median is reported).")
+        parser.add_argument('--mode', choices=startup.MODES, action='append', help="Mode to measure (repeatable).")
+
+    def handle(self, *args, **options):
+        results = startup.run(options['repeat'], options['mode'] or startup.MODES)
+        for mode, summary in results.items():
+            self.stdout.write(f"{mode:<6} boot={summary['boot_ms']:>7.1f}ms "
+                              f"first_request={summary['first_request_ms']:>7.1f}ms "
+                              f"modules={summary['modules']} docs_loaded={summary['docs_loaded']} "
+                              f"admin_loaded={summary['admin_loaded']}")
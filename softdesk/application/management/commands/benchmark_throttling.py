@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import throttling
+
+
+class Command(BaseCommand):
+    help = "Measure the cost of one throttle check with each store, against DRF's sliding-log throttle."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        for name, micros in throttling.run(options['iterations']).items():
+            self.stdout.write(f"{name:<18} {micros:>8.2f} µs/check")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import uuidkeys
+from benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = "Compare insert throughput and primary-key index size of Comment with UUIDv4 and UUIDv7 keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--db-path', help="Run on a SQLite file at this path instead of an in-memory database.")
+
+    def handle(self, *args, **options):
+        with test_database(options['db_path']):
+            results = uuidkeys.run(options['rows'], options['batch_size'])
+        for kind, summary in results.items():
+            size, unused = summary['index_bytes'], summary['index_unused_ratio']
+            self.stdout.write(f"{kind}: {summary['rows_per_second']:>10.1f} rows/s  "
+                              f"index={'-' if size is None else f'{size / 1024:.0f} KiB'}  "
+                              f"unused={'-' if unused is None else unused}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from softdesk import schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema into OPENAPI_SCHEMA_PATH (run it at build time, after each API change)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Write the schema to this path instead of OPENAPI_SCHEMA_PATH.")
+
+    def handle(self, *args, **options):
+        path, artifact = schema.write(options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Schema written to {path} (ETag {artifact.etag})."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from application import cascade
+from application.models import Project
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = "Delete a project or a user and everything depending on it, by committed chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', choices=['project', 'user'])
+        parser.add_argument('id', type=int)
+        parser.add_argument('--batch-size', type=int, help="Rows per chunk (default: JOBS_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        model = Project if options['target'] == 'project' else User
+        if not model.objects.filter(pk=options['id']).exists():
+            raise CommandError(f"{model.__name__} {options['id']} does not exist.")
+
+        totals = {}
+
+        def progress(kind, count):
+            totals[kind] = totals.get(kind, 0) + count
+            self.stdout.write(f"{kind}: {totals[kind]} deleted")
+
+        delete = cascade.delete_project if options['target'] == 'project' else cascade.delete_user
+        delete(options['id'], progress=progress, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{model.__name__} {options['id']} deleted."))
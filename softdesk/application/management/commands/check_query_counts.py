@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import querycount, seed
+from benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = "Fail if a viewset action runs more SQL queries than recorded in benchmarks/query_baseline.json."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--update', action='store_true',
+                            help="Record the current query counts as the new baseline.")
+
+    def handle(self, *args, **options):
+        with test_database():
+            seed.seed(querycount.GUARD_SCALE)
+            captured = querycount.capture(seed.build_context())
+
+        if options['update']:
+            querycount.write_baseline(captured)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {querycount.BASELINE_PATH}"))
+            return
+
+        failures = querycount.check(captured, querycount.load_baseline())
+        for failure in failures:
+            self.stdout.write(self.style.ERROR(failure))
+        if failures:
+            raise CommandError(f"{len(failures)} viewset action(s) exceed their query budget.")
+        self.stdout.write(self.style.SUCCESS(f"{len(captured)} viewset actions within their query budget."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from application.models import Project, SyncLog
+
+
+class Command(BaseCommand):
+    help = "Remove sync log entries superseded by a newer change of the same object, and entries of deleted projects."
+
+    def handle(self, *args, **options):
+        latest = (SyncLog.objects.values('project', 'model', 'object_id')
+                  .annotate(last=Max('id')).values('last'))
+        superseded, _ = SyncLog.objects.exclude(id__in=latest).delete()
+        orphans, _ = SyncLog.objects.exclude(project_id__in=Project.objects.values('id')).delete()
+        self.stdout.write(self.style.SUCCESS(f"{superseded} superseded and {orphans} orphan entries removed."))
@@ -0,0 +1,53 @@
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common import profiling
+
+
+class Command(BaseCommand):
+    help = "Aggregate the request profiles of PROFILING_DIR per view action: hottest frames and merged flame graphs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help="Profile directory (default: PROFILING_DIR).")
+        parser.add_argument('--view', action='append', default=[],
+                            help="Only these actions, or action prefixes (e.g. IssueViewSet.partial_update).")
+        parser.add_argument('--top', type=int, default=10, help="Frames listed per action.")
+        parser.add_argument('--output-dir', default=None,
+                            help="Write one merged folded-stack file per action, for flamegraph.pl or speedscope.")
+
+    def handle(self, *args, **options):
+        profiles = defaultdict(Counter)
+        counts = Counter()
+        for root, stacks in profiling.read_profiles(options['dir']):
+            if options['view'] and not root.startswith(tuple(options['view'])):
+                continue
+            profiles[root].update(stacks)
+            counts[root] += 1
+        if not profiles:
+            raise CommandError(f"No profile in {options['dir'] or settings.PROFILING_DIR}.")
+
+        output_dir = Path(options['output_dir']) if options['output_dir'] else None
+        if output_dir:
+            output_dir.mkdir(parents=True, exist_ok=True)
+        interval_ms = settings.PROFILING_INTERVAL * 1000
+        for root, stacks in sorted(profiles.items(), key=lambda item: -item[1].total()):
+            samples = stacks.total()
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{root}: {counts[root]} profiles, {samples} samples (~{samples * interval_ms / counts[root]:.0f} ms "
+                f"per request)"))
+            own, inclusive = Counter(), Counter()
+            for stack, count in stacks.items():
+                frames = stack.split(';')
+                own[frames[-1]] += count
+                inclusive.update(dict.fromkeys(filter(profiling.is_project_frame, frames), count))
+            for title, frames in (("self", own), ("project code, total", inclusive)):
+                self.stdout.write(f"  {title}:")
+                for frame, count in frames.most_common(options['top']):
+                    self.stdout.write(f"    {100 * count / samples:5.1f}%  {frame}")
+            if output_dir:
+                path = output_dir / f"{root}{profiling.SUFFIX}"
+                path.write_text(''.join(f"{root};{stack} {count}\n" for stack, count in sorted(stacks.items())))
+                self.stdout.write(f"  flame graph input: {path}")
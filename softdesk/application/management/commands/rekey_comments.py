@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from application.models import Comment, SyncLog
+from application.signals import record_bulk_deletion
+from common.uuid7 import uuid7_from
+
+
+class Command(BaseCommand):
+    help = ("Give the comments created with random (version 4) UUIDs a time-ordered UUIDv7 derived from their "
+            "creation time, by committed batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rekeyed = 0
+        last = None
+        while True:
+            rows = Comment.objects.order_by('id')
+            if last is not None:
+                rows = rows.filter(id__gt=last)
+            rows = list(rows.values_list('id', 'created_time', 'issue_id', 'issue__project_id')
+                        [:options['batch_size']])
+            if not rows:
+                break
+            last = rows[-1][0]
+            legacy = [row for row in rows if row[0].version != 7]
+            if legacy:
+                self.rekey(legacy)
+                rekeyed += len(legacy)
+                self.stdout.write(f"{rekeyed} comments rekeyed")
+        self.stdout.write(self.style.SUCCESS(f"{rekeyed} comments rekeyed."))
+
+    @staticmethod
+    @transaction.atomic
+    def rekey(rows):
+        """
+        Rekey a batch. Sync clients see the old ID deleted and the new one created.
+        """
+        for old_id, created_time, _, _ in rows:
+            Comment.objects.filter(pk=old_id).update(id=uuid7_from(created_time, old_id))
+        record_bulk_deletion('comment', [(project_id, old_id, {'issue': issue_id})
+                                         for old_id, _, issue_id, project_id in rows])
+        SyncLog.objects.bulk_create([
+            SyncLog(project_id=project_id, model='comment', object_id=str(uuid7_from(created_time, old_id)),
+                    action='UPSERT')
+            for old_id, created_time, _, project_id in rows
+        ])
@@ -1,5 +1,6 @@
 from django.db import models
-import uuid
+from django.utils import timezone
+from common.uuid7 import uuid7
 
 
 class Project(models.Model):
@@ -54,21 +55,108 @@ class Issue(models.Model):
     assignee = models.ForeignKey('user.Contributor', on_delete=models.CASCADE,
                                  related_name='assignee_issues')
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    archived = False
 
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            # Used by the archival of old DONE issues
+            models.Index(fields=['status', 'updated_time'], name='issue_status_updated_idx'),
+            # Issues assigned to a user, by status and date (GET /api/me/issues/)
+            models.Index(fields=['assignee', 'status', 'created_time'], name='issue_assignee_status_idx'),
+        ]
+
 
 class Comment(models.Model):
+    # Time-ordered: inserts append to the primary-key index, and ordering by id follows created_time
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False
     )
     description = models.CharField(max_length=400, null=False)
     author = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name='comments', null=False)
     issue = models.ForeignKey('Issue', on_delete=models.CASCADE, related_name='comments', null=False)
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.description
+
+
+class ArchivedIssue(models.Model):
+    """
+    DONE issue moved out of `Issue` by the `archive_issues` command. Same columns and ids, read-only.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    description = models.CharField(max_length=400, null=True, blank=True)
+    priority = models.CharField(max_length=10, choices=Issue.ISSUE_PRIORITY_CHOICES)
+    tag = models.CharField(max_length=10, choices=Issue.ISSUE_TAG_CHOICES)
+    status = models.CharField(max_length=11, choices=Issue.ISSUE_STATUS_CHOICES)
+    author = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name='archived_issues')
+    project = models.ForeignKey('application.Project', on_delete=models.CASCADE, related_name='archived_issues')
+    assignee = models.ForeignKey('user.Contributor', on_delete=models.CASCADE,
+                                 related_name='archived_assignee_issues')
+    created_time = models.DateTimeField()
+    updated_time = models.DateTimeField()
+    archived_time = models.DateTimeField(default=timezone.now)
+
+    archived = True
+
+    def __str__(self):
+        return self.name
+
+
+class ArchivedComment(models.Model):
+    """
+    Comment of an archived issue.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    description = models.CharField(max_length=400)
+    author = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name='archived_comments')
+    issue = models.ForeignKey('ArchivedIssue', on_delete=models.CASCADE, related_name='comments')
+    created_time = models.DateTimeField()
+    updated_time = models.DateTimeField()
+    archived_time = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.description
+
+
+class SyncLog(models.Model):
+    """
+    Append-only log of the changes made in a project, read by the delta sync endpoint.
+    - The auto-incremented id is the sync token handed to clients.
+    - Deleted objects are kept as tombstones (`action='DELETE'`).
+    - No database constraint on `project`: tombstones are written while a project is being deleted,
+      orphan rows are removed by the `compact_sync_log` command.
+    """
+
+    MODEL_CHOICES = [
+        ('issue', 'Issue'),
+        ('comment', 'Comment'),
+        ('contributor', 'Contributor'),
+    ]
+
+    ACTION_CHOICES = [
+        ('UPSERT', 'Created or updated'),
+        ('DELETE', 'Deleted'),
+    ]
+
+    project = models.ForeignKey('application.Project', on_delete=models.DO_NOTHING, db_constraint=False,
+                                related_name='+')
+    model = models.CharField(max_length=11, choices=MODEL_CHOICES)
+    object_id = models.CharField(max_length=36)
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    changed_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['project', 'id'], name='synclog_project_id_idx')]
+
+    def __str__(self):
+        return f"{self.action} {self.model} {self.object_id}"
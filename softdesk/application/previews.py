@@ -0,0 +1,56 @@
+"""
+Comment previews of the issue list (`?include=latest_comments:N`).
+
+The newest N comments of every issue of the page are read in one query, whatever the number of issues: the comments
+of these issues are ranked per issue by a window function, `ROW_NUMBER() OVER (PARTITION BY issue_id ORDER BY
+created_time DESC, id DESC)`, and only the first N ranks are kept. The archived issues of a page
+(`?include_archived=true`) get theirs from the archive, in a second query.
+"""
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework.exceptions import ValidationError
+
+from .models import Comment, ArchivedComment
+from .serializers import CommentSerializer
+
+INCLUDE_PATTERN = re.compile(r'^latest_comments:(\d+)$')
+
+
+def requested_count(request):
+    """
+    N of `?include=latest_comments:N`, or None without the parameter.
+    """
+    value = request.query_params.get('include')
+    if value is None:
+        return None
+    match = INCLUDE_PATTERN.match(value)
+    if not match or not 1 <= int(match.group(1)) <= settings.LATEST_COMMENTS_MAX:
+        raise ValidationError(
+            {'include': f"Expected latest_comments:N, with N from 1 to {settings.LATEST_COMMENTS_MAX}."})
+    return int(match.group(1))
+
+
+def latest_comments(issues, count):
+    """
+    Return {(archived, issue id): [serialized comments, newest first]} for the `count` newest comments of each issue.
+    """
+    previews = defaultdict(list)
+    for model, archived in ((Comment, False), (ArchivedComment, True)):
+        issue_ids = [issue.pk for issue in issues if issue.archived is archived]
+        if not issue_ids:
+            continue
+        rank = Window(RowNumber(), partition_by=F('issue_id'), order_by=[F('created_time').desc(), F('id').desc()])
+        comments = list(
+            model.objects.filter(issue_id__in=issue_ids)
+            .annotate(rank=rank)
+            .filter(rank__lte=count)
+            .select_related('author')
+            .order_by('issue_id', 'rank')
+        )
+        for comment, data in zip(comments, CommentSerializer(comments, many=True).data):
+            previews[archived, comment.issue_id].append(data)
+    return previews
@@ -20,22 +20,32 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
 
 class IssueListSerializer(serializers.ModelSerializer):
     author_username = serializers.CharField(source='author.username', read_only=True)
+    archived = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Issue
-        fields = ['id', 'name', 'priority', 'status', 'author_username', 'author_username', 'created_time']
+        fields = ['id', 'name', 'priority', 'status', 'author_username', 'author_username', 'created_time', 'archived']
         read_only_fields = ['author', 'author_username']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Comment previews, read for the whole page by the view (`?include=latest_comments:N`)
+        previews = self.context.get('latest_comments')
+        if previews is not None:
+            data['latest_comments'] = previews.get((instance.archived, instance.pk), [])
+        return data
+
 
 class IssueDetailSerializer(serializers.ModelSerializer):
     author_username = serializers.CharField(source='author.username', read_only=True)
     assignee_username = serializers.CharField(source='assignee.user.username', read_only=True)
+    archived = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Issue
         fields = ['id', 'name', 'description', 'priority', 'tag', 'status', 'author',
                   'author_username', 'project', 'assignee', 'assignee_username',
-                  'created_time']
+                  'created_time', 'updated_time', 'archived']
         read_only_fields = ['author', 'author_username', 'assignee_username', 'created_time', 'project']
 
     def _get_project(self):
@@ -79,7 +89,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        fields = ['id', 'description', 'author', 'author_username', 'issue', 'created_time']
+        fields = ['id', 'description', 'author', 'author_username', 'issue', 'created_time', 'updated_time']
         read_only_fields = ['author', 'author_username', 'created_time', 'issue']
 
     def create(self, validated_data):
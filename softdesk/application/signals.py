@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from user.models import Contributor
+from .feed import get_broker, project_channel
+from .models import Issue, Comment, SyncLog
+
+
+def _event(project_id, kind, action, object_id, **extra):
+    return {
+        'type': kind,
+        'action': action,
+        'id': object_id,
+        'project': project_id,
+        'time': timezone.now().isoformat(),
+        **extra,
+    }
+
+
+def _publish(project_id, kind, action, instance, **extra):
+    """
+    Record the change in the sync log, then publish it to the change feed
+    once the surrounding transaction is committed.
+    """
+    SyncLog.objects.create(project_id=project_id, model=kind, object_id=str(instance.pk), action='UPSERT')
+    event = _event(project_id, kind, action, str(instance.pk), **extra)
+    transaction.on_commit(lambda: get_broker().publish(project_channel(project_id), event))
+
+
+def record_bulk_deletion(kind, rows):
+    """
+    Record the deletion of rows in the sync log and publish it to the change feed, in bulk.
+    Deletions have no receivers (they would disable Django's fast deletes): the delete paths of `cascade`
+    call this function. `rows` is a list of `(project_id, object_id, extra)` tuples.
+    """
+    SyncLog.objects.bulk_create([
+        SyncLog(project_id=project_id, model=kind, object_id=str(object_id), action='DELETE')
+        for project_id, object_id, _ in rows
+    ])
+    events = [(project_id, _event(project_id, kind, 'deleted', str(object_id), **extra))
+              for project_id, object_id, extra in rows]
+
+    def publish():
+        broker = get_broker()
+        for project_id, event in events:
+            broker.publish(project_channel(project_id), event)
+    transaction.on_commit(publish)
+
+
+def _comment_project_id(comment):
+    if 'issue' in comment._state.fields_cache:
+        return comment.issue.project_id
+    return Issue.objects.filter(pk=comment.issue_id).values_list('project_id', flat=True).first()
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance, created, **kwargs):
+    _publish(instance.project_id, 'issue', 'created' if created else 'updated', instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    _publish(_comment_project_id(instance), 'comment', 'created' if created else 'updated', instance,
+             issue=instance.issue_id)
+
+
+@receiver(post_save, sender=Contributor)
+def contributor_saved(sender, instance, created, **kwargs):
+    _publish(instance.project_id, 'contributor', 'created' if created else 'updated', instance,
+             user=instance.user_id)
@@ -0,0 +1,17 @@
+from jobs.registry import task
+from . import cascade
+
+
+def job_progress(job):
+    """
+    Progress callback of the cascade engine: keeps the number of deleted rows per model in `job.progress`.
+    """
+    def progress(kind, count):
+        job.report_progress(**{kind: job.progress.get(kind, 0) + count})
+    return progress
+
+
+@task('delete_project')
+def delete_project(job, project_id):
+    cascade.delete_project(project_id, progress=job_progress(job))
+    return job.progress
@@ -0,0 +1,381 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.models import User, Contributor
+from . import cascade
+from .archive import archive_batch
+from .models import Project, Issue, Comment, SyncLog, ArchivedIssue, ArchivedComment
+
+
+class ProjectTestCase(TestCase):
+    """
+    A project with its manager (author), a contributor and an issue with comments; a staff user and an outsider.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        cls.manager = User.objects.create_user('manager')
+        cls.contributor = User.objects.create_user('contributor')
+        cls.outsider = User.objects.create_user('outsider')
+        cls.project = Project.objects.create(name='Project', type='BACKEND', author=cls.manager)
+        cls.manager_row = Contributor.objects.create(project=cls.project, user=cls.manager, role='MANAGER')
+        cls.contributor_row = Contributor.objects.create(project=cls.project, user=cls.contributor)
+        cls.issue = cls.create_issue()
+        cls.comments = cls.create_comments(cls.issue, 3)
+
+    @classmethod
+    def create_issue(cls, **fields):
+        fields = {'name': 'Issue', 'priority': 'LOW', 'tag': 'BUG', 'author': cls.manager, 'project': cls.project,
+                  'assignee': cls.manager_row, **fields}
+        return Issue.objects.create(**fields)
+
+    @classmethod
+    def create_comments(cls, issue, count):
+        return [Comment.objects.create(description=f'Comment {i}', author=cls.manager, issue=issue)
+                for i in range(count)]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def issue_url(self, issue=None, project=None):
+        project_id = project.pk if project else self.project.pk
+        base = f'/api/projects/{project_id}/issues/'
+        return base if issue is None else f'{base}{issue.pk}/'
+
+    def comment_url(self, comment=None, issue=None):
+        base = self.issue_url(issue or self.issue) + 'comments/'
+        return base if comment is None else f'{base}{comment.pk}/'
+
+
+class DeletionTombstoneTests(ProjectTestCase):
+    def tombstones(self, model):
+        return set(SyncLog.objects.filter(project=self.project, model=model, action='DELETE')
+                   .values_list('object_id', flat=True))
+
+    def test_issue_delete_records_the_issue_and_its_comments(self):
+        response = self.client_for(self.manager).delete(self.issue_url(self.issue))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.tombstones('issue'), {str(self.issue.pk)})
+        self.assertEqual(self.tombstones('comment'), {str(comment.pk) for comment in self.comments})
+
+    def test_issue_delete_runs_the_same_queries_whatever_the_number_of_comments(self):
+        counts = []
+        client = self.client_for(self.manager)
+        for size in (1, 20):
+            issue = self.create_issue()
+            self.create_comments(issue, size)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(client.delete(self.issue_url(issue)).status_code, 204)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_comment_delete_records_a_tombstone(self):
+        comment = self.comments[0]
+        response = self.client_for(self.manager).delete(self.comment_url(comment))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.tombstones('comment'), {str(comment.pk)})
+
+    def test_contributor_delete_records_the_assigned_issues(self):
+        issue = self.create_issue(assignee=self.contributor_row)
+        comment, = self.create_comments(issue, 1)
+        url = f'/api/projects/{self.project.pk}/contributors/{self.contributor_row.pk}/'
+
+        response = self.client_for(self.manager).delete(url)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.tombstones('contributor'), {str(self.contributor_row.pk)})
+        self.assertEqual(self.tombstones('issue'), {str(issue.pk)})
+        self.assertEqual(self.tombstones('comment'), {str(comment.pk)})
+
+    def test_deletions_are_published_once_committed(self):
+        comment = self.comments[0]
+        with mock.patch('application.signals.get_broker') as get_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client_for(self.manager).delete(self.comment_url(comment))
+                get_broker.return_value.publish.assert_not_called()
+
+        channel, event = get_broker.return_value.publish.call_args.args
+        self.assertEqual(channel, f'project:{self.project.pk}')
+        self.assertEqual((event['type'], event['action'], event['id']), ('comment', 'deleted', str(comment.pk)))
+
+
+class SyncTests(ProjectTestCase):
+    def sync(self, since=None, user=None):
+        url = f'/api/projects/{self.project.pk}/sync/'
+        response = self.client_for(user or self.contributor).get(url, {} if since is None else {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_update_is_returned_after_the_token(self):
+        token = self.sync()['sync_token']
+        self.issue.name = 'Renamed'
+        self.issue.save()
+
+        delta = self.sync(token)
+
+        self.assertEqual([issue['name'] for issue in delta['issues']], ['Renamed'])
+        self.assertEqual(delta['comments'], [])
+        self.assertNotEqual(delta['sync_token'], token)
+        self.assertEqual(self.sync(delta['sync_token'])['issues'], [])
+
+    def test_deleted_comment_is_listed_by_id(self):
+        token = self.sync()['sync_token']
+        comment = self.comments[0]
+        self.client_for(self.manager).delete(self.comment_url(comment))
+
+        delta = self.sync(token)
+
+        self.assertEqual(delta['deleted']['comments'], [str(comment.pk)])
+        self.assertEqual(delta['comments'], [])
+
+    def test_outsider_is_denied(self):
+        response = self.client_for(self.outsider).get(f'/api/projects/{self.project.pk}/sync/')
+        self.assertEqual(response.status_code, 403)
+
+
+class CascadeEngineTests(ProjectTestCase):
+    def test_project_is_deleted_by_chunks(self):
+        progress = []
+        cascade.delete_project(self.project.pk, progress=lambda kind, count: progress.append((kind, count)),
+                               batch_size=2)
+
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(progress, [('comment', 2), ('comment', 1), ('issue', 1), ('contributor', 2)])
+        self.assertEqual(SyncLog.objects.filter(action='DELETE').count(), 6)
+
+    def test_user_deletion_keeps_the_rows_of_others(self):
+        other_project = Project.objects.create(name='Other', type='IOS', author=self.contributor)
+        other_row = Contributor.objects.create(project=other_project, user=self.contributor, role='MANAGER')
+        Contributor.objects.create(project=other_project, user=self.manager)
+        kept = self.create_issue(project=other_project, assignee=other_row, author=self.contributor)
+        kept_comment = Comment.objects.create(description='Kept', author=self.contributor, issue=kept)
+        Comment.objects.create(description='Removed', author=self.manager, issue=kept)
+
+        cascade.delete_user(self.manager.pk, batch_size=2)
+
+        self.assertFalse(User.objects.filter(pk=self.manager.pk).exists())
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertEqual(list(Issue.objects.all()), [kept])
+        self.assertEqual(list(Comment.objects.all()), [kept_comment])
+        self.assertEqual(list(Contributor.objects.all()), [other_row])
+
+
+class ArchiveTests(ProjectTestCase):
+    def setUp(self):
+        Issue.objects.filter(pk=self.issue.pk).update(status='DONE', updated_time=timezone.now() - timedelta(days=400))
+
+    def test_batch_moves_the_issue_with_its_comments(self):
+        self.assertEqual(archive_batch(days=30), (1, 3))
+
+        self.assertFalse(Issue.objects.exists())
+        self.assertEqual(ArchivedIssue.objects.get().pk, self.issue.pk)
+        self.assertEqual(ArchivedComment.objects.count(), 3)
+        self.assertEqual(archive_batch(days=30), (0, 0))
+
+    def test_archived_rows_are_deleted_from_the_sync(self):
+        token = self.client_for(self.contributor).get(f'/api/projects/{self.project.pk}/sync/').json()['sync_token']
+        archive_batch(days=30)
+
+        delta = self.client_for(self.contributor).get(f'/api/projects/{self.project.pk}/sync/', {'since': token}).json()
+
+        self.assertEqual(delta['deleted']['issues'], [str(self.issue.pk)])
+        self.assertEqual(sorted(delta['deleted']['comments']), sorted(str(comment.pk) for comment in self.comments))
+
+    def test_archived_issue_is_read_on_request(self):
+        archive_batch(days=30)
+        client = self.client_for(self.contributor)
+
+        self.assertEqual(client.get(self.issue_url(self.issue)).status_code, 403)
+        response = client.get(self.issue_url(self.issue), {'include_archived': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Issue')
+        self.assertEqual(len(client.get(self.comment_url(), {'include_archived': 'true'}).json()), 3)
+
+
+class CommentKeyTests(ProjectTestCase):
+    def test_keys_follow_creation_order(self):
+        self.assertEqual(sorted(self.comments, key=lambda comment: comment.pk), self.comments)
+
+    def test_cursor_pages_follow_creation_order(self):
+        client = self.client_for(self.contributor)
+
+        first = client.get(self.comment_url(), {'page_size': 2}).json()
+        second = client.get(first['next']).json()
+
+        self.assertEqual([comment['id'] for comment in first['results'] + second['results']],
+                         [str(comment.pk) for comment in self.comments])
+        self.assertIsNone(second['next'])
+
+
+class AsyncParityTests(ProjectTestCase):
+    def status(self, user, path):
+        token = AccessToken.for_user(user)
+        return APIClient().get(path, HTTP_AUTHORIZATION=f'Bearer {token}').status_code
+
+    def test_async_routes_answer_like_the_viewsets(self):
+        other = Project.objects.create(name='Other', type='IOS', author=self.staff)
+        issue = f'projects/{self.project.pk}/issues/{self.issue.pk}'
+        paths = [
+            'projects/', f'projects/{self.project.pk}/', f'projects/{other.pk}/', 'projects/999/',
+            f'projects/{self.project.pk}/issues/', f'projects/{other.pk}/issues/', 'projects/999/issues/',
+            f'{issue}/', f'projects/{self.project.pk}/issues/999/', f'projects/{other.pk}/issues/{self.issue.pk}/',
+            f'{issue}/comments/', f'projects/{self.project.pk}/issues/999/comments/',
+            f'{issue}/comments/{self.comments[0].pk}/', f'{issue}/comments/{uuid.uuid4()}/',
+        ]
+        for user in (self.staff, self.contributor, self.outsider):
+            for path in paths:
+                with self.subTest(user=user.username, path=path):
+                    self.assertEqual(self.status(user, f'/api/async/{path}'), self.status(user, f'/api/{path}'))
+
+    def test_writes_are_not_allowed(self):
+        token = AccessToken.for_user(self.contributor)
+        client = APIClient(HTTP_AUTHORIZATION=f'Bearer {token}')
+        for method in ('post', 'put', 'patch', 'delete'):
+            for path in ('projects/', f'projects/{self.project.pk}/issues/{self.issue.pk}/'):
+                with self.subTest(method=method, path=path):
+                    response = getattr(client, method)(f'/api/async/{path}', {}, format='json')
+                    self.assertEqual(response.status_code, 405)
+                    self.assertEqual(response['Allow'], 'GET, HEAD, OPTIONS')
+
+    def test_authentication_errors_are_rendered_like_the_viewsets(self):
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer invalid'}):
+            sync = APIClient().get('/api/projects/', **headers)
+            async_ = APIClient().get('/api/async/projects/', **headers)
+            with self.subTest(headers=headers):
+                self.assertEqual(async_.status_code, 401)
+                self.assertEqual(async_.json(), sync.json())
+                self.assertEqual(async_['WWW-Authenticate'], sync['WWW-Authenticate'])
+
+    def test_denials(self):
+        self.assertEqual(self.status(self.outsider, f'/api/async/projects/{self.project.pk}/issues/'), 403)
+        self.assertEqual(self.status(self.contributor, f'/api/async/projects/{self.project.pk}/issues/999/'), 403)
+        self.assertEqual(self.status(self.contributor, f'/api/async/projects/{self.project.pk}/'), 200)
+
+
+class IdempotencyTests(ProjectTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = self.client_for(self.manager)
+
+    def create(self, key, **fields):
+        body = {'name': 'Created', 'priority': 'HIGH', 'tag': 'BUG', 'assignee': self.manager_row.pk, **fields}
+        return self.client.post(self.issue_url(), body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.create('retry')
+        second = self.create('retry')
+
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(Issue.objects.filter(name='Created').count(), 1)
+
+    def test_key_reused_with_another_payload_is_rejected(self):
+        self.create('reused')
+        self.assertEqual(self.create('reused', name='Other').status_code, 422)
+
+    def test_failed_request_can_be_retried(self):
+        self.assertEqual(self.create('failed', priority='URGENT').status_code, 400)
+        self.assertEqual(self.create('failed').status_code, 201)
+
+    def test_retry_during_the_first_request_conflicts(self):
+        retries = []
+        with mock.patch('application.views.IssueViewSet.perform_create',
+                        side_effect=lambda serializer: retries.append(self.create('running').status_code)):
+            self.create('running')
+        self.assertEqual(retries, [409])
+
+
+class AdminDeletionTests(ProjectTestCase):
+    def setUp(self):
+        self.staff.is_superuser = True
+        self.staff.save()
+        self.client.force_login(self.staff)
+        cache.clear()
+
+    def test_project_delete_goes_through_the_cascade(self):
+        self.client_for(self.contributor).get('/api/me/bootstrap/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/admin/application/project/{self.project.pk}/delete/', {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertEqual(SyncLog.objects.filter(model='issue', action='DELETE').count(), 1)
+        self.assertEqual(SyncLog.objects.filter(model='comment', action='DELETE').count(), 3)
+        self.assertEqual(self.client_for(self.contributor).get('/api/me/bootstrap/').json()['projects'], [])
+
+    def test_user_bulk_delete_goes_through_the_cascade(self):
+        response = self.client.post('/admin/user/user/', {
+            'action': 'delete_selected', '_selected_action': [self.manager.pk], 'post': 'yes',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(User.objects.filter(pk=self.manager.pk).exists())
+        self.assertTrue(SyncLog.objects.filter(model='contributor', object_id=str(self.manager_row.pk),
+                                               action='DELETE').exists())
+
+
+class CommentPreviewTests(ProjectTestCase):
+    def previews(self, **params):
+        """
+        {issue name: [descriptions of its previewed comments]} of the issue list.
+        """
+        response = self.client_for(self.contributor).get(self.issue_url(), params)
+        self.assertEqual(response.status_code, 200)
+        return {issue['name']: [comment['description'] for comment in issue['latest_comments']]
+                for issue in response.json()['results']}
+
+    def test_newest_comments_of_each_issue(self):
+        self.create_issue(name='Quiet')
+        busy = self.create_issue(name='Busy')
+        self.create_comments(busy, 1)
+
+        self.assertEqual(self.previews(include='latest_comments:2'),
+                         {'Issue': ['Comment 2', 'Comment 1'], 'Quiet': [], 'Busy': ['Comment 0']})
+        [issue, *_] = self.client_for(self.contributor).get(self.issue_url()).json()['results']
+        self.assertNotIn('latest_comments', issue)
+
+    def test_archived_issues_get_theirs_from_the_archive(self):
+        Issue.objects.filter(pk=self.issue.pk).update(status='DONE', updated_time=timezone.now() - timedelta(days=400))
+        archive_batch(days=30)
+        live = self.create_issue(name='Live')
+        self.create_comments(live, 2)
+
+        self.assertEqual(self.previews(include='latest_comments:1', include_archived='true'),
+                         {'Issue': ['Comment 2'], 'Live': ['Comment 1']})
+
+    def test_invalid_include_is_rejected(self):
+        client = self.client_for(self.contributor)
+        for value in ('latest_comments', 'latest_comments:0', 'latest_comments:11', 'comments:2'):
+            with self.subTest(value=value):
+                response = client.get(self.issue_url(), {'include': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('include', response.json())
+
+    def test_query_count_does_not_depend_on_the_number_of_issues(self):
+        client = self.client_for(self.contributor)
+        with CaptureQueriesContext(connection) as single:
+            client.get(self.issue_url(), {'include': 'latest_comments:3'})
+        for index in range(5):
+            self.create_comments(self.create_issue(name=f'Issue {index}'), 2)
+        with CaptureQueriesContext(connection) as several:
+            response = client.get(self.issue_url(), {'include': 'latest_comments:3'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(several), len(single))
@@ -1,15 +1,32 @@
-from rest_framework.viewsets import ModelViewSet
-from .models import Project, Issue, Comment
+from rest_framework.viewsets import ModelViewSet, GenericViewSet
+from .models import Project, Issue, Comment, SyncLog, ArchivedIssue
 from user.models import Contributor
+from user.serializers import ContributorSerializer
 from .serializers import ProjectDetailSerializer, ProjectListSerializer, IssueListSerializer, IssueDetailSerializer, CommentSerializer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from common.permissions import IsProjectManagerOrAdmin, IsProjectContributorOrAdmin, IsAuthorOrAdmin
+from common.permissions import IsProjectContributorOrAdmin
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.exceptions import NotFound, ValidationError
+from jobs.registry import enqueue
+from jobs.views import accepted_response
+from .archive import QuerySetChain, wants_archived
+from .cascade import delete_issues, delete_comments
+from common.pagination import OptInCursorPagination
+from common import visibility
+from . import previews
+from common.idempotency import idempotent, IDEMPOTENCY_KEY_PARAMETER, IDEMPOTENCY_RESPONSES
+from django.http import Http404
+
+INCLUDE_ARCHIVED_PARAMETER = openapi.Parameter(
+    'include_archived', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+    description="Also return the archived (old DONE) issues, read-only.")
+INCLUDE_LATEST_COMMENTS_PARAMETER = openapi.Parameter(
+    'include', openapi.IN_QUERY, type=openapi.TYPE_STRING, pattern=r'^latest_comments:\d+$',
+    description="`latest_comments:N` embeds the N newest comments of each issue (N up to `LATEST_COMMENTS_MAX`).")
 
 
 class ProjectViewSet(ModelViewSet):
@@ -20,11 +37,10 @@ class ProjectViewSet(ModelViewSet):
        - `create`: Only authenticated users.
        - `update`, `partial_update`, `destroy`: Only authenticated users who are project managers or admins.
        - `list`: Only authenticated users who are contributors.
+       Contributor and manager rules are applied by `get_queryset` (`common.visibility`).
        """
-        if self.action in ['create', 'retrieve', 'list']:
+        if self.action in ['create', 'retrieve', 'list', 'update', 'partial_update', 'destroy']:
             return [IsAuthenticated()]
-        elif self.action in ['update', 'partial_update', 'destroy']:
-            return [IsAuthenticated(), IsProjectManagerOrAdmin()]
         return super().get_permissions()  # Default
 
     def get_serializer_class(self):
@@ -59,19 +75,30 @@ class ProjectViewSet(ModelViewSet):
         }
     )
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        projects = list(self.get_queryset())
+        if not projects and not request.user.is_staff:
+            raise PermissionDenied("Vous n'êtes pas associé à un projet.")
+        serializer = self.get_serializer(projects, many=True)
         return Response(serializer.data)
 
     def get_queryset(self):
+        # For Swagger schema generation
+        if getattr(self, 'swagger_fake_view', False):
+            return Project.objects.none()
         if not self.request.user.is_authenticated:
             raise PermissionDenied("Utilisateur non authentifié.")
-        if self.request.user.is_staff:
-            return Project.objects.all()
-        projects = Project.objects.filter(contributors__user=self.request.user)
-        if not projects.exists():
-            raise PermissionDenied("Vous n'êtes pas associé à un projet.")
-        return projects
+        # Projects the user contributes to (or manages, to modify them), checked in the same query
+        if self.action in ['update', 'partial_update', 'destroy']:
+            return visibility.projects(self.request.user, roles=['MANAGER'])
+        return visibility.projects(self.request.user)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            visibility.explain_project_denial(self.request.user, self.kwargs.get(self.lookup_field),
+                                              manager=self.action in ['update', 'partial_update', 'destroy'])
+            raise
 
     @swagger_auto_schema(
         operation_summary="Create a new project",
@@ -87,6 +114,7 @@ class ProjectViewSet(ModelViewSet):
 
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={
             201: openapi.Response(
                 description="Project created successfully.",
@@ -97,8 +125,10 @@ class ProjectViewSet(ModelViewSet):
             401: openapi.Response(
                 description="Unauthorized. Authentication credentials were not provided.",
             ),
+            **IDEMPOTENCY_RESPONSES,
         }
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Handle the creation of a project, including associating the user as the author
@@ -238,7 +268,9 @@ class ProjectViewSet(ModelViewSet):
         operation_summary="Delete a project",
         tags=["Projects"],
         operation_description=(
-                "Delete a project if the user is an admin or the project manager (default : author).\n\n"
+                "Delete a project if the user is an admin or the project manager (default : author).\n"
+                "The project, its issues, comments and contributors are deleted by a background job: "
+                "follow its status with the URL given in the `Location` header.\n\n"
                 "**Permissions required:**\n"
                 "- `IsAuthenticated`\n"
                 "- `IsProjectManagerOrAdmin`\n"
@@ -248,8 +280,8 @@ class ProjectViewSet(ModelViewSet):
 
         security=[{"Bearer": []}],
         responses={
-            204: openapi.Response(
-                description="No Content. The project was successfully deleted.",
+            202: openapi.Response(
+                description="Accepted. The deletion job was queued (the job status is returned).",
             ),
             401: openapi.Response(
                 description="Unauthorized. Authentication credentials were not provided.",
@@ -264,9 +296,11 @@ class ProjectViewSet(ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         """
-        Delete a project.
+        Queue the deletion of a project (cascading deletes run in batches in a background job).
         """
-        return super().destroy(request, *args, **kwargs)
+        project = self.get_object()
+        job = enqueue('delete_project', {'project_id': project.pk}, user=request.user)
+        return accepted_response(request, job)
 
 
 class IssueViewSet(ModelViewSet):
@@ -281,19 +315,22 @@ class IssueViewSet(ModelViewSet):
         """
         Retrieve the list of issues for the project specified in the URL.
         """
+        # For Swagger schema generation
+        if getattr(self, 'swagger_fake_view', False):
+            return Issue.objects.none()
 
         project_pk = self.kwargs.get('project_pk')  # Récupère l'ID du projet depuis l'URL
         if not project_pk:
             raise PermissionDenied("Le projet n'a pas été spécifié dans l'URL.")
 
-        # Check if the project exists
-        try:
-            project = Project.objects.get(pk=project_pk)
-        except Project.DoesNotExist:
-            raise PermissionDenied("Le projet spécifié n'existe pas.")
-
-        # Filter issues by project
-        return Issue.objects.filter(project=project)
+        # Issues of the project, if the user is a contributor (checked in the same query)
+        relations = ('author',) if self.action == 'list' else ('author', 'assignee__user')
+        issues = visibility.issues(self.request.user, project_pk).select_related(*relations)
+        if self.action in ['list', 'retrieve'] and wants_archived(self.request):
+            # Archived issues are read-only, and listed after the hot ones
+            archived = visibility.issues(self.request.user, project_pk, ArchivedIssue).select_related(*relations)
+            return QuerySetChain(issues.order_by('id'), archived.order_by('id'))
+        return issues
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -304,15 +341,25 @@ class IssueViewSet(ModelViewSet):
         """
         Retrieve the issue specified in the URL.
         """
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.get_queryset()
         issue_pk = self.kwargs.get(self.lookup_field)  # Par défaut, `pk`
 
-        # Check if the issue exists
-        try:
-            obj = queryset.get(pk=issue_pk)
-            return obj
-        except Issue.DoesNotExist:
-            raise PermissionDenied("Cette issue n'existe pas dans ce projet.")
+        # Check if the issue exists (in the archive too with `?include_archived=true`)
+        querysets = queryset.querysets if isinstance(queryset, QuerySetChain) else [queryset]
+        for queryset in querysets:
+            try:
+                return self.filter_queryset(queryset).get(pk=issue_pk)
+            except queryset.model.DoesNotExist:
+                pass
+        visibility.explain_denial(self.request.user, self.kwargs.get('project_pk'))
+        raise PermissionDenied("Cette issue n'existe pas dans ce projet.")
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and not page:
+            # Nothing visible: a missing project or membership, or a project without issues
+            visibility.explain_denial(self.request.user, self.kwargs.get('project_pk'))
+        return page
 
     def get_permissions(self):
         """
@@ -320,10 +367,9 @@ class IssueViewSet(ModelViewSet):
        - `create`: Only authenticated users who are contributors.
        - `update`, `partial_update`, `destroy`: Only authenticated users who are authors or admins.
        - `list`: Only authenticated users who are contributors.
+       Except for `create`, the contributor rule is applied by `get_queryset` (`common.visibility`).
        """
-        if self.action in ['retrieve', 'list', 'create']:
-            return [IsAuthenticated(), IsProjectContributorOrAdmin()]
-        elif self.action in ['update', 'partial_update', 'destroy']:
+        if self.action == 'create':
             return [IsAuthenticated(), IsProjectContributorOrAdmin()]
         return [IsAuthenticated()]
 
@@ -331,7 +377,9 @@ class IssueViewSet(ModelViewSet):
         operation_summary="List issues",
         tags=["Issues"],
         operation_description=(
-                "Retrieve a list of issues for projects where the authenticated user is a contributor.\n\n"
+                "Retrieve a list of issues for projects where the authenticated user is a contributor.\n"
+                "- With `include=latest_comments:N`, each issue has its N newest comments in `latest_comments`, "
+                "read for the whole page in one query.\n\n"
                 "**Permissions required:**\n"
                 "- `IsAuthenticated`\n"
                 "- `IsProjectContributorOrAdmin`\n\n"
@@ -339,14 +387,27 @@ class IssueViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[INCLUDE_ARCHIVED_PARAMETER, INCLUDE_LATEST_COMMENTS_PARAMETER],
         responses={
             200: openapi.Response(description="List of issues retrieved successfully."),
+            400: openapi.Response(description="Bad Request. Invalid `include` parameter."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
             403: openapi.Response(description="Forbidden. You do not have permission to view these issues."),
         },
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        count = previews.requested_count(request)
+        if count is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        issues = list(queryset) if page is None else page
+        context = {**self.get_serializer_context(), 'latest_comments': previews.latest_comments(issues, count)}
+        serializer = self.get_serializer(issues, many=True, context=context)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
 
     @swagger_auto_schema(
         operation_summary="Retrieve an issue",
@@ -360,6 +421,7 @@ class IssueViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[INCLUDE_ARCHIVED_PARAMETER],
         responses={
             200: openapi.Response(description="Issue details retrieved successfully."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
@@ -382,13 +444,16 @@ class IssueViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={
             201: openapi.Response(description="Issue created successfully."),
             400: openapi.Response(description="Bad Request. Invalid input data."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
             403: openapi.Response(description="Forbidden. You do not have permission to create this issue."),
+            **IDEMPOTENCY_RESPONSES,
         },
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
@@ -471,31 +536,36 @@ class IssueViewSet(ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        # The comments go along, with their tombstones written in bulk
+        delete_issues([instance])
+
 
 class CommentViewSet(ModelViewSet):
 
     serializer_class = CommentSerializer
+    pagination_class = OptInCursorPagination
     lookup_field = 'pk'
 
     def get_queryset(self):
         """
         Retrieve the list of comments for the issue specified in the URL.
         """
+        # For Swagger schema generation
+        if getattr(self, 'swagger_fake_view', False):
+            return Comment.objects.none()
         project_pk = self.kwargs.get('project_pk')
         issue_pk = self.kwargs.get('issue_pk')
+        user = self.request.user
 
-        # Check if the project and issue exists
-        try:
-            project = Project.objects.get(pk=project_pk)
-        except Project.DoesNotExist:
-            raise PermissionDenied("Le projet spécifié n'existe pas.")
+        if self.action in ['list', 'retrieve'] and wants_archived(self.request):
+            archived = visibility.issues(user, project_pk, ArchivedIssue).filter(pk=issue_pk).first()
+            if archived is not None:
+                return archived.comments.select_related('author')
 
-        try:
-            issue = Issue.objects.get(pk=issue_pk, project=project)
-        except Issue.DoesNotExist:
-            raise PermissionDenied("L'issue spécifiée n'existe pas dans ce projet.")
-
-        return Comment.objects.filter(issue=issue)
+        # Comments of the issue, if the user is a contributor (and the author, to modify them), in one query
+        authored = self.action in ['update', 'partial_update', 'destroy']
+        return visibility.comments(user, project_pk, issue_pk, authored=authored).select_related('author')
 
     def get_object(self):
         """
@@ -512,14 +582,19 @@ class CommentViewSet(ModelViewSet):
             if obj is None:
                 raise NotFound("The requested comment is null or does not exist.")
             return obj
-        except Comment.DoesNotExist:
+        except queryset.model.DoesNotExist:
+            issue_pk = self.kwargs.get('issue_pk')
+            visibility.explain_denial(self.request.user, self.kwargs.get('project_pk'), issue_pk)
+            if Comment.objects.filter(pk=comment_pk, issue_id=issue_pk).exists():
+                raise PermissionDenied()  # Not the author
             raise NotFound("The specified comment does not exist for this issue.")
 
     def get_permissions(self):
-        if self.action in ['create', 'list', 'retrieve']:
+        """
+        Except for `create`, the contributor and author rules are applied by `get_queryset` (`common.visibility`).
+        """
+        if self.action == 'create':
             return [IsAuthenticated(), IsProjectContributorOrAdmin()]
-        elif self.action in ['update', 'partial_update', 'destroy']:
-            return [IsAuthenticated(), IsProjectContributorOrAdmin(), IsAuthorOrAdmin()]
         return [IsAuthenticated()]
 
     @swagger_auto_schema(
@@ -527,7 +602,9 @@ class CommentViewSet(ModelViewSet):
         tags=["Comments"],
         operation_description=(
                 "Retrieve a list of comments linked to an issue. Only contributors "
-                "to the project can access the comments.\n\n"
+                "to the project can access the comments.\n"
+                "- With `page_size` or `cursor`, the comments are paginated in creation order "
+                "(cursor on the time-ordered ID).\n\n"
                 "**Permissions required:**\n"
                 "- `IsAuthenticated`\n"
                 "- `IsProjectContributorOrAdmin`\n\n"
@@ -535,6 +612,13 @@ class CommentViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[
+            INCLUDE_ARCHIVED_PARAMETER,
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Paginate the comments, with this number per page (max 100)."),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Cursor of the page, from the `next`/`previous` links."),
+        ],
         responses={
             200: openapi.Response(description="Success. Returns a list of comments."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
@@ -543,7 +627,14 @@ class CommentViewSet(ModelViewSet):
     )
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        comments = page if page is not None else list(queryset)
+        if not comments:
+            # Nothing visible: a missing project, issue or membership, or an issue without comments
+            visibility.explain_denial(request.user, self.kwargs.get('project_pk'), self.kwargs.get('issue_pk'))
+        serializer = self.get_serializer(comments, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return Response(serializer.data)
 
     @swagger_auto_schema(
@@ -558,6 +649,7 @@ class CommentViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[INCLUDE_ARCHIVED_PARAMETER],
         responses={
             200: openapi.Response(description="Success. Returns the comment details."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
@@ -581,13 +673,16 @@ class CommentViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={
             201: openapi.Response(description="Comment created successfully."),
             400: openapi.Response(description="Bad Request. Invalid input data."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
             403: openapi.Response(description="Forbidden. You do not have permission to perform this action."),
+            **IDEMPOTENCY_RESPONSES,
         },
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -662,3 +757,92 @@ class CommentViewSet(ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        delete_comments([instance])  # The issue is loaded along: no query for the project of the tombstone
+
+
+class SyncViewSet(GenericViewSet):
+    """
+    Delta sync for mobile clients: returns what changed in a project since a sync token.
+    The cost depends on the number of changes, not on the size of the project
+    (index on `SyncLog(project, id)`).
+    """
+
+    permission_classes = [IsAuthenticated, IsProjectContributorOrAdmin]
+    queryset = SyncLog.objects.none()
+    max_changes = 500
+
+    # Querysets and serializers used to render the changed objects
+    SOURCES = {
+        'issue': ('issues', lambda: Issue.objects.select_related('author', 'assignee__user'), IssueDetailSerializer),
+        'comment': ('comments', lambda: Comment.objects.select_related('author'), CommentSerializer),
+        'contributor': ('contributors', lambda: Contributor.objects.select_related('user', 'project'),
+                        ContributorSerializer),
+    }
+
+    @swagger_auto_schema(
+        operation_summary="Delta sync of a project",
+        tags=["Sync"],
+        operation_description=(
+                "Return the issues, comments and contributors created, updated or deleted since `since`.\n"
+                "- Without `since`, only the current `sync_token` is returned: fetch it before loading the lists.\n"
+                "- Deleted objects are listed by ID in `deleted`.\n"
+                "- When `has_more` is true, call again with the returned `sync_token`.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAuthenticated`\n"
+                "- `IsProjectContributorOrAdmin`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Sync token returned by the previous call."),
+        ],
+        responses={
+            200: openapi.Response(description="Changes since the given token."),
+            400: openapi.Response(description="Bad Request. Invalid sync token."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            403: openapi.Response(description="Forbidden. You do not have permission to access this project."),
+        },
+    )
+    def list(self, request, *args, **kwargs):
+        project_pk = self.kwargs.get('project_pk')
+        if not Project.objects.filter(pk=project_pk).exists():
+            raise PermissionDenied("Le projet spécifié n'existe pas.")
+
+        since = request.query_params.get('since')
+        if since is None:
+            last = SyncLog.objects.filter(project_id=project_pk).order_by('-id').values_list('id', flat=True).first()
+            return Response({'sync_token': str(last or 0)})
+        try:
+            since = int(since)
+        except ValueError:
+            raise ValidationError({"since": "The sync token is invalid."})
+
+        entries = list(
+            SyncLog.objects.filter(project_id=project_pk, id__gt=since)
+            .order_by('id').values_list('id', 'model', 'object_id', 'action')[:self.max_changes + 1]
+        )
+        has_more = len(entries) > self.max_changes
+        entries = entries[:self.max_changes]
+
+        # Keep only the latest action of each object
+        latest = {}
+        for _, model, object_id, action in entries:
+            latest[(model, object_id)] = action
+
+        payload = {'sync_token': str(entries[-1][0] if entries else since), 'has_more': has_more, 'deleted': {}}
+        for model, (key, queryset, serializer_class) in self.SOURCES.items():
+            upserted = [object_id for (kind, object_id), action in latest.items()
+                        if kind == model and action == 'UPSERT']
+            deleted = [object_id for (kind, object_id), action in latest.items()
+                       if kind == model and action == 'DELETE']
+            objects = list(queryset().filter(pk__in=upserted)) if upserted else []
+            # Objects deleted after the returned token are reported as deleted right away
+            found = {str(obj.pk) for obj in objects}
+            deleted += [object_id for object_id in upserted if object_id not in found]
+            payload[key] = serializer_class(objects, many=True, context=self.get_serializer_context()).data
+            payload['deleted'][key] = deleted
+        return Response(payload)
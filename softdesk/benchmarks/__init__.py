@@ -0,0 +1,10 @@
+"""
+Load-test and benchmark suite for the SoftDesk API.
+
+- `seed`: deterministic synthetic datasets at several scales.
+- `endpoints`: every route exposed by `softdesk/urls.py`, with the actor and payload used to hit it.
+- `runner`: drives the endpoints through the Django test client or a local server and records
+  p50/p95/p99 latency, throughput and SQL query counts.
+
+Run it with `python manage.py benchmark --scale small`.
+"""
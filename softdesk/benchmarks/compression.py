@@ -0,0 +1,60 @@
+"""
+Size and CPU cost of the response codecs on the API payloads.
+
+The payloads are real responses of the seeded dataset (served without compression): the issue list of the largest
+project, the comment list of the most commented issue, the staff project list and the OpenAPI schema. Each one is
+compressed by each installed codec (gzip, and brotli and zstd when their packages are installed) at a fast, the
+configured and a slow level.
+"""
+import statistics
+import time
+
+from django.db.models import Count
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from application.models import Issue, Project
+from common import compression
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 11), 'zstd': (1, 3, 10)}
+
+
+def payloads(context):
+    """
+    {name: bytes} of the measured responses.
+    """
+    client = APIClient()
+    client.force_authenticate(context['staff'])
+    project = Project.objects.annotate(size=Count('issues')).order_by('-size').first()
+    issue = Issue.objects.annotate(size=Count('comments')).order_by('-size').first()
+    paths = {
+        'issues_list': f'/api/projects/{project.pk}/issues/',
+        'comments_list': f'/api/projects/{issue.project_id}/issues/{issue.pk}/comments/',
+        'projects_list': '/api/projects/',
+        'openapi_schema': '/swagger.json',
+    }
+    with override_settings(COMPRESSION_CONTENT_TYPES=()):
+        return {name: client.get(path).content for name, path in paths.items()}
+
+
+def _time(codec, payload, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        codec.compress(payload)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def run(context, iterations=200):
+    """
+    Return rows of (payload, encoding, level, raw bytes, compressed bytes, median µs per compression).
+    """
+    rows = []
+    for name, payload in payloads(context).items():
+        for encoding, codec_class in compression.CODECS.items():
+            for level in LEVELS[encoding]:
+                codec = codec_class(level)
+                rows.append((name, encoding, level, len(payload), len(codec.compress(payload)),
+                             _time(codec, payload, iterations)))
+    return rows
@@ -0,0 +1,111 @@
+"""
+Concurrency benchmark of the read endpoints: WSGI thread pool versus the ASGI-native async views.
+
+- WSGI: each virtual client is a thread sending requests through the synchronous viewsets.
+- ASGI: each virtual client is an asyncio task sending requests to the `/api/async/` views,
+  all of them served by a single event loop.
+Both measure latency percentiles, throughput and the peak number of live threads.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import AsyncClient, Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .runner import summarize
+
+READ_PATHS = [
+    'projects/',
+    'projects/{project}/',
+    'projects/{project}/issues/',
+    'projects/{project}/issues/{issue}/',
+    'projects/{project}/issues/{issue}/comments/',
+    'projects/{project}/issues/{issue}/comments/{comment}/',
+]
+
+
+class _ThreadSampler:
+    """
+    Record the peak number of threads while a benchmark runs.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def _paths(prefix, context):
+    return [prefix + path.format(**context) for path in READ_PATHS]
+
+
+def _headers(context):
+    return {'Authorization': f"Bearer {AccessToken.for_user(context['contributor'])}"}
+
+
+def run_wsgi(context, clients, requests_per_client):
+    headers = _headers(context)
+    paths = _paths('/api/', context)
+
+    def virtual_client(_):
+        client = Client()
+        samples = []
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            response = client.get(paths[i % len(paths)], headers=headers)
+            samples.append((response.status_code, time.perf_counter() - start))
+        return samples
+
+    with _ThreadSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            samples = [sample for batch in pool.map(virtual_client, range(clients)) for sample in batch]
+        wall_time = time.perf_counter() - start
+    return _summary(samples, wall_time, sampler.peak)
+
+
+def run_asgi(context, clients, requests_per_client):
+    headers = _headers(context)
+    paths = _paths('/api/async/', context)
+
+    async def virtual_client():
+        client = AsyncClient()
+        samples = []
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            samples.append((response.status_code, time.perf_counter() - start))
+        return samples
+
+    async def main():
+        batches = await asyncio.gather(*(virtual_client() for _ in range(clients)))
+        return [sample for batch in batches for sample in batch]
+
+    with _ThreadSampler() as sampler:
+        start = time.perf_counter()
+        samples = asyncio.run(main())
+        wall_time = time.perf_counter() - start
+    return _summary(samples, wall_time, sampler.peak)
+
+
+def _summary(samples, wall_time, peak_threads):
+    statuses, latencies = zip(*samples)
+    summary = summarize(latencies, wall_time, statuses, None)
+    summary['peak_threads'] = peak_threads
+    return summary
@@ -0,0 +1,29 @@
+"""
+Throwaway database used by the benchmark and query-count commands.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def test_database(db_path=None):
+    """
+    Create a test database for the duration of the block.
+    - Without `db_path`, the database is destroyed afterwards.
+    - With `db_path`, the SQLite file is kept so a large seeded dataset can be reused between runs.
+    Throttling is disabled: the benchmarks replay each endpoint many more times than the client budgets allow.
+    """
+    keepdb = bool(db_path)
+    if keepdb:
+        connection.settings_dict['TEST']['NAME'] = db_path
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        with override_settings(THROTTLE_ENABLED=False):
+            yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
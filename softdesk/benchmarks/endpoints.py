@@ -0,0 +1,221 @@
+"""
+Catalogue of the routes declared in `softdesk/urls.py`.
+
+Each endpoint names the actor sending the request (a key of the benchmark context, or None for
+anonymous calls), its path and payload. Write endpoints that consume a row (delete, create with a
+unique field) declare a `setup` callable, run outside of the timed section before each request.
+Endless streams (`streaming=True`) are measured up to their response headers, by the transports able to.
+"""
+import uuid
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from application.cascade import delete_comments
+from application.models import Project, Issue, Comment, SyncLog
+from jobs.models import Job
+from user.models import User, Contributor
+from .seed import BENCHMARK_PASSWORD
+
+
+class Endpoint:
+    def __init__(self, name, method, path, actor=None, body=None, setup=None, streaming=False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.actor = actor
+        self.body = body
+        self.setup = setup
+        self.streaming = streaming
+
+    def prepare(self, context):
+        """
+        Return the (path, body) pair for one request, running the setup hook first.
+        """
+        values = dict(context)
+        if self.setup:
+            values.update(self.setup(context))
+        body = self.body(values) if callable(self.body) else self.body
+        return self.path.format(**values), body
+
+
+def _scratch_user(context):
+    user = User.objects.create(username=f'bench-scratch-{uuid.uuid4().hex[:12]}')
+    return {'scratch_user': user.pk}
+
+
+def _unique_username(context):
+    return {'username': f'bench-new-{uuid.uuid4().hex[:12]}'}
+
+
+def _scratch_project(context):
+    project = Project.objects.create(name='Scratch project', type='BACKEND', author=context['manager'])
+    Contributor.objects.create(project=project, user=context['manager'], role='MANAGER')
+    return {'scratch_project': project.pk}
+
+
+def _scratch_issue(context, assignee_id=None):
+    """
+    An issue with a few comments, so that deleting it exercises the cascade.
+    """
+    issue = Issue.objects.create(
+        name='Scratch issue', priority='LOW', tag='TASK', author=context['manager'],
+        project_id=context['project'], assignee_id=assignee_id or context['assignee'],
+    )
+    Comment.objects.bulk_create([
+        Comment(description=f'Scratch comment {i}', author=context['manager'], issue=issue) for i in range(3)
+    ])
+    return {'scratch_issue': issue.pk}
+
+
+def _scratch_comment(context):
+    comment = Comment.objects.create(description='Scratch comment', author=context['manager'],
+                                     issue_id=context['issue'])
+    return {'scratch_comment': comment.pk}
+
+
+def _scratch_contributor(context):
+    user = User.objects.create(username=f'bench-scratch-{uuid.uuid4().hex[:12]}')
+    contributor = Contributor.objects.create(project_id=context['project'], user=user)
+    _scratch_issue(context, assignee_id=contributor.pk)  # Deleted along with the contributor
+    return {'scratch_contributor': contributor.pk, 'scratch_user': user.pk}
+
+
+def _sync_changes(context):
+    """
+    Sync token of the project, followed by an updated issue, a new comment and a deleted comment.
+    """
+    token = SyncLog.objects.filter(project_id=context['project']).order_by('-id').values_list('id', flat=True).first()
+    issue = Issue.objects.get(pk=context['issue'])
+    issue.save()
+    Comment.objects.create(description='Synced comment', author=context['manager'], issue=issue)
+    delete_comments([Comment.objects.create(description='Deleted comment', author=context['manager'], issue=issue)])
+    return {'sync_token': token or 0}
+
+
+def _scratch_job(context):
+    job = Job.objects.create(name='delete_project', payload={'project_id': 0}, status='SUCCEEDED',
+                             created_by=context['manager'])
+    return {'scratch_job': job.pk}
+
+
+def _refresh_token(context):
+    return {'refresh': str(RefreshToken.for_user(context['contributor']))}
+
+
+PROJECTS = '/api/projects/'
+ISSUES = PROJECTS + '{project}/issues/'
+COMMENTS = ISSUES + '{issue}/comments/'
+CONTRIBUTORS = PROJECTS + '{project}/contributors/'
+ASYNC = '/api/async/'
+
+ISSUE_BODY = {'name': 'Benchmark issue', 'priority': 'HIGH', 'tag': 'BUG', 'status': 'TO_DO'}
+
+ENDPOINTS = [
+    # Authentication
+    Endpoint('token_obtain', 'POST', '/api/token/',
+             body=lambda v: {'username': v['contributor'].username, 'password': BENCHMARK_PASSWORD}),
+    Endpoint('token_refresh', 'POST', '/api/token/refresh/', body=lambda v: {'refresh': v['refresh']},
+             setup=_refresh_token),
+
+    # Users
+    Endpoint('users_list', 'GET', '/api/users/', actor='staff'),
+    Endpoint('users_retrieve', 'GET', '/api/users/{contributor_user}/', actor='contributor'),
+    Endpoint('users_create', 'POST', '/api/users/', setup=_unique_username,
+             body=lambda v: {'username': v['username'], 'password': BENCHMARK_PASSWORD, 'age': 30}),
+    Endpoint('users_update', 'PUT', '/api/users/{scratch_user}/', actor='staff', setup=_scratch_user,
+             body=lambda v: {'username': f"bench-upd-{v['scratch_user']}", 'password': BENCHMARK_PASSWORD}),
+    Endpoint('users_partial_update', 'PATCH', '/api/users/{contributor_user}/', actor='contributor',
+             body={'first_name': 'Bench'}),
+    Endpoint('users_destroy', 'DELETE', '/api/users/{scratch_user}/', actor='staff', setup=_scratch_user),
+
+    Endpoint('me_bootstrap', 'GET', '/api/me/bootstrap/', actor='manager'),
+    Endpoint('me_issues', 'GET', '/api/me/issues/', actor='contributor'),
+
+    # Projects
+    Endpoint('projects_list', 'GET', PROJECTS, actor='contributor'),
+    Endpoint('projects_list_staff', 'GET', PROJECTS, actor='staff'),
+    Endpoint('projects_retrieve', 'GET', PROJECTS + '{project}/', actor='contributor'),
+    Endpoint('projects_create', 'POST', PROJECTS, actor='manager', body={'name': 'Benchmark', 'type': 'IOS'}),
+    Endpoint('projects_update', 'PUT', PROJECTS + '{project}/', actor='manager',
+             body={'name': 'Benchmark project', 'type': 'BACKEND'}),
+    Endpoint('projects_partial_update', 'PATCH', PROJECTS + '{project}/', actor='manager',
+             body={'description': 'Updated by the benchmark'}),
+    Endpoint('projects_destroy', 'DELETE', PROJECTS + '{scratch_project}/', actor='manager',
+             setup=_scratch_project),
+
+    # Issues
+    Endpoint('issues_list', 'GET', ISSUES, actor='contributor'),
+    Endpoint('issues_list_latest_comments', 'GET', ISSUES + '?include=latest_comments:2', actor='contributor'),
+    Endpoint('issues_retrieve', 'GET', ISSUES + '{issue}/', actor='contributor'),
+    Endpoint('issues_create', 'POST', ISSUES, actor='manager', body=lambda v: dict(ISSUE_BODY, assignee=v['assignee'])),
+    Endpoint('issues_update', 'PUT', ISSUES + '{issue}/', actor='manager',
+             body=lambda v: dict(ISSUE_BODY, assignee=v['assignee'])),
+    Endpoint('issues_partial_update', 'PATCH', ISSUES + '{issue}/', actor='manager', body={'status': 'IN_PROGRESS'}),
+    Endpoint('issues_destroy', 'DELETE', ISSUES + '{scratch_issue}/', actor='manager', setup=_scratch_issue),
+
+    # Comments
+    Endpoint('comments_list', 'GET', COMMENTS, actor='contributor'),
+    Endpoint('comments_retrieve', 'GET', COMMENTS + '{comment}/', actor='contributor'),
+    Endpoint('comments_create', 'POST', COMMENTS, actor='contributor', body={'description': 'Benchmark comment'}),
+    Endpoint('comments_update', 'PUT', COMMENTS + '{comment}/', actor='staff', body={'description': 'Updated'}),
+    Endpoint('comments_partial_update', 'PATCH', COMMENTS + '{comment}/', actor='staff',
+             body={'description': 'Patched'}),
+    Endpoint('comments_destroy', 'DELETE', COMMENTS + '{scratch_comment}/', actor='staff', setup=_scratch_comment),
+
+    # Contributors
+    Endpoint('contributors_list', 'GET', CONTRIBUTORS, actor='contributor'),
+    Endpoint('contributors_retrieve', 'GET', CONTRIBUTORS + '{contributor_row}/', actor='contributor'),
+    Endpoint('contributors_create', 'POST', CONTRIBUTORS, actor='manager', setup=_scratch_user,
+             body=lambda v: {'user': v['scratch_user'], 'role': 'CONTRIBUTOR'}),
+    Endpoint('contributors_destroy', 'DELETE', CONTRIBUTORS + '{scratch_contributor}/', actor='manager',
+             setup=_scratch_contributor),
+
+    # Background jobs (status of the queued deletions)
+    Endpoint('jobs_list', 'GET', '/api/jobs/', actor='manager', setup=_scratch_job),
+    Endpoint('jobs_retrieve', 'GET', '/api/jobs/{scratch_job}/', actor='manager', setup=_scratch_job),
+
+    # Delta sync
+    Endpoint('sync_token', 'GET', PROJECTS + '{project}/sync/', actor='contributor'),
+    Endpoint('sync_changes', 'GET', PROJECTS + '{project}/sync/?since={sync_token}', actor='contributor',
+             setup=_sync_changes),
+
+    # ASGI-native reads (same rows as the synchronous list/retrieve actions)
+    Endpoint('async_projects_list', 'GET', ASYNC + 'projects/', actor='contributor'),
+    Endpoint('async_projects_retrieve', 'GET', ASYNC + 'projects/{project}/', actor='contributor'),
+    Endpoint('async_issues_list', 'GET', ASYNC + 'projects/{project}/issues/', actor='contributor'),
+    Endpoint('async_issues_retrieve', 'GET', ASYNC + 'projects/{project}/issues/{issue}/', actor='contributor'),
+    Endpoint('async_comments_list', 'GET', ASYNC + 'projects/{project}/issues/{issue}/comments/',
+             actor='contributor'),
+    Endpoint('async_comments_retrieve', 'GET', ASYNC + 'projects/{project}/issues/{issue}/comments/{comment}/',
+             actor='contributor'),
+
+    # Change feed (Server-Sent Events): access check and opening of the stream
+    Endpoint('feed_project', 'GET', ASYNC + 'projects/{project}/feed/', actor='contributor', streaming=True),
+
+    # Batch: issue details, comments and contributors in one round trip
+    Endpoint('batch_reads', 'POST', '/api/batch/', actor='contributor', body=lambda v: {'requests': [
+        {'path': ISSUES.format(**v) + f"{v['issue']}/"},
+        {'path': COMMENTS.format(**v)},
+        {'path': CONTRIBUTORS.format(**v)},
+    ]}),
+
+    # Diagnostics (staff)
+    Endpoint('slow_queries_report', 'GET', '/api/slow-queries/', actor='staff'),
+    Endpoint('memory_report', 'GET', '/api/memory/', actor='staff'),
+
+    # Documentation, admin and browsable API login
+    Endpoint('schema_openapi', 'GET', '/swagger/?format=openapi'),
+    Endpoint('swagger_ui', 'GET', '/swagger/'),
+    Endpoint('redoc_ui', 'GET', '/redoc/'),
+    Endpoint('admin_login', 'GET', '/admin/login/'),
+    Endpoint('api_auth_login', 'GET', '/api-auth/login/'),
+]
+
+
+def select(names=None):
+    """
+    Return the endpoints matching the given names (or name prefixes), or all of them.
+    """
+    if not names:
+        return list(ENDPOINTS)
+    return [endpoint for endpoint in ENDPOINTS if any(endpoint.name.startswith(name) for name in names)]
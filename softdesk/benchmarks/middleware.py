@@ -0,0 +1,75 @@
+"""
+Per-request cost of the middleware chain.
+
+A trivial, CSRF-exempt view (like the DRF views) is served through Django's request handler with:
+- `none`: no middleware (the baseline subtracted from the others),
+- `full`: the `MIDDLEWARE` setting with Django's session, CSRF, authentication and messages middleware in place
+  of the path-aware ones, so they run on every path,
+- `path_aware`: the `MIDDLEWARE` setting, which skips them for `LEAN_PATH_PREFIXES`.
+Both chains hold the same other middleware (request log, compression...), so their difference is the skipping.
+Requests carry a JWT header and session/CSRF cookies, like a browser-based API client.
+"""
+import statistics
+import time
+
+from django.core.handlers.base import BaseHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+
+from softdesk import settings as project_settings
+
+# Path-aware middleware of `common.middleware` -> the Django class it wraps
+DJANGO_MIDDLEWARE = {
+    'common.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'common.middleware.CsrfViewMiddleware': 'django.middleware.csrf.CsrfViewMiddleware',
+    'common.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'common.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+}
+FULL_MIDDLEWARE = [DJANGO_MIDDLEWARE.get(name, name) for name in project_settings.MIDDLEWARE]
+
+STACKS = {
+    'none': [],
+    'full': FULL_MIDDLEWARE,
+    'path_aware': project_settings.MIDDLEWARE,
+}
+
+PATHS = ('/api/ping/', '/admin-ping/')
+
+
+@csrf_exempt
+def ping(request):
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+urlpatterns = [
+    path('api/ping/', ping),
+    path('admin-ping/', ping),
+]
+
+
+def _time(handler, request_path, iterations):
+    factory = RequestFactory(HTTP_AUTHORIZATION='Bearer token', HTTP_COOKIE='sessionid=abc; csrftoken=def')
+    samples = []
+    for _ in range(iterations):
+        request = factory.get(request_path)
+        start = time.perf_counter()
+        handler.get_response(request)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def run(iterations=20_000):
+    """
+    Return the median microseconds per request, keyed by `(stack, path)`, baseline included.
+    """
+    results = {}
+    for stack, middleware in STACKS.items():
+        with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__, ALLOWED_HOSTS=['testserver']):
+            handler = BaseHandler()
+            handler.load_middleware()
+            for request_path in PATHS:
+                _time(handler, request_path, iterations // 10)  # Warm-up
+                results[stack, request_path] = _time(handler, request_path, iterations)
+    return results
@@ -0,0 +1,88 @@
+"""
+SQL query-count guard for the viewset actions.
+
+Every action of `ProjectViewSet`, `IssueViewSet`, `CommentViewSet`, `UserViewSet`, `MeViewSet` and
+`ContributorViewSet`, the jobs, the delta sync, the async read views and the opening of the change feed are replayed
+against the fixed `guard` dataset. The number of queries and their normalized SQL are compared with
+`query_baseline.json`: a higher count is a regression and is reported with a diff of the queries.
+"""
+import difflib
+import json
+import re
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .endpoints import ENDPOINTS
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'query_baseline.json'
+GUARD_SCALE = 'guard'
+VIEWSET_PREFIXES = (
+    'users_', 'me_', 'projects_', 'issues_', 'comments_', 'contributors_', 'jobs_', 'sync_', 'async_', 'feed_',
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize(sql):
+    """
+    Replace literal values so that two runs produce the same statement text.
+    """
+    return _LITERALS.sub('?', sql)
+
+
+def viewset_endpoints():
+    return [endpoint for endpoint in ENDPOINTS if endpoint.name.startswith(VIEWSET_PREFIXES)]
+
+
+def capture(context):
+    """
+    Run each viewset action once and return {endpoint name: {'status', 'count', 'queries'}}.
+    """
+    client = APIClient()
+    tokens = {actor: str(AccessToken.for_user(context[actor])) for actor in ('staff', 'manager', 'contributor')}
+    captured = {}
+    for endpoint in viewset_endpoints():
+        path, body = endpoint.prepare(context)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {tokens[endpoint.actor]}'} if endpoint.actor else {}
+        with CaptureQueriesContext(connection) as queries:
+            response = client.generic(endpoint.method, path, json.dumps(body) if body is not None else '',
+                                      content_type='application/json', **headers)
+        statements = [normalize(query['sql']) for query in queries.captured_queries]
+        captured[endpoint.name] = {
+            'status': response.status_code,
+            'count': len(statements),
+            'queries': statements,
+        }
+    return captured
+
+
+def load_baseline(path=BASELINE_PATH):
+    return json.loads(Path(path).read_text())
+
+
+def write_baseline(captured, path=BASELINE_PATH):
+    Path(path).write_text(json.dumps(captured, indent=2, sort_keys=True) + '\n')
+
+
+def check(captured, baseline):
+    """
+    Return a list of failure messages, one per action whose query count went up
+    (or which is missing from the baseline).
+    """
+    failures = []
+    for name, current in captured.items():
+        pinned = baseline.get(name)
+        if pinned is None:
+            failures.append(f"{name}: no baseline recorded ({current['count']} queries).")
+            continue
+        if current['count'] <= pinned['count']:
+            continue
+        diff = '\n'.join(difflib.unified_diff(
+            pinned['queries'], current['queries'], fromfile='baseline', tofile='current', lineterm='',
+        ))
+        failures.append(f"{name}: {pinned['count']} -> {current['count']} queries\n{diff}")
+    return failures
@@ -0,0 +1,227 @@
+"""
+Benchmark runner: measures every endpoint and writes the results as JSON.
+
+Two transports are available:
+- `client`: the DRF test client, in-process. SQL queries are counted for each request.
+- `live`: a local threaded HTTP server, hit over real sockets with an optional concurrency.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles.handlers import StaticFilesHandler
+from django.db import connection, connections
+from django.test.testcases import LiveServerThread
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+class ClientTransport:
+    """
+    In-process transport based on the DRF test client.
+    """
+    name = 'client'
+    concurrency = 1
+    streaming = True  # A streaming response is returned at its headers: its content is not read
+
+    def __init__(self):
+        self.client = APIClient()
+
+    def request(self, method, path, body, token):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.client.generic(method, path, json.dumps(body) if body is not None else '',
+                                           content_type='application/json', **headers)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, len(queries)
+
+    def close(self):
+        pass
+
+
+class LiveServerTransport:
+    """
+    Transport sending real HTTP requests to a local server thread.
+    """
+    name = 'live'
+    streaming = False  # The WSGI server reads an async stream to its end, which an endless feed never reaches
+
+    def __init__(self, concurrency=1):
+        self.concurrency = concurrency
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'localhost']
+        # In-memory SQLite test databases must be shared with the server thread
+        connections_override = {}
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            connection.inc_thread_sharing()
+            connections_override['default'] = connections['default']
+        self.thread = LiveServerThread('localhost', StaticFilesHandler, connections_override)
+        self.thread.daemon = True
+        self.thread.start()
+        self.thread.is_ready.wait()
+        if self.thread.error:
+            raise self.thread.error
+        self.base_url = f'http://localhost:{self.thread.port}'
+
+    def request(self, method, path, body, token):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            status = error.code
+        return status, time.perf_counter() - start, None
+
+    def close(self):
+        self.thread.terminate()
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            connection.dec_thread_sharing()
+
+
+def _percentile(sorted_values, percent):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[percent - 1]
+
+
+def summarize(latencies, wall_time, statuses, queries):
+    """
+    Reduce raw samples to the figures stored in the results file (latencies in milliseconds).
+    """
+    ordered = sorted(latencies)
+    summary = {
+        'requests': len(ordered),
+        'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(_percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'throughput_rps': round(len(ordered) / wall_time, 2) if wall_time else None,
+        'status_codes': sorted(set(statuses)),
+    }
+    if queries and queries[0] is not None:
+        summary['queries'] = max(queries)
+    return summary
+
+
+def run_endpoint(endpoint, context, transport, tokens, iterations, warmup):
+    """
+    Measure one endpoint. Setup hooks run before the timed section.
+    """
+    for _ in range(warmup):
+        path, body = endpoint.prepare(context)
+        transport.request(endpoint.method, path, body, tokens.get(endpoint.actor))
+    prepared = [endpoint.prepare(context) for _ in range(iterations)]
+    token = tokens.get(endpoint.actor)
+
+    def send(item):
+        return transport.request(endpoint.method, item[0], item[1], token)
+
+    start = time.perf_counter()
+    if transport.concurrency > 1:
+        with ThreadPoolExecutor(max_workers=transport.concurrency) as pool:
+            samples = list(pool.map(send, prepared))
+    else:
+        samples = [send(item) for item in prepared]
+    wall_time = time.perf_counter() - start
+
+    statuses, latencies, queries = zip(*samples)
+    return summarize(latencies, wall_time, statuses, queries)
+
+
+def run(endpoints, context, transport, iterations=50, warmup=5, stdout=None):
+    """
+    Measure every endpoint and return the results keyed by endpoint name.
+    """
+    tokens = {
+        actor: str(AccessToken.for_user(context[actor]))
+        for actor in ('staff', 'manager', 'contributor')
+    }
+    results = {}
+    for endpoint in endpoints:
+        if endpoint.streaming and not transport.streaming:
+            if stdout:
+                stdout.write(f"{endpoint.name:<28} skipped (endless stream, not measurable by the {transport.name} "
+                             f"transport)")
+            continue
+        results[endpoint.name] = run_endpoint(endpoint, context, transport, tokens, iterations, warmup)
+        if stdout:
+            stdout.write(format_line(endpoint.name, results[endpoint.name]))
+    return results
+
+
+def format_line(name, summary):
+    queries = summary.get('queries')
+    return (f"{name:<28} p50={summary['p50_ms']:>9.2f}ms p95={summary['p95_ms']:>9.2f}ms "
+            f"p99={summary['p99_ms']:>9.2f}ms {summary['throughput_rps'] or 0:>9.1f} req/s "
+            f"queries={'-' if queries is None else queries:<4} status={summary['status_codes']}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def save(results, scale, transport, iterations, output=None):
+    """
+    Write the results with enough metadata to compare two commits, and return the file path.
+    """
+    revision = git_revision()
+    payload = {
+        'meta': {
+            'revision': revision,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'scale': scale,
+            'transport': transport.name,
+            'concurrency': transport.concurrency,
+            'iterations': iterations,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'endpoints': results,
+    }
+    path = Path(output) if output else RESULTS_DIR / f'{scale}-{transport.name}-{revision}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    return path
+
+
+def compare(results, baseline_path, threshold=0.2):
+    """
+    Compare results with a previous run.
+    Returns a list of (endpoint, message) for p95 latencies above `threshold` or any query count increase.
+    """
+    baseline = json.loads(Path(baseline_path).read_text())['endpoints']
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append((name, f"p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"))
+        if current.get('queries') is not None and previous.get('queries') is not None:
+            if current['queries'] > previous['queries']:
+                regressions.append((name, f"queries {previous['queries']} -> {current['queries']}"))
+    return regressions
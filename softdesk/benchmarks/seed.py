@@ -0,0 +1,158 @@
+"""
+Synthetic data generation for the benchmark suite.
+
+The generated dataset only depends on the scale and the seed, so two runs on two commits
+measure the same workload.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count
+
+from application.models import Project, Issue, Comment
+from user.models import User, Contributor
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+BATCH_SIZE = 5000
+
+# Number of rows created for each scale
+SCALES = {
+    'guard': {'users': 20, 'projects': 3, 'issues': 30, 'comments': 60},
+    'small': {'users': 100, 'projects': 20, 'issues': 1_000, 'comments': 1_000},
+    'medium': {'users': 5_000, 'projects': 500, 'issues': 100_000, 'comments': 100_000},
+    'large': {'users': 20_000, 'projects': 2_000, 'issues': 1_000_000, 'comments': 1_000_000},
+}
+
+# Upper bound of contributors per project (the distribution itself is heavy-tailed)
+MAX_CONTRIBUTORS = 200
+
+
+def _zipf_weights(count):
+    """
+    Return cumulative Zipf-like weights, so that a few rows receive most of the children.
+    """
+    cumulative = []
+    total = 0.0
+    for rank in range(count):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    return cumulative
+
+
+def _bulk_create(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        model.objects.bulk_create(rows[start:start + BATCH_SIZE], batch_size=BATCH_SIZE)
+
+
+def is_seeded():
+    return User.objects.filter(username='bench-staff').exists()
+
+
+@transaction.atomic
+def seed(scale='small', seed_value=42, stdout=None):
+    """
+    Populate the current database with a synthetic dataset.
+    - Users share the same password (`BENCHMARK_PASSWORD`) so the token endpoint can be measured.
+    - Every project has its author as MANAGER and a heavy-tailed number of contributors.
+    - Issues and comments follow a Zipf distribution over projects and issues.
+    """
+    sizes = SCALES[scale]
+    rng = random.Random(seed_value)
+    password = make_password(BENCHMARK_PASSWORD)
+
+    def log(message):
+        if stdout:
+            stdout.write(message)
+
+    # Users
+    users = [User(username='bench-staff', password=password, is_staff=True, is_superuser=True)]
+    users += [User(username=f'bench-user-{i}', password=password) for i in range(sizes['users'])]
+    _bulk_create(User, users)
+    user_ids = list(User.objects.exclude(username='bench-staff').values_list('id', flat=True))
+    log(f"{len(user_ids)} users created.")
+
+    # Projects
+    project_types = [choice for choice, _ in Project.PROJECT_TYPE_CHOICES]
+    projects = [
+        Project(name=f'Project {i}', description='Synthetic benchmark project',
+                type=rng.choice(project_types), author_id=rng.choice(user_ids))
+        for i in range(sizes['projects'])
+    ]
+    _bulk_create(Project, projects)
+    project_rows = list(Project.objects.order_by('id').values_list('id', 'author_id'))
+    log(f"{len(project_rows)} projects created.")
+
+    # Contributors: the author is manager, the others are drawn with a heavy-tailed fan-out
+    contributors = []
+    for project_id, author_id in project_rows:
+        fan_out = min(int(rng.paretovariate(1.2) * 3), MAX_CONTRIBUTORS, len(user_ids))
+        members = {author_id}
+        members.update(rng.sample(user_ids, fan_out))
+        for member_id in members:
+            role = 'MANAGER' if member_id == author_id else 'CONTRIBUTOR'
+            contributors.append(Contributor(user_id=member_id, project_id=project_id, role=role))
+    _bulk_create(Contributor, contributors)
+    members_by_project = {}
+    for contributor_id, project_id, user_id in Contributor.objects.values_list('id', 'project_id', 'user_id'):
+        members_by_project.setdefault(project_id, []).append((contributor_id, user_id))
+    log(f"{len(contributors)} contributors created.")
+
+    # Issues
+    project_ids = [project_id for project_id, _ in project_rows]
+    project_weights = _zipf_weights(len(project_ids))
+    priorities = [choice for choice, _ in Issue.ISSUE_PRIORITY_CHOICES]
+    tags = [choice for choice, _ in Issue.ISSUE_TAG_CHOICES]
+    statuses = [choice for choice, _ in Issue.ISSUE_STATUS_CHOICES]
+    for start in range(0, sizes['issues'], BATCH_SIZE):
+        batch = []
+        count = min(BATCH_SIZE, sizes['issues'] - start)
+        for offset, project_id in enumerate(rng.choices(project_ids, cum_weights=project_weights, k=count)):
+            members = members_by_project[project_id]
+            batch.append(Issue(
+                name=f'Issue {start + offset}', description='Synthetic benchmark issue',
+                priority=rng.choice(priorities), tag=rng.choice(tags), status=rng.choice(statuses),
+                author_id=rng.choice(members)[1], assignee_id=rng.choice(members)[0], project_id=project_id,
+            ))
+        Issue.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+    issue_rows = list(Issue.objects.order_by('id').values_list('id', 'project_id'))
+    log(f"{len(issue_rows)} issues created.")
+
+    # Comments
+    issue_weights = _zipf_weights(len(issue_rows))
+    for start in range(0, sizes['comments'], BATCH_SIZE):
+        batch = []
+        count = min(BATCH_SIZE, sizes['comments'] - start)
+        for issue_id, project_id in rng.choices(issue_rows, cum_weights=issue_weights, k=count):
+            batch.append(Comment(
+                description=f'Synthetic comment {start + len(batch)}',
+                author_id=rng.choice(members_by_project[project_id])[1], issue_id=issue_id,
+            ))
+        Comment.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+    log(f"{sizes['comments']} comments created.")
+
+
+def build_context():
+    """
+    Pick the rows the endpoints are measured against:
+    - the most commented issue and its project (the hottest read path),
+    - the manager of that project and one of its plain contributors, plus the staff user.
+    """
+    hot = Comment.objects.values('issue').annotate(total=Count('id')).order_by('-total').first()
+    issue = Issue.objects.select_related('project').get(pk=hot['issue'])
+    project = issue.project
+    manager = Contributor.objects.filter(project=project, role='MANAGER').select_related('user').first()
+    contributor = (Contributor.objects.filter(project=project, role='CONTRIBUTOR').select_related('user').first()
+                   or manager)
+    comment = Comment.objects.filter(issue=issue).order_by('created_time').first()
+    return {
+        'staff': User.objects.get(username='bench-staff'),
+        'manager': manager.user,
+        'contributor': contributor.user,
+        'project': project.pk,
+        'issue': issue.pk,
+        'comment': comment.pk,
+        'assignee': manager.pk,
+        'contributor_row': contributor.pk,
+        'contributor_user': contributor.user.pk,
+    }
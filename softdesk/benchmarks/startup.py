@@ -0,0 +1,76 @@
+"""
+Cold-start benchmark of a worker process, for each deployment mode.
+
+Each sample is a fresh Python interpreter that:
+- sets up Django and builds the WSGI application, then imports the root URLconf (what a worker does on boot),
+- serves a first API request (`GET /api/projects/` without credentials, answered without touching the database).
+The times, the number of imported modules and whether the documentation/admin stacks were loaded are reported.
+The `eager` mode is the reference of the lazy mounting: the `full` mode with the documentation and admin URLconfs
+imported at boot, as a plain `include()` of them would.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+MODES = ('full', 'api', 'eager')
+
+_CHILD = r'''
+import json, os, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+if os.environ.get('STARTUP_EAGER_URLS'):
+    import softdesk.urls_docs, softdesk.urls_admin
+boot = time.perf_counter() - start
+
+from django.test import RequestFactory
+from django.conf import settings
+settings.ALLOWED_HOSTS = ['testserver']
+start = time.perf_counter()
+response = application(RequestFactory().get('/api/projects/').environ, lambda status, headers: None)
+first_request = time.perf_counter() - start
+print(json.dumps({
+    'boot': boot,
+    'first_request': first_request,
+    'modules': len(sys.modules),
+    'docs_loaded': 'drf_yasg.views' in sys.modules,
+    'admin_loaded': 'application.admin' in sys.modules,
+}))
+'''
+
+
+def sample(mode):
+    env = dict(os.environ, SOFTDESK_DEPLOYMENT_MODE='full' if mode == 'eager' else mode,
+               DJANGO_SETTINGS_MODULE='softdesk.settings')
+    if mode == 'eager':
+        env['STARTUP_EAGER_URLS'] = '1'
+    result = subprocess.run([sys.executable, '-c', _CHILD], cwd=settings.BASE_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(repeat=5, modes=MODES):
+    """
+    Return the median figures (milliseconds) of `repeat` cold starts for each mode.
+    The modes are sampled in turn, so that a drift of the machine affects them alike.
+    """
+    runs = {mode: [] for mode in modes}
+    for _ in range(repeat):
+        for mode in modes:
+            runs[mode].append(sample(mode))
+    results = {}
+    for mode, samples in runs.items():
+        results[mode] = {
+            'boot_ms': round(statistics.median(s['boot'] for s in samples) * 1000, 1),
+            'first_request_ms': round(statistics.median(s['first_request'] for s in samples) * 1000, 1),
+            'modules': samples[-1]['modules'],
+            'docs_loaded': samples[-1]['docs_loaded'],
+            'admin_loaded': samples[-1]['admin_loaded'],
+        }
+    return results
@@ -0,0 +1,21 @@
+from django.test import TransactionTestCase
+
+from . import querycount, seed
+
+
+class QueryCountGuardTests(TransactionTestCase):
+    """
+    `manage.py check_query_counts` as a test: every viewset action is replayed against the `guard` dataset
+    and must not run more queries than recorded in `query_baseline.json`.
+    Transactional, so the actions run in autocommit like in production (no test savepoints in the counts).
+    """
+
+    def test_viewset_actions_within_their_query_budget(self):
+        seed.seed(querycount.GUARD_SCALE)
+        captured = querycount.capture(seed.build_context())
+        failures = querycount.check(captured, querycount.load_baseline())
+        self.assertEqual(failures, [], '\n\n'.join(failures))
+
+    def test_every_action_has_a_baseline(self):
+        names = {endpoint.name for endpoint in querycount.viewset_endpoints()}
+        self.assertEqual(names - set(querycount.load_baseline()), set())
@@ -0,0 +1,76 @@
+"""
+Microbenchmark of one throttle check, the cost added to every API request.
+
+Compares the token buckets of `common.throttling` (in-process dictionary and Django cache) with DRF's
+`UserRateThrottle`, which keeps the log of the request times of the window in the cache.
+Each check runs against the same client key, with a budget large enough that every request is allowed,
+so the request log of DRF grows to its steady-state size for the budget.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import UserRateThrottle
+from rest_framework.views import APIView
+
+from common import throttling
+from user.models import User
+
+
+class _View(APIView):
+    throttle_scope = 'read'
+
+
+def _request():
+    request = APIRequestFactory().get('/api/projects/')
+    request.user = User(pk=1, username='bench-throttle')
+    return request
+
+
+def _time(throttle, request, iterations):
+    view = _View()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        throttle.allow_request(request, view)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _bucket(store, request, iterations):
+    throttling._store = store
+    try:
+        return _time(throttling.BucketThrottle(), request, iterations)
+    finally:
+        throttling._store = None
+
+
+class _UserRateThrottle(UserRateThrottle):
+    scope = 'read'
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+
+
+def run(iterations=100_000, rate=None):
+    """
+    Return the mean microseconds per check, keyed by implementation.
+    """
+    rate = rate or f'{iterations * 10}/d'
+    rest_framework = {**settings.REST_FRAMEWORK,
+                      'DEFAULT_THROTTLE_RATES': {**api_settings.DEFAULT_THROTTLE_RATES, 'read': rate}}
+    request = _request()
+    with override_settings(THROTTLE_ENABLED=True, REST_FRAMEWORK=rest_framework):
+        try:
+            cache.clear()
+            results = {
+                'bucket_in_memory': _bucket(throttling.InMemoryBucketStore(), request, iterations),
+                'bucket_cache': _bucket(throttling.CacheBucketStore(), request, iterations),
+            }
+            cache.clear()
+            # DRF's sliding log is O(window) per check: limit it to the number of requests of one window
+            results['drf_sliding_log'] = _time(_UserRateThrottle(), request, min(iterations, 10_000))
+        finally:
+            cache.clear()
+    return results
@@ -0,0 +1,84 @@
+"""
+Insert benchmark of the `Comment` primary key: random UUIDv4 versus time-ordered UUIDv7.
+
+Both key kinds insert the same number of comments into an empty table, by committed batches.
+For each kind, the insert throughput is measured, then the size of the primary-key index and the
+share of unused space in its pages (random keys split pages all over the B-tree and leave them half-full).
+"""
+import time
+import uuid
+
+from django.db import connection, transaction
+
+from application.models import Project, Issue, Comment
+from common.uuid7 import uuid7
+from user.models import User, Contributor
+
+KEY_FACTORIES = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+def _fixture():
+    user = User.objects.create(username='bench-uuid-keys')
+    project = Project.objects.create(name='UUID keys', description='Benchmark', type='BACKEND', author=user)
+    contributor = Contributor.objects.create(user=user, project=project, role='MANAGER')
+    return Issue.objects.create(name='UUID keys', priority='LOW', tag='TASK', status='TO_DO', author=user,
+                                project=project, assignee=contributor)
+
+
+def index_size(model):
+    """
+    Return `(bytes, unused_ratio)` of the primary-key index, or `(None, None)` if the database can't tell.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            index = next((row[1] for row in cursor.execute(f'PRAGMA index_list({table})') if row[3] == 'pk'), None)
+            if index is None:
+                return None, None
+            try:
+                cursor.execute('SELECT SUM(pgsize), SUM(unused) FROM dbstat WHERE name = %s', [index])
+            except Exception:  # SQLite built without the dbstat virtual table
+                return None, None
+            size, unused = cursor.fetchone()
+            return size, round(unused / size, 3) if size else None
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_relation_size(indexrelid) FROM pg_index '
+                           'WHERE indrelid = %s::regclass AND indisprimary', [table])
+            return cursor.fetchone()[0], None
+    return None, None
+
+
+def run(rows=100_000, batch_size=1000):
+    """
+    Return the results keyed by key kind.
+    """
+    issue = _fixture()
+    results = {}
+    for kind, factory in KEY_FACTORIES.items():
+        Comment.objects.all().delete()
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            with transaction.atomic():
+                Comment.objects.bulk_create([
+                    Comment(id=factory(), description=f'Comment {offset + i}', author_id=issue.author_id,
+                            issue=issue)
+                    for i in range(min(batch_size, rows - offset))
+                ])
+        elapsed = time.perf_counter() - start
+
+        size, unused = index_size(Comment)
+        results[kind] = {
+            'rows': rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed, 1),
+            'index_bytes': size,
+            'index_unused_ratio': unused,
+        }
+    return results
@@ -0,0 +1,178 @@
+"""
+Admin building blocks for large tables.
+
+- `BoundedCountPaginator`: counts at most `ADMIN_COUNT_LIMIT` rows; beyond, an unfiltered list shows the
+  planner's estimate of the table size instead of running `COUNT(*)` over it.
+- `related_id_filter`: list filter on a foreign key taking an id, instead of rendering every related row.
+- `PaginatedInlineMixin`: inline showing the related rows one page at a time.
+- `ScalableModelAdmin`: model admin using the paginator and skipping the second, unfiltered count.
+- `TombstoneDeleteMixin`: model admin deleting through one of the `application.cascade` helpers.
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.paginator import Paginator
+from django.db import connection
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+
+def estimated_count(model):
+    """
+    Return the planner's estimate of the number of rows of `model`'s table, or None if the database can't tell.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'sqlite':
+            # Filled by ANALYZE; the first number of `stat` is the number of rows of the table (or of its index)
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s ORDER BY idx IS NOT NULL LIMIT 1', [table])
+            except Exception:  # ANALYZE never ran
+                return None
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+        elif connection.vendor == 'mysql':
+            cursor.execute('SELECT table_rows FROM information_schema.tables '
+                           'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class BoundedCountPaginator(Paginator):
+    """
+    Paginator whose count stops at `ADMIN_COUNT_LIMIT` rows.
+    When the limit is reached on an unfiltered queryset, the count is the estimated table size (if larger).
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        count = self.object_list.order_by()[:limit].count()
+        if count < limit:
+            return count
+        query = self.object_list.query
+        if not query.where:
+            return max(count, estimated_count(self.object_list.model) or 0)
+        return count
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    Model admin for tables that may hold millions of rows.
+    Subclasses should also set `list_select_related` to the foreign keys of `list_display`.
+    """
+    paginator = BoundedCountPaginator
+    show_full_result_count = False  # Skip the COUNT(*) of the whole table shown next to the filtered count
+
+
+def related_id_filter(field_name, title):
+    """
+    Return a list filter on the foreign key `field_name`, taking the id of the related row in a text input.
+    """
+
+    class RelatedIdFilter(admin.SimpleListFilter):
+        template = 'admin/softdesk/related_id_filter.html'
+        parameter_name = f'{field_name}_id'
+
+        def lookups(self, request, model_admin):
+            return ()
+
+        def has_output(self):
+            return True
+
+        def queryset(self, request, queryset):
+            if not self.value():
+                return queryset
+            try:
+                return queryset.filter(**{f'{field_name}_id': int(self.value())})
+            except ValueError:
+                raise IncorrectLookupParameters(f"{self.parameter_name} must be an id.")
+
+        def choices(self, changelist):
+            # Other parameters of the list, kept when the input is submitted
+            self.hidden_params = [(name, value) for name, value in changelist.params.items()
+                                  if name != self.parameter_name]
+            yield {
+                'selected': self.value() is None,
+                'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+                'display': _('All'),
+            }
+
+    RelatedIdFilter.title = title
+    return RelatedIdFilter
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset editing one page of the related rows; the other pages are reached with `page_param`.
+    """
+    page = 1
+    per_page = 20
+    page_param = 'page'
+    query = None  # Query string of the change page
+
+    def get_queryset(self):
+        if not hasattr(self, '_page_queryset'):
+            start = (self.page - 1) * self.per_page
+            self._page_queryset = super().get_queryset()[start:start + self.per_page]
+        return self._page_queryset
+
+    @cached_property
+    def page_count(self):
+        return max(1, -(-self.queryset.count() // self.per_page))
+
+    def page_url(self, page):
+        query = self.query.copy()
+        query[self.page_param] = page
+        return f'?{query.urlencode()}'
+
+    @property
+    def previous_url(self):
+        return self.page_url(self.page - 1) if self.page > 1 else None
+
+    @property
+    def next_url(self):
+        return self.page_url(self.page + 1) if self.page < self.page_count else None
+
+
+class PaginatedInlineMixin:
+    """
+    Mixin for `InlineModelAdmin` classes showing `per_page` related rows at a time
+    (page selected by the `<model>_page` query parameter of the change page).
+    """
+    formset = PaginatedInlineFormSet
+    per_page = 20
+    template = 'admin/softdesk/paginated_tabular.html'
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        page_param = f'{self.model._meta.model_name}_page'
+        try:
+            page = max(int(request.GET.get(page_param, 1)), 1)
+        except ValueError:
+            page = 1
+        return type(formset.__name__, (formset,), {
+            'page': page,
+            'per_page': self.per_page,
+            'page_param': page_param,
+            'query': request.GET,
+        })
+
+
+class TombstoneDeleteMixin:
+    """
+    Admin deletes go through the `application.cascade` helpers, like the API: they write the sync-log tombstones
+    of the deleted rows (and of their cascade) in bulk and drop the cached bootstrap payloads of the members.
+    """
+    delete_rows = None  # One of the `cascade.delete_*` helpers, as a staticmethod
+
+    def delete_model(self, request, obj):
+        self.delete_rows([obj])
+
+    def delete_queryset(self, request, queryset):
+        self.delete_rows(queryset)
@@ -0,0 +1,214 @@
+"""
+Batch endpoint: several API calls in one HTTP round trip.
+
+`POST /api/batch/` receives a list of sub-requests against the existing routes. They are resolved with the
+URL resolver and run in-process:
+- the JWT is checked once, by the batch itself: sub-requests are force-authenticated with its user,
+- the membership checks of the permission classes and the project, issue and membership checks explaining a 403
+  are shared between sub-requests (`common.lookups`); reads check membership inside their own statement,
+- consecutive reads (GET, HEAD, OPTIONS) run concurrently in a thread pool of `BATCH_MAX_WORKERS`,
+  writes run one at a time, in order, and clear the shared lookups.
+"""
+import contextvars
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import lookups
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ALLOWED_METHODS = (*SAFE_METHODS, 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Entries of the request META copied to the sub-requests
+INHERITED_META = ('HTTP_HOST', 'SERVER_NAME', 'SERVER_PORT', 'REMOTE_ADDR', 'HTTP_USER_AGENT', 'wsgi.url_scheme')
+
+
+class BatchError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _error(status_code, detail):
+    return {'status': status_code, 'headers': {}, 'body': {'detail': detail}}
+
+
+def validate(items):
+    """
+    Check the shape of the sub-requests. Returns a list of (method, path, body) tuples.
+    """
+    if not isinstance(items, list) or not items:
+        raise BatchError(status.HTTP_400_BAD_REQUEST, "`requests` must be a non-empty list.")
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(status.HTTP_400_BAD_REQUEST,
+                         f"A batch is limited to {settings.BATCH_MAX_REQUESTS} requests.")
+    calls = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise BatchError(status.HTTP_400_BAD_REQUEST, f"Request {index}: `path` is required.")
+        method = str(item.get('method', 'GET')).upper()
+        if method not in ALLOWED_METHODS:
+            raise BatchError(status.HTTP_400_BAD_REQUEST, f"Request {index}: method {method} is not allowed.")
+        calls.append((method, item['path'], item.get('body')))
+    return calls
+
+
+class Batch:
+    """
+    Run the sub-requests of one batch on behalf of the authenticated parent request.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        meta = request.META
+        self.factory = RequestFactory(**{key: meta[key] for key in INHERITED_META if key in meta})
+
+    def call(self, method, path, body):
+        """
+        Run one sub-request and return its response as a dict.
+        """
+        route = urlsplit(path).path
+        if not route.startswith('/api/') or route.startswith(('/api/batch/', '/api/async/')):
+            return _error(status.HTTP_400_BAD_REQUEST, "Only the synchronous /api/ routes can be batched.")
+        try:
+            match = resolve(route)
+        except Resolver404:
+            return _error(status.HTTP_404_NOT_FOUND, "Not found.")
+        if iscoroutinefunction(match.func):
+            return _error(status.HTTP_400_BAD_REQUEST, "Only the synchronous /api/ routes can be batched.")
+
+        data = json.dumps(body) if body is not None else ''
+        sub_request = self.factory.generic(method, path, data, content_type='application/json')
+        # Authenticated once, by the batch request
+        sub_request._force_auth_user = self.request.user
+        sub_request._force_auth_token = self.request.auth
+
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception:  # One failing sub-request must not fail the whole batch
+            logger.exception("Batch sub-request %s %s failed", method, path)
+            return _error(status.HTTP_500_INTERNAL_SERVER_ERROR, "Server error.")
+        if hasattr(response, 'render'):
+            response.render()
+        content_type = response.get('Content-Type', '')
+        if 'json' in content_type and response.content:
+            payload = json.loads(response.content)
+        else:
+            payload = response.content.decode(response.charset or 'utf-8') or None
+        headers = {name: value for name, value in response.items() if name in ('Location', 'Content-Type')}
+        return {'status': response.status_code, 'headers': headers, 'body': payload}
+
+    def _call_in_thread(self, context, method, path, body):
+        try:
+            return context.run(self.call, method, path, body)
+        finally:
+            # Each worker thread has its own database connection
+            connection.close()
+
+    def run_reads(self, pool, calls):
+        if pool is None or len(calls) == 1:
+            return [self.call(*call) for call in calls]
+        # One context per call (a context can't be entered by two threads); they all hold the same lookups memo
+        contexts = [contextvars.copy_context() for _ in calls]
+        return list(pool.map(lambda context, call: self._call_in_thread(context, *call), contexts, calls))
+
+    def run(self, calls):
+        """
+        Run the calls: groups of consecutive reads concurrently, writes in order.
+        """
+        results = []
+        workers = settings.BATCH_MAX_WORKERS
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 and not self._in_memory_db() else None
+        try:
+            with lookups.shared_lookups():
+                reads = []
+                for call in calls:
+                    if call[0] in SAFE_METHODS:
+                        reads.append(call)
+                        continue
+                    results += self.run_reads(pool, reads) if reads else []
+                    reads = []
+                    results.append(self.call(*call))
+                    lookups.clear()
+                results += self.run_reads(pool, reads) if reads else []
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return results
+
+    @staticmethod
+    def _in_memory_db():
+        # An in-memory SQLite database can't be opened from other threads
+        return connection.vendor == 'sqlite' and connection.is_in_memory_db()
+
+
+class BatchView(APIView):
+    """
+    Multiplex several API calls in one HTTP request.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'bulk'
+
+    @swagger_auto_schema(
+        operation_summary="Batch of API calls",
+        tags=["Batch"],
+        operation_description=(
+                "Run several calls to the `/api/` routes in one round trip and return all the responses, "
+                "in the order of the requests.\n"
+                "- Each sub-request has a `method` (default `GET`), a `path` (with its query string) "
+                "and an optional JSON `body`.\n"
+                "- Sub-requests run with the permissions of the authenticated user; each one gets its own "
+                "status code, so one failure does not stop the batch.\n"
+                "- Consecutive reads run concurrently; writes run in order.\n"
+                "- At most `BATCH_MAX_REQUESTS` sub-requests per batch.\n"
+                "- Throttled with the `bulk` budget; each sub-request also counts in the `read` or `write` budget.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAuthenticated`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['requests'],
+            properties={
+                'requests': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['path'],
+                    properties={
+                        'method': openapi.Schema(type=openapi.TYPE_STRING, default='GET'),
+                        'path': openapi.Schema(type=openapi.TYPE_STRING, example='/api/projects/1/issues/'),
+                        'body': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    },
+                )),
+            },
+        ),
+        responses={
+            200: openapi.Response(description="One `{status, headers, body}` entry per sub-request."),
+            400: openapi.Response(description="Bad Request. Malformed or too large batch."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            429: openapi.Response(description="Too Many Requests. Retry after the `Retry-After` delay."),
+        },
+    )
+    def post(self, request):
+        try:
+            calls = validate(request.data.get('requests') if isinstance(request.data, dict) else None)
+        except BatchError as error:
+            return Response({'detail': error.detail}, status=error.status_code)
+        return Response({'responses': Batch(request).run(calls)})
@@ -0,0 +1,187 @@
+"""
+Response compression negotiated by `Accept-Encoding`: zstd and brotli when their packages (`zstandard`, `brotli`)
+are installed, gzip otherwise.
+
+- Only the types of `COMPRESSION_CONTENT_TYPES` are compressed (JSON and the event streams). HTML pages are not: the
+  admin pages carry CSRF tokens, which compression would expose to BREACH-style attacks.
+- Responses smaller than `COMPRESSION_MIN_SIZE` bytes are sent as is: the headers would cost more than the savings.
+- Streaming responses are compressed chunk by chunk and each chunk is flushed, so the events of a stream (the
+  project feed) reach the client without waiting for the next ones.
+
+`python manage.py benchmark_compression` measures the size and CPU time of each codec on the API payloads.
+"""
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # Optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional
+    zstandard = None
+
+_ACCEPT_ENCODING = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+class Codec:
+    name = None
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        raise NotImplementedError
+
+    def compressor(self):
+        """
+        Return `(compress, finish)`: `compress(chunk)` returns the compressed chunk, flushed; `finish()` the end.
+        """
+        raise NotImplementedError
+
+    def stream(self, chunks):
+        compress, finish = self.compressor()
+        for chunk in chunks:
+            yield compress(chunk)
+        yield finish()
+
+
+class Gzip(Codec):
+    name = 'gzip'
+
+    def compress(self, data):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31: gzip container
+        return compressor.compress(data) + compressor.flush()
+
+    def compressor(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class Brotli(Codec):
+    name = 'br'
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+
+class Zstd(Codec):
+    name = 'zstd'
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(flush_block)), compressor.flush
+
+
+CODECS = {'gzip': Gzip}
+if brotli is not None:
+    CODECS['br'] = Brotli
+if zstandard is not None:
+    CODECS['zstd'] = Zstd
+
+
+def available_codecs():
+    """
+    Codecs of `COMPRESSION_ENCODINGS` (in order of preference) whose package is installed, at their level.
+    """
+    return [CODECS[name](settings.COMPRESSION_LEVELS[name])
+            for name in settings.COMPRESSION_ENCODINGS if name in CODECS]
+
+
+def negotiate(accept_encoding, codecs):
+    """
+    The codec the client prefers (highest `q`), the server's preference breaking ties; None for identity.
+    """
+    weights = {}
+    for name, weight in _ACCEPT_ENCODING.findall(accept_encoding.lower()):
+        try:
+            weights[name] = float(weight) if weight else 1.0
+        except ValueError:
+            continue
+    best, best_weight = None, 0
+    for codec in codecs:
+        weight = weights.get(codec.name, weights.get('*', 0))
+        if weight > best_weight:
+            best, best_weight = codec, weight
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress the responses with the best codec accepted by the client.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.codecs = available_codecs()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = negotiate(request.headers.get('Accept-Encoding', ''), self.codecs)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                content = response.streaming_content
+                compress, finish = codec.compressor()
+
+                async def compressed():
+                    async for chunk in content:
+                        yield compress(chunk)
+                    yield finish()
+
+                response.streaming_content = compressed()
+            else:
+                response.streaming_content = codec.stream(response.streaming_content)
+            response.headers.pop('Content-Length', None)
+        else:
+            content = codec.compress(response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # The representation changed: a strong validator of the uncompressed body no longer matches it
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec.name
+        return response
+
+    @staticmethod
+    def compressible(response):
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
@@ -0,0 +1,114 @@
+"""
+`Idempotency-Key` support for the create actions.
+
+A client retrying a `POST` sends the same `Idempotency-Key` header. The first successful response to a key is kept
+in the `IDEMPOTENCY_CACHE` cache for `IDEMPOTENCY_TTL` seconds (status, `Location` and the zlib-compressed JSON
+data); the retries get it back, with an `Idempotent-Replayed: true` header, without running the validation or the
+writes again. Keys are scoped to the user (the client IP for anonymous requests) and to the URL.
+- a retry sent while the first request is still running gets a `409 Conflict`,
+- a key reused with a different payload gets a `422 Unprocessable Entity`,
+- failed requests are not kept: they can be retried with the same key.
+"""
+import functools
+import hashlib
+import json
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_KEY_PARAMETER = openapi.Parameter(
+    HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+    description="Unique key of the request (e.g. a UUID): a retry with the same key gets the first response back "
+                "instead of creating the object again.",
+)
+IDEMPOTENCY_RESPONSES = {
+    409: openapi.Response(description="Conflict. A request with this Idempotency-Key is still in progress."),
+    422: openapi.Response(description="Unprocessable Entity. This Idempotency-Key was used with another payload."),
+}
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still in progress."
+    default_code = 'idempotency_conflict'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used with a different payload."
+    default_code = 'idempotency_key_reused'
+
+
+def _cache_key(request, key):
+    scope = request.user.pk if request.user.is_authenticated else f"ip:{request.META.get('REMOTE_ADDR')}"
+    digest = hashlib.sha256(f"{scope}\0{request.path}\0{key}".encode()).hexdigest()
+    return f"idempotency:{digest}"
+
+
+def _fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):  # QueryDict of a form or multipart request
+        data = dict(data.lists())
+    return hashlib.sha256(json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        raise IdempotencyKeyReused()
+    if 'status' not in stored:
+        raise IdempotencyConflict()
+    headers = {'Idempotent-Replayed': 'true'}
+    if stored['location']:
+        headers['Location'] = stored['location']
+    return Response(json.loads(zlib.decompress(stored['data'])), status=stored['status'], headers=headers)
+
+
+def idempotent(create):
+    """
+    Decorator of a create action: honour the `Idempotency-Key` header of the request.
+    """
+    @functools.wraps(create)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return create(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+            raise ValidationError({HEADER: f"Must be 1 to {MAX_KEY_LENGTH} printable characters."})
+
+        cache = caches[settings.IDEMPOTENCY_CACHE]
+        cache_key = _cache_key(request, key)
+        fingerprint = _fingerprint(request)
+        # Claim the key; the marker expires if the worker dies before the response is stored
+        if not cache.add(cache_key, {'fingerprint': fingerprint}, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+            if not cache.add(cache_key, {'fingerprint': fingerprint}, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                raise IdempotencyConflict()
+
+        try:
+            response = create(self, request, *args, **kwargs)
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+        if status.is_success(response.status_code):
+            cache.set(cache_key, {
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'location': response.get('Location'),
+                'data': zlib.compress(json.dumps(response.data, cls=JSONEncoder).encode()),
+            }, settings.IDEMPOTENCY_TTL)
+        else:
+            cache.delete(cache_key)
+        return response
+
+    return wrapper
@@ -0,0 +1,108 @@
+"""
+Structured, non-blocking logging.
+
+- `BackgroundHandler`: the handler of the `LOGGING` setting. Request threads only put the records on a bounded
+  queue; a background thread formats and writes them. When the queue is full, records are dropped (and counted)
+  rather than blocking the request.
+- `JSONFormatter`: one JSON object per line, with the `extra` fields of the record.
+- `RequestIdFilter`: adds the id of the current request (`X-Request-ID`, set by `RequestLogMiddleware`).
+- `SamplingFilter`: keeps only a share of the records below WARNING of the high-volume loggers (`LOG_SAMPLING`).
+  The decision is made per request id, so a sampled request keeps all its records.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+request_id = ContextVar('request_id', default=None)
+
+# Attributes of every LogRecord; the others come from `extra`
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        elif record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id.get() or getattr(getattr(record, 'request', None), 'request_id', None)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    `rates` maps logger names (and their children) to the share of their records kept below WARNING.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def rate(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        if rate >= 1:
+            return True
+        current = request_id.get()
+        draw = zlib.crc32(current.encode()) / 0xFFFFFFFF if current else random.random()
+        return draw < rate
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queue the records for a background thread writing them as JSON lines to `stream`.
+    Filters of this handler run in the calling thread (before the request id is lost).
+    """
+
+    def __init__(self, stream=None, maxsize=10_000):
+        super().__init__(queue.Queue(maxsize))
+        target = logging.StreamHandler(stream)
+        target.setFormatter(JSONFormatter())
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, target)
+        self.listener.start()
+        atexit.register(self.listener.stop)  # Flush the queue at exit
+
+    def prepare(self, record):
+        # Merge the arguments and render the traceback now: the formatting itself happens in the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
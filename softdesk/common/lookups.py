@@ -0,0 +1,40 @@
+"""
+Lookups shared by the sub-requests of a batch (`POST /api/batch/`).
+
+Inside `shared_lookups()`, `memoize` keeps the result of each lookup so that sub-requests about the same objects
+only query them once: the membership check of `IsProjectContributorOrAdmin`, and the membership, project and issue
+checks of `common.visibility.explain_denial`. The viewsets' reads need no lookup to share: their membership check
+is an `EXISTS` subquery of the statement fetching the rows. Outside of a batch, `memoize` just
+calls the loader. The batch clears the memo after each write sub-request, so reads never see stale rows.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_lookups = ContextVar('shared_lookups', default=None)
+
+
+@contextmanager
+def shared_lookups():
+    token = _lookups.set({})
+    try:
+        yield
+    finally:
+        _lookups.reset(token)
+
+
+def clear():
+    memo = _lookups.get()
+    if memo is not None:
+        memo.clear()
+
+
+def memoize(key, loader):
+    """
+    Return `loader()`, computed once per key within the current batch. Exceptions are not memoized.
+    """
+    memo = _lookups.get()
+    if memo is None:
+        return loader()
+    if key not in memo:
+        memo[key] = loader()
+    return memo[key]
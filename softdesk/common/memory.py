@@ -0,0 +1,189 @@
+"""
+Per-request memory allocation tracking.
+
+With `MEMORY_TRACKING_ENABLED`, `tracemalloc` traces the allocations of the process and `MemoryTrackingMiddleware`
+measures the requests, one at a time (the peak of `tracemalloc` is global to the process: the requests arriving
+while another one is measured are served without being measured):
+- the peak of memory allocated while serving the request, and the memory still held by the response (its data
+  and rendered content), returned in the `X-Memory-Peak` and `X-Memory-Retained` headers (bytes),
+- the allocation sites of the memory held by the response, attributed to the innermost frame of the project's code.
+
+The measures are aggregated per view action in the process and reported to the staff by `GET /api/memory/`.
+When the mode is disabled, the middleware removes itself from the chain and `tracemalloc` is not started.
+"""
+import threading
+import tracemalloc
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .profiling import PROJECT_DIR, relative_path, view_name
+
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def allocation_site(traceback):
+    """
+    `path.py:line` of the innermost frame of the project's code (the innermost frame if none).
+    """
+    for frame in reversed(traceback):
+        if frame.filename.startswith(PROJECT_DIR) and 'site-packages' not in frame.filename:
+            break
+    else:
+        frame = traceback[-1]
+    return f"{relative_path(frame.filename)}:{frame.lineno}"
+
+
+def allocation_sites(before, after):
+    """
+    {site: bytes} of the memory allocated between the two snapshots and still held.
+    """
+    sites = Counter()
+    for diff in after.compare_to(before, 'traceback'):
+        if diff.size_diff > 0:
+            sites[allocation_site(diff.traceback)] += diff.size_diff
+    return sites
+
+
+class MemoryReport:
+    """
+    Measures aggregated per view action.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.actions = {}
+
+    def record(self, action, peak, retained, sites):
+        with self.lock:
+            entry = self.actions.setdefault(action, {
+                'count': 0, 'peak_total': 0, 'peak_max': 0, 'retained_total': 0, 'retained_max': 0, 'sites': Counter(),
+            })
+            entry['count'] += 1
+            entry['peak_total'] += peak
+            entry['peak_max'] = max(entry['peak_max'], peak)
+            entry['retained_total'] += retained
+            entry['retained_max'] = max(entry['retained_max'], retained)
+            entry['sites'].update(sites)
+
+    def report(self):
+        """
+        Actions with the highest peak first; sizes in bytes, sites with their mean size per request.
+        """
+        with self.lock:
+            return [{
+                'action': action,
+                'count': entry['count'],
+                'peak_mean': entry['peak_total'] // entry['count'],
+                'peak_max': entry['peak_max'],
+                'retained_mean': entry['retained_total'] // entry['count'],
+                'retained_max': entry['retained_max'],
+                'sites': [{'site': site, 'size_mean': size // entry['count']}
+                          for site, size in entry['sites'].most_common(settings.MEMORY_TRACKING_TOP_SITES)],
+            } for action, entry in sorted(self.actions.items(), key=lambda item: -item[1]['peak_max'])]
+
+    def clear(self):
+        with self.lock:
+            self.actions.clear()
+
+
+memory_report = MemoryReport()
+
+
+class MemoryTrackingMiddleware:
+    """
+    Measure the memory allocated by each request (one at a time) while the tracking mode is enabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_TRACKING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.lock = threading.Lock()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACKING_FRAMES)
+
+    def __call__(self, request):
+        if not self.lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            response = self.get_response(request)
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        finally:
+            self.lock.release()
+        peak, retained = peak - start, max(current - start, 0)
+        memory_report.record(view_name(request), peak, retained, allocation_sites(before, after))
+        response['X-Memory-Peak'] = str(peak)
+        response['X-Memory-Retained'] = str(retained)
+        return response
+
+
+class MemoryReportView(APIView):
+    """
+    Memory allocated per view action, measured by this process.
+    """
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Memory allocation report",
+        tags=["Monitoring"],
+        operation_description=(
+                "Memory allocated by the requests measured by this server process (`MEMORY_TRACKING_ENABLED`), "
+                "per view action, highest peak first: number of requests, mean and maximum peak, mean and maximum "
+                "memory held by the response, and the allocation sites of that memory in the project's code. "
+                "Sizes are in bytes.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAdminUser`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        responses={
+            200: openapi.Response(description="Memory allocated per view action."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            403: openapi.Response(description="Forbidden. Administrators only."),
+        },
+    )
+    def get(self, request):
+        return Response({
+            'enabled': settings.MEMORY_TRACKING_ENABLED,
+            'results': memory_report.report(),
+        })
+
+    @swagger_auto_schema(
+        operation_summary="Reset the memory allocation report",
+        tags=["Monitoring"],
+        operation_description=(
+                "Forget the measures recorded by this server process.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAdminUser`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        responses={
+            204: openapi.Response(description="Report cleared."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            403: openapi.Response(description="Forbidden. Administrators only."),
+        },
+    )
+    def delete(self, request):
+        memory_report.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,140 @@
+"""
+Request logging, and path-aware variants of the browser middleware.
+
+`RequestLogMiddleware` (first in `MIDDLEWARE`) tags each request with an id for the log records (`common.log`).
+
+The `/api/` routes are authenticated by JWT only (DRF views are CSRF-exempt), so the session, CSRF,
+authentication and messages middleware have nothing to do there. The classes below skip their hooks for the
+paths starting with one of `LEAN_PATH_PREFIXES`, and behave like Django's everywhere else (`/admin/`,
+`/api-auth/`, documentation). They subclass Django's classes, so the admin's dependency checks still pass.
+"""
+import logging
+import re
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware as BaseMessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import log
+
+requests_logger = logging.getLogger('softdesk.requests')
+auth_logger = logging.getLogger('softdesk.auth')
+
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def is_lean(request):
+    return request.path_info.startswith(settings.LEAN_PATH_PREFIXES)
+
+
+class LeanPathMixin:
+    """
+    Bypass the middleware (request and response hooks) for the lean paths.
+    """
+
+    def __call__(self, request):
+        if is_lean(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(LeanPathMixin, BaseSessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(LeanPathMixin, BaseCsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Registered by the handler itself, so it runs even when `__call__` is bypassed
+        if is_lean(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(LeanPathMixin, BaseAuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(LeanPathMixin, BaseMessageMiddleware):
+    pass
+
+
+def _user_id(request):
+    """
+    Id of the user if already authenticated (by DRF or the auth middleware), without triggering a lookup.
+    """
+    user = vars(request).get('user')
+    if isinstance(user, SimpleLazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+    return getattr(user, 'pk', None)
+
+
+class RequestLogMiddleware:
+    """
+    Give each request an id, the client's `X-Request-ID` if valid or a new one. The id is returned in the
+    response and added to the log records of the request. Log the request (INFO, sampled), slow requests
+    (`SLOW_REQUEST_THRESHOLD` seconds) and authentication failures (WARNING).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = log.request_id.set(self.get_request_id(request))
+        try:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            self.log_request(request, response, time.perf_counter() - start)
+            return response
+        finally:
+            log.request_id.reset(token)
+
+    async def __acall__(self, request):
+        token = log.request_id.set(self.get_request_id(request))
+        try:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+            self.log_request(request, response, time.perf_counter() - start)
+            return response
+        finally:
+            log.request_id.reset(token)
+
+    @staticmethod
+    def get_request_id(request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id  # For the records logged by the handler, after the middleware
+        return request_id
+
+    @staticmethod
+    def log_request(request, response, duration):
+        response['X-Request-ID'] = log.request_id.get()
+        extra = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'user': _user_id(request),
+        }
+        if response.status_code == 401:
+            auth_logger.warning("Authentication failed", extra={**extra, 'event': 'auth_failure',
+                                                                'ip': request.META.get('REMOTE_ADDR')})
+        elif duration >= settings.SLOW_REQUEST_THRESHOLD:
+            requests_logger.warning("Slow request", extra={**extra, 'event': 'slow_request'})
+        else:
+            requests_logger.info("%s %s", request.method, request.path, extra=extra)
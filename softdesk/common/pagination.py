@@ -0,0 +1,31 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Cursor pagination on the primary key, only applied when the client asks for it
+    (`?page_size=` or `?cursor=`), so existing clients keep receiving the full list.
+    - The position is the last primary key of the page: the next page is an index range scan,
+      whatever the depth, and rows inserted meanwhile are neither skipped nor repeated.
+    - The key must be time-ordered (e.g. UUIDv7) for the pages to follow creation time.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class AssignedIssuePagination(CursorPagination):
+    """
+    Cursor pagination of `GET /api/me/issues/`, newest first: the position is the creation time of the last issue
+    of the page, the last column of the `(assignee, status, created_time)` index.
+    """
+    ordering = ('-created_time', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,7 +1,21 @@
+import logging
+
 from rest_framework.permissions import BasePermission
 from rest_framework.exceptions import PermissionDenied
 from user.models import Contributor
 from application.models import Project
+from .lookups import memoize
+
+logger = logging.getLogger('softdesk.permissions')
+
+
+def log_decision(rule, user, allowed, **extra):
+    """
+    Log a permission decision: granted at INFO (sampled, see `LOG_SAMPLING`), denied at WARNING.
+    """
+    logger.log(logging.INFO if allowed else logging.WARNING, "Permission %s by %s",
+               'granted' if allowed else 'denied', rule,
+               extra={'event': 'permission', 'rule': rule, 'user': user.pk, 'allowed': allowed, **extra})
 
 
 class IsAccountOwnerOrAdmin(BasePermission):
@@ -9,9 +23,10 @@ class IsAccountOwnerOrAdmin(BasePermission):
     Permission allowing only the admin or the authenticated user to modify/delete their own account.
     """
     def has_object_permission(self, request, view, obj):
-        print(f"Request user: {request.user}, Object: {obj}")  # Debug log
         # L'utilisateur est autorisé s'il est admin ou s'il agit sur son propre compte
-        return request.user.is_staff or obj == request.user
+        allowed = request.user.is_staff or obj == request.user
+        log_decision('IsAccountOwnerOrAdmin', request.user, allowed, object=obj.pk)
+        return allowed
 
 
 class IsProjectManagerOrAdmin(BasePermission):
@@ -64,6 +79,7 @@ class IsProjectManagerOrAdmin(BasePermission):
             raise PermissionDenied("Le paramètre project_pk est invalide ou mal formé.")
 
             # Deny access if the user is neither an admin nor a contributor
+        log_decision('IsProjectManagerOrAdmin', request.user, False, project=project_pk)
         raise PermissionDenied("Vous devez être administrateur ou contributeur pour accéder à cet élément.")
 
 
@@ -83,11 +99,12 @@ class IsProjectContributorOrAdmin(BasePermission):
             raise PermissionDenied("Le projet n'a pas été spécifié dans l'URL.")
 
         try:
-            # Check if the user is a contributor to the project
-            is_contributor = Contributor.objects.filter(
-                project=project_pk,
-                user=request.user
-            ).exists()
+            # Check if the user is a contributor to the project (once per batch of requests)
+            is_contributor = memoize(
+                ('contributor', str(project_pk), request.user.pk),
+                Contributor.objects.filter(project=project_pk, user=request.user).exists
+            )
+            log_decision('IsProjectContributorOrAdmin', request.user, is_contributor, project=project_pk)
             if is_contributor:
                 return True
         except ValueError:
@@ -96,6 +113,27 @@ class IsProjectContributorOrAdmin(BasePermission):
         # Deny access if the user is neither an admin nor a contributor
         raise PermissionDenied("Vous devez être administrateur ou contributeur pour accéder à cet élément.")
 
+    async def ahas_permission(self, request, view):
+        """
+        Async counterpart of `has_permission`, used by the ASGI views (`aexists` instead of `exists`).
+        """
+        if request.user.is_staff:
+            return True
+
+        project_pk = view.kwargs.get('project_pk')
+        if not project_pk:
+            raise PermissionDenied("Le projet n'a pas été spécifié dans l'URL.")
+
+        try:
+            is_contributor = await Contributor.objects.filter(project=project_pk, user=request.user).aexists()
+            log_decision('IsProjectContributorOrAdmin', request.user, is_contributor, project=project_pk)
+            if is_contributor:
+                return True
+        except ValueError:
+            raise PermissionDenied("Le paramètre project_pk est invalide ou mal formé.")
+
+        raise PermissionDenied("Vous devez être administrateur ou contributeur pour accéder à cet élément.")
+
 
 class IsAuthorOrAdmin(BasePermission):
     """
@@ -0,0 +1,208 @@
+"""
+On-demand sampling profiler for live requests.
+
+With `PROFILING_ENABLED`, `ProfilingMiddleware` profiles the requests sent by staff users with the
+`PROFILING_HEADER` header, and a random share of all requests (`PROFILING_SAMPLE_RATE`). The staff JWT is checked
+before the sampler starts: the header of other clients is ignored. While a request is profiled, a background thread
+samples the stack of the thread serving it every `PROFILING_INTERVAL` seconds (a wall-clock profile: time spent
+waiting on the database counts).
+
+Each profile is written to `PROFILING_DIR` in the folded format of flame graphs (`frame;frame;frame count` per line,
+readable by flamegraph.pl, inferno or speedscope), with the view action as root frame. The directory is a ring of
+`PROFILING_MAX_FILES` files. `python manage.py profile_report` aggregates them per action.
+
+When the mode is disabled, the middleware removes itself from the chain: requests don't pay anything.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import log
+
+PROJECT_DIR = str(settings.BASE_DIR)
+PROJECT_PACKAGES = tuple(f"{path.name}/" for path in settings.BASE_DIR.iterdir() if (path / '__init__.py').exists())
+SUFFIX = '.folded'
+
+_labels = {}
+
+
+def relative_path(filename):
+    """
+    Path of a module relative to the project or to site-packages.
+    """
+    if 'site-packages' in filename:
+        return filename.rsplit('site-packages' + os.sep, 1)[-1]
+    if filename.startswith(PROJECT_DIR):
+        return filename[len(PROJECT_DIR) + 1:]
+    return filename
+
+
+def label(code):
+    """
+    Frame name: `path/of/module.py:Class.function`.
+    """
+    name = _labels.get(code)
+    if name is None:
+        name = _labels[code] = f"{relative_path(code.co_filename)}:{code.co_qualname}"
+    return name
+
+
+def is_project_frame(name):
+    return name.startswith(PROJECT_PACKAGES)
+
+
+def collapse(frame, until=None):
+    """
+    Stack of `frame` below the frame `until`, outermost first, as one line of the folded format.
+    """
+    names = []
+    while frame is not None and frame is not until:
+        names.append(label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Sampler:
+    """
+    One background thread sampling the stacks of the registered threads. It sleeps while none is registered.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.targets = {}
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self, thread_id):
+        # The stacks are cut at the caller's frame: the server and middleware frames above are the same everywhere
+        with self.lock:
+            self.targets[thread_id] = (Counter(), sys._getframe(1))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='profiling-sampler', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def stop(self, thread_id):
+        """
+        Unregister the thread and return its samples: {folded stack: count}.
+        """
+        with self.lock:
+            return self.targets.pop(thread_id, (Counter(), None))[0]
+
+    def run(self):
+        while True:
+            with self.lock:
+                idle = not self.targets
+                if idle:
+                    self.wakeup.clear()
+            if idle:
+                self.wakeup.wait()
+                continue
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, (stacks, until) in self.targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse(frame, until)] += 1
+            del frames
+            time.sleep(settings.PROFILING_INTERVAL)
+
+
+sampler = Sampler()
+
+
+def write_profile(root, stacks, directory=None):
+    """
+    Write the samples as a folded-stack file of the ring, under the `root` frame. Returns the profile id.
+    """
+    directory = Path(directory or settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+    profile_id = f"{stamp}-{log.request_id.get() or os.getpid()}"
+    temporary = directory / f".{profile_id}.tmp"
+    temporary.write_text(''.join(f"{root};{stack} {count}\n" for stack, count in sorted(stacks.items())))
+    os.replace(temporary, directory / f"{profile_id}{SUFFIX}")
+    # The ring: the file names sort chronologically
+    for expired in sorted(directory.glob(f'*{SUFFIX}'))[:-settings.PROFILING_MAX_FILES]:
+        expired.unlink(missing_ok=True)
+    return profile_id
+
+
+def read_profiles(directory=None):
+    """
+    Yield `(root, stacks)` for each profile of the ring, oldest first; `stacks` maps folded stacks to counts.
+    """
+    for path in sorted(Path(directory or settings.PROFILING_DIR).glob(f'*{SUFFIX}')):
+        stacks = Counter()
+        root = None
+        for line in path.read_text().splitlines():
+            stack, _, count = line.rpartition(' ')
+            if not stack or not count.isdigit():
+                continue
+            root, _, stack = stack.partition(';')
+            stacks[stack] += int(count)
+        if root is not None:
+            yield root, stacks
+
+
+def view_name(request):
+    """
+    `ViewSet.action` (or `View.method`) serving the request, the root frame of its profile.
+    """
+    match = request.resolver_match
+    if match is None:
+        return 'unresolved'
+    cls = getattr(match.func, 'cls', None)
+    if cls is None:
+        return match.view_name or match._func_path
+    method = request.method.lower()
+    return f"{cls.__name__}.{(getattr(match.func, 'actions', None) or {}).get(method, method)}"
+
+
+def is_staff_request(request):
+    """
+    The request carries the JWT of a staff user. Checked before the view runs, and only for requests sending
+    `PROFILING_HEADER`: DRF authenticates the request again in the view.
+    """
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+class ProfilingMiddleware:
+    """
+    Profile the requests asked for by staff users (`PROFILING_HEADER`) or drawn at `PROFILING_SAMPLE_RATE`.
+    The id of the profile is returned in the `X-Profile-Id` response header.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = settings.PROFILING_HEADER in request.headers and is_staff_request(request)
+        if not requested and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        thread_id = threading.get_ident()
+        sampler.start(thread_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop(thread_id)
+        if stacks:
+            response['X-Profile-Id'] = write_profile(view_name(request), stacks)
+        return response
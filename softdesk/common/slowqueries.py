@@ -0,0 +1,248 @@
+"""
+Slow-query log.
+
+Every database connection runs its statements through `log_slow_query`, an execute wrapper installed when the
+connection is created. Statements slower than `SLOW_QUERY_THRESHOLD` seconds are:
+- logged as warnings (`softdesk.db`), with the id of the request,
+- aggregated per statement shape (the SQL without its values): count, total and maximum duration, the view and
+  action that ran them, and the project frames of the stack of the first occurrence,
+- explained once per shape (`EXPLAIN QUERY PLAN` on SQLite, `EXPLAIN` on PostgreSQL).
+
+The aggregates are kept per process (`SLOW_QUERY_MAX_SHAPES` shapes at most, the cheapest are evicted) and reported
+to the staff by `GET /api/slow-queries/`.
+"""
+import hashlib
+import logging
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.backends.signals import connection_created
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('softdesk.db')
+
+PLAN_PREFIXES = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+STACK_DEPTH = 12
+PROJECT_DIR = str(settings.BASE_DIR)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def shape(sql):
+    """
+    Statement without its values: literals become `?` and lists of parameters `(...)`.
+    """
+    sql = _LITERALS.sub('?', sql)
+    sql = _LISTS.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def caller():
+    """
+    Return `(view, stack)`: the innermost API view running the statement (`ViewSet.action`), and the frames of the
+    project's code leading to it, outermost first.
+    """
+    view = None
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_DIR) and filename != __file__ and 'site-packages' not in filename:
+            stack.append(f"{filename[len(PROJECT_DIR) + 1:]}:{frame.f_lineno} in {frame.f_code.co_name}")
+        if view is None:
+            instance = frame.f_locals.get('self')
+            if isinstance(instance, APIView):
+                request = getattr(instance, 'request', None)
+                action = getattr(instance, 'action', None) or getattr(request, 'method', '').lower()
+                view = f"{type(instance).__name__}.{action}"
+        frame = frame.f_back
+    return view, stack[:STACK_DEPTH][::-1]
+
+
+def explain(connection, sql, params):
+    """
+    Plan of the statement, one line per row; None when the backend or statement can't be explained.
+    """
+    prefix = PLAN_PREFIXES.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    # A raw cursor: not wrapped again, and the results of the explained statement are left untouched
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(prefix + sql, params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except DatabaseError as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """
+    Aggregates of the slow statements, keyed by the fingerprint of their shape.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def record(self, sql, duration, view, stack):
+        """
+        Add one occurrence. Returns the fingerprint of the shape, and whether it is new (to be explained).
+        """
+        statement = shape(sql)
+        fingerprint = hashlib.sha1(statement.encode()).hexdigest()[:12]
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            entry = self.entries.get(fingerprint)
+            if entry is None:
+                if len(self.entries) >= settings.SLOW_QUERY_MAX_SHAPES:
+                    del self.entries[min(self.entries, key=lambda key: self.entries[key]['total'])]
+                self.entries[fingerprint] = {
+                    'fingerprint': fingerprint, 'sql': statement, 'count': 1, 'total': duration, 'max': duration,
+                    'first_seen': now, 'last_seen': now, 'views': {view: 1}, 'stack': stack, 'plan': None,
+                }
+                return fingerprint, True
+            entry['count'] += 1
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+            entry['last_seen'] = now
+            entry['views'][view] = entry['views'].get(view, 0) + 1
+        return fingerprint, False
+
+    def set_plan(self, fingerprint, plan):
+        with self.lock:
+            if fingerprint in self.entries:
+                self.entries[fingerprint]['plan'] = plan
+
+    def report(self, ordering='total'):
+        """
+        The aggregates, most expensive first (by `total`, `max` or `count`), durations in milliseconds.
+        """
+        with self.lock:
+            entries = sorted(self.entries.values(), key=lambda entry: entry[ordering], reverse=True)
+            return [{
+                'fingerprint': entry['fingerprint'],
+                'sql': entry['sql'],
+                'count': entry['count'],
+                'total_ms': round(entry['total'] * 1000, 1),
+                'mean_ms': round(entry['total'] * 1000 / entry['count'], 1),
+                'max_ms': round(entry['max'] * 1000, 1),
+                'first_seen': entry['first_seen'],
+                'last_seen': entry['last_seen'],
+                'views': dict(entry['views']),
+                'stack': entry['stack'],
+                'plan': entry['plan'],
+            } for entry in entries]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+slow_queries = SlowQueryLog()
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """
+    Execute wrapper: time the statement, and record it if slower than `SLOW_QUERY_THRESHOLD`.
+    """
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+    threshold = settings.SLOW_QUERY_THRESHOLD
+    if threshold is not None and duration >= threshold:
+        view, stack = caller()
+        fingerprint, new = slow_queries.record(sql, duration, view, stack)
+        logger.warning("Slow query", extra={
+            'event': 'slow_query', 'fingerprint': fingerprint, 'duration_ms': round(duration * 1000, 1), 'view': view,
+        })
+        if new and not many:
+            slow_queries.set_plan(fingerprint, explain(context['connection'], sql, params))
+    return result
+
+
+def install(sender, connection, **kwargs):
+    # First in the list: `connection.execute_wrapper()` blocks pop the last wrapper when they exit
+    if settings.SLOW_QUERY_THRESHOLD is not None and log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_query)
+
+
+connection_created.connect(install)
+
+
+class SlowQueryReportView(APIView):
+    """
+    Slow statements recorded by this process.
+    """
+    permission_classes = [IsAdminUser]
+    ORDERINGS = ('total', 'max', 'count')
+
+    @swagger_auto_schema(
+        operation_summary="Slow-query report",
+        tags=["Monitoring"],
+        operation_description=(
+                "Statements slower than `SLOW_QUERY_THRESHOLD` seconds run by this server process, grouped by "
+                "shape (the SQL without its values). Each entry has the number of occurrences, the total, mean "
+                "and maximum durations, the view actions that ran it, the stack of its first occurrence and "
+                "its query plan.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAdminUser`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        manual_parameters=[
+            openapi.Parameter('ordering', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(ORDERINGS),
+                              default='total', description="Sort by total or maximum duration, or by count."),
+        ],
+        responses={
+            200: openapi.Response(description="Slow statements, most expensive first."),
+            400: openapi.Response(description="Bad Request. Unknown ordering."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            403: openapi.Response(description="Forbidden. Administrators only."),
+        },
+    )
+    def get(self, request):
+        ordering = request.query_params.get('ordering', 'total')
+        if ordering not in self.ORDERINGS:
+            raise ValidationError({'ordering': f"Must be one of: {', '.join(self.ORDERINGS)}."})
+        return Response({
+            'threshold': settings.SLOW_QUERY_THRESHOLD,
+            'results': slow_queries.report(ordering),
+        })
+
+    @swagger_auto_schema(
+        operation_summary="Reset the slow-query report",
+        tags=["Monitoring"],
+        operation_description=(
+                "Forget the slow statements recorded by this server process.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAdminUser`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        responses={
+            204: openapi.Response(description="Report cleared."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            403: openapi.Response(description="Forbidden. Administrators only."),
+        },
+    )
+    def delete(self, request):
+        slow_queries.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,24 @@
+"""
+Test runner of `python manage.py test`.
+
+The repository root holds an `__init__.py`, so Django's discovery would import the apps as `softdesk.<app>`.
+The runner discovers the tests from `BASE_DIR` instead, and disables throttling like the benchmark database
+(tests covering the throttles enable it with `override_settings`).
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def __init__(self, top_level=None, **kwargs):
+        super().__init__(top_level=top_level or str(settings.BASE_DIR), **kwargs)
+        self._throttling = override_settings(THROTTLE_ENABLED=False)
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._throttling.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._throttling.disable()
+        super().teardown_test_environment(**kwargs)
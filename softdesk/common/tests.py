@@ -0,0 +1,307 @@
+import tracemalloc
+import zlib
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from application.models import Project
+from user.models import User, Contributor
+from . import profiling
+from .compression import Brotli, CompressionMiddleware, Gzip, Zstd, negotiate
+from .memory import memory_report
+from .profiling import ProfilingMiddleware
+from .slowqueries import SlowQueryLog, shape, slow_queries
+from .throttling import BucketThrottle, InMemoryBucketStore, parse_rate
+
+
+class BatchLookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('manager')
+        cls.outsider = User.objects.create_user('outsider')
+        cls.project = Project.objects.create(name='Project', type='BACKEND', author=cls.manager)
+        Contributor.objects.create(project=cls.project, user=cls.manager, role='MANAGER')
+
+    def batch(self, paths):
+        client = APIClient()
+        client.force_authenticate(self.outsider)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/batch/', {'requests': [{'path': path} for path in paths]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [result['status'] for result in response.json()['responses']], len(queries)
+
+    def test_denials_share_the_membership_check(self):
+        path = f'/api/projects/{self.project.pk}/issues/'
+
+        statuses, single = self.batch([path])
+        self.assertEqual(statuses, [403])
+        statuses, triple = self.batch([path] * 3)
+
+        # Only the statement fetching the issues is repeated
+        self.assertEqual(statuses, [403] * 3)
+        self.assertEqual(triple - single, 2)
+
+
+@override_settings(THROTTLE_ENABLED=True,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AnonymousThrottleTests(TestCase):
+    def test_forged_forwarded_for_shares_the_bucket(self):
+        capacity, _ = parse_rate(api_settings.DEFAULT_THROTTLE_RATES['auth'])
+        client = APIClient(REMOTE_ADDR='203.0.113.39')
+        statuses = [client.post('/api/token/', {'username': 'nobody', 'password': 'wrong'},
+                                HTTP_X_FORWARDED_FOR=f'198.51.100.{index}').status_code
+                    for index in range(capacity + 1)]
+
+        self.assertEqual(statuses, [401] * capacity + [429])
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+class ProfilingHeaderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        cls.user = User.objects.create_user('user')
+
+    def profiled(self, user=None):
+        headers = {settings.PROFILING_HEADER: '1'}
+        if user is not None:
+            headers['Authorization'] = f'Bearer {AccessToken.for_user(user)}'
+        request = RequestFactory().get('/api/projects/', headers=headers)
+        middleware = ProfilingMiddleware(lambda request: HttpResponse())
+        with mock.patch.object(profiling.sampler, 'start') as start:
+            with mock.patch.object(profiling.sampler, 'stop', return_value=None):
+                middleware(request)
+        return start.called
+
+    def test_header_is_honoured_for_staff_only(self):
+        self.assertTrue(self.profiled(self.staff))
+        self.assertFalse(self.profiled(self.user))
+        self.assertFalse(self.profiled())
+
+
+class BucketStoreTests(SimpleTestCase):
+    def test_prune_keeps_the_buckets_refilling_on_their_own_budget(self):
+        store = InMemoryBucketStore()
+        store.max_keys = 2
+        store.consume('slow', 10, 10 / 60, now=0)  # Full again after 6 s
+        store.consume('fast', 10, 10, now=0)  # Full again after 0.1 s
+        store.consume('new', 10, 10, now=1)
+
+        self.assertEqual(set(store.buckets), {'slow', 'new'})
+
+    def test_prune_runs_at_most_once_per_interval(self):
+        store = InMemoryBucketStore()
+        store.max_keys = 1
+        store.consume('a', 10, 10 / 60, now=0)
+        store.consume('b', 10, 10 / 60, now=1)
+        with mock.patch.object(store, '_prune') as prune:
+            store.consume('c', 10, 10 / 60, now=2)
+        prune.assert_not_called()
+
+
+@override_settings(THROTTLE_ENABLED=True)
+class AsyncThrottleTests(TestCase):
+    def test_async_reads_share_the_read_budget(self):
+        user = User.objects.create_user('reader')
+        client = APIClient(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        with mock.patch.object(BucketThrottle, 'timer', return_value=0), \
+                mock.patch.dict(api_settings.DEFAULT_THROTTLE_RATES, {'read': '2/min'}):
+            statuses = [client.get(path).status_code for path in ('/api/projects/', '/api/async/projects/',
+                                                                  '/api/async/projects/')]
+            response = client.get('/api/async/projects/')
+
+        self.assertEqual(statuses, [403, 403, 429])
+        self.assertEqual(response['Retry-After'], '30')
+
+
+class SlowQueryLogTests(SimpleTestCase):
+    def test_shape_drops_the_values(self):
+        self.assertEqual(
+            shape("SELECT * FROM issue WHERE id IN (%s, %s,%s) AND title = 'It''s'\n  AND priority > 2.5"),
+            "SELECT * FROM issue WHERE id IN (...) AND title = ? AND priority > ?")
+
+    def test_occurrences_of_a_shape_are_aggregated(self):
+        log = SlowQueryLog()
+        fingerprint, new = log.record("SELECT * FROM issue WHERE id = 1", 0.2, 'IssueViewSet.list', [])
+        self.assertTrue(new)
+        self.assertEqual(log.record("SELECT * FROM issue WHERE id = 2", 0.4, 'IssueViewSet.list', []),
+                         (fingerprint, False))
+        log.record("SELECT * FROM issue WHERE id = 3", 0.3, 'MeViewSet.issues', [])
+
+        [entry] = log.report()
+        self.assertEqual((entry['count'], entry['total_ms'], entry['mean_ms'], entry['max_ms']),
+                         (3, 900.0, 300.0, 400.0))
+        self.assertEqual(entry['views'], {'IssueViewSet.list': 2, 'MeViewSet.issues': 1})
+
+    @override_settings(SLOW_QUERY_MAX_SHAPES=2)
+    def test_the_cheapest_shape_is_evicted(self):
+        log = SlowQueryLog()
+        log.record("SELECT * FROM project", 0.5, None, [])
+        log.record("SELECT * FROM issue", 0.1, None, [])
+        log.record("SELECT * FROM comment", 0.2, None, [])
+
+        self.assertEqual([entry['sql'] for entry in log.report()], ["SELECT * FROM project", "SELECT * FROM comment"])
+
+
+class SlowQueryReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        cls.user = User.objects.create_user('user')
+
+    def setUp(self):
+        slow_queries.clear()
+        self.addCleanup(slow_queries.clear)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_slow_statements_are_recorded_with_their_view(self):
+        with override_settings(SLOW_QUERY_THRESHOLD=0), self.assertLogs('softdesk.db', 'WARNING'):
+            self.client_for(self.user).get('/api/projects/')
+
+        views = {view for entry in slow_queries.report() for view in entry['views']}
+        self.assertIn('ProjectViewSet.list', views)
+
+    def test_report_and_reset_are_for_staff_only(self):
+        slow_queries.record("SELECT * FROM project", 0.2, None, [])
+        self.assertEqual(self.client_for(self.user).get('/api/slow-queries/').status_code, 403)
+        self.assertEqual(self.client_for(self.user).delete('/api/slow-queries/').status_code, 403)
+        self.assertEqual(APIClient().get('/api/slow-queries/').status_code, 401)
+
+        staff = self.client_for(self.staff)
+        response = staff.get('/api/slow-queries/', {'ordering': 'count'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['sql'] for entry in response.json()['results']], ["SELECT * FROM project"])
+        self.assertEqual(staff.get('/api/slow-queries/', {'ordering': 'sql'}).status_code, 400)
+
+        self.assertEqual(staff.delete('/api/slow-queries/').status_code, 204)
+        self.assertEqual(staff.get('/api/slow-queries/').json()['results'], [])
+
+
+class MemoryTrackingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        cls.user = User.objects.create_user('user')
+
+    def setUp(self):
+        memory_report.clear()
+        self.addCleanup(memory_report.clear)
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+
+    def client_for(self, user):
+        client = APIClient()  # The middleware chain is built by the first request of each client
+        client.force_authenticate(user)
+        return client
+
+    def test_requests_are_not_measured_by_default(self):
+        response = self.client_for(self.user).get('/api/projects/')
+
+        self.assertNotIn('X-Memory-Peak', response)
+        self.assertEqual(memory_report.report(), [])
+
+    @override_settings(MEMORY_TRACKING_ENABLED=True)
+    def test_requests_are_measured_when_enabled(self):
+        response = self.client_for(self.user).get('/api/projects/')
+
+        self.assertGreater(int(response['X-Memory-Peak']), 0)
+        self.assertGreaterEqual(int(response['X-Memory-Retained']), 0)
+        [entry] = memory_report.report()
+        self.assertEqual((entry['action'], entry['count']), ('ProjectViewSet.list', 1))
+        self.assertEqual(entry['peak_max'], int(response['X-Memory-Peak']))
+
+    def test_report_and_reset_are_for_staff_only(self):
+        memory_report.record('ProjectViewSet.list', 2048, 512, {'application/views.py:10': 512})
+        self.assertEqual(self.client_for(self.user).get('/api/memory/').status_code, 403)
+        self.assertEqual(self.client_for(self.user).delete('/api/memory/').status_code, 403)
+        self.assertEqual(APIClient().get('/api/memory/').status_code, 401)
+
+        staff = self.client_for(self.staff)
+        response = staff.get('/api/memory/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['sites'],
+                         [{'site': 'application/views.py:10', 'size_mean': 512}])
+
+        self.assertEqual(staff.delete('/api/memory/').status_code, 204)
+        self.assertEqual(staff.get('/api/memory/').json()['results'], [])
+
+
+class CompressionTests(SimpleTestCase):
+    body = b'{"results": [%s]}' % b', '.join(b'{"id": %d, "title": "Issue"}' % index for index in range(100))
+
+    def respond(self, response, accept_encoding='gzip'):
+        request = RequestFactory().get('/api/projects/', headers={'Accept-Encoding': accept_encoding})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation(self):
+        codecs = [Zstd(3), Brotli(4), Gzip(6)]
+        self.assertEqual(negotiate('gzip, br', codecs).name, 'br')  # Server preference on a tie
+        self.assertEqual(negotiate('gzip;q=1.0, br;q=0.5', codecs).name, 'gzip')
+        self.assertEqual(negotiate('*;q=0.2, zstd;q=0', codecs).name, 'br')
+        self.assertIsNone(negotiate('identity', codecs))
+        self.assertIsNone(negotiate('gzip;q=0', codecs))
+        self.assertIsNone(negotiate('', codecs))
+
+    def test_response_is_compressed(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(zlib.decompress(response.content, 31), self.body)
+
+    def test_identity_varies_on_accept_encoding(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'), 'identity')
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, self.body)
+
+    def test_small_and_html_responses_are_not_compressed(self):
+        with self.settings(COMPRESSION_MIN_SIZE=len(self.body) + 1):
+            response = self.respond(HttpResponse(self.body, content_type='application/json'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Vary', response)
+
+        response = self.respond(HttpResponse(self.body, content_type='text/html'))
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_strong_etag_becomes_weak(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.respond(response)['ETag'], 'W/"abc"')
+
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = 'W/"abc"'
+        self.assertEqual(self.respond(response)['ETag'], 'W/"abc"')
+
+    def test_streams_are_compressed_chunk_by_chunk(self):
+        produced = []
+
+        def events():
+            for index in range(3):
+                produced.append(index)
+                yield b'data: {"event": %d}\n\n' % index
+
+        response = self.respond(StreamingHttpResponse(events(), content_type='text/event-stream'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+
+        # Each event can be decoded as soon as it is produced, before the next one
+        decompressor = zlib.decompressobj(31)
+        chunks = iter(response.streaming_content)
+        self.assertEqual(decompressor.decompress(next(chunks)), b'data: {"event": 0}\n\n')
+        self.assertEqual(produced, [0])
+        self.assertEqual(decompressor.decompress(b''.join(chunks)), b'data: {"event": 1}\n\ndata: {"event": 2}\n\n')
+        self.assertTrue(decompressor.eof)
@@ -0,0 +1,191 @@
+"""
+Request throttling with token buckets.
+
+Each client (the user when authenticated, the IP address otherwise) has one bucket per scope:
+- `auth`: the token endpoints,
+- `bulk`: views declaring `throttle_scope = 'bulk'` (batch requests),
+- `read` / `write`: every other view, by HTTP method.
+DRF views apply it as a throttle class; the ASGI views of `/api/async/` (the change feed included) call
+`aallow_request` in their dispatch, with the same buckets.
+The IP address is `REMOTE_ADDR`, or the `X-Forwarded-For` entry added by the last of the `NUM_PROXIES` trusted
+proxies (DRF's `get_ident`), so a forged header does not give a client a new bucket.
+The budgets are the `DEFAULT_THROTTLE_RATES` of `REST_FRAMEWORK` (e.g. `'600/min'`): a bucket holds that many
+requests and refills continuously over the period, so a client can burst up to the budget and then goes at the
+average rate. A check is one dictionary (or cache) read and write, whatever the budget, unlike the request log
+kept by DRF's `SimpleRateThrottle`.
+
+The store is selected with `THROTTLE_STORE`:
+- `InMemoryBucketStore`: per process, no I/O (budgets are multiplied by the number of workers),
+- `CacheBucketStore`: in the default Django cache, shared by the workers when the cache is (Redis, Memcached).
+"""
+import threading
+import time
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """
+    `'600/min'` -> (capacity 600, refill rate 10 per second).
+    """
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class BucketStore:
+    """
+    Interface of a token-bucket store.
+    `consume` takes one token from the bucket `key` and returns 0 when the request is allowed,
+    otherwise the number of seconds until a token is available.
+    """
+
+    def consume(self, key, capacity, refill_rate, now):
+        raise NotImplementedError
+
+    async def aconsume(self, key, capacity, refill_rate, now):
+        """
+        `consume` for the async views; stores doing I/O run it in a thread.
+        """
+        return await sync_to_async(self.consume)(key, capacity, refill_rate, now)
+
+
+class InMemoryBucketStore(BucketStore):
+    """
+    Buckets in a dictionary of the process. Once it grows past `max_keys`, the buckets that are full again (each
+    against its own budget) are pruned, at most every `prune_interval` seconds.
+    """
+    max_keys = 100_000
+    prune_interval = 60
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.next_prune = 0
+
+    def consume(self, key, capacity, refill_rate, now):
+        with self.lock:
+            tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / refill_rate
+            # The third item is the time the bucket is full again, and can be dropped
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            if len(self.buckets) > self.max_keys and now >= self.next_prune:
+                self._prune(now)
+            return wait
+
+    async def aconsume(self, key, capacity, refill_rate, now):
+        return self.consume(key, capacity, refill_rate, now)  # No I/O
+
+    def _prune(self, now):
+        self.buckets = {key: state for key, state in self.buckets.items() if state[2] > now}
+        self.next_prune = now + self.prune_interval
+
+
+class CacheBucketStore(BucketStore):
+    """
+    Buckets in the default Django cache, expiring once they would be full again.
+    The read and the write are not atomic: concurrent requests of one client may get a few extra tokens.
+    """
+
+    @staticmethod
+    def take(state, capacity, refill_rate, now):
+        """
+        Return the new state of the bucket and the wait.
+        """
+        tokens, updated = state or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+        if not wait:
+            tokens -= 1
+        return (tokens, now), wait
+
+    def consume(self, key, capacity, refill_rate, now):
+        state, wait = self.take(cache.get(key), capacity, refill_rate, now)
+        cache.set(key, state, timeout=int(capacity / refill_rate) + 1)
+        return wait
+
+    async def aconsume(self, key, capacity, refill_rate, now):
+        state, wait = self.take(await cache.aget(key), capacity, refill_rate, now)
+        await cache.aset(key, state, timeout=int(capacity / refill_rate) + 1)
+        return wait
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = import_string(settings.THROTTLE_STORE)()
+    return _store
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    DRF throttle class (`DEFAULT_THROTTLE_CLASSES`) applying the budget of the request's scope.
+    """
+
+    def __init__(self):
+        self.wait_time = None
+
+    @staticmethod
+    def get_scope(request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        # Imported here: this module is loaded while DRF's APIView is defined (DEFAULT_THROTTLE_CLASSES)
+        from rest_framework_simplejwt.views import TokenViewBase
+        if isinstance(view, TokenViewBase):
+            return 'auth'
+        return 'read' if request.method in SAFE_METHODS else 'write'
+
+    def bucket(self, request, view):
+        """
+        Return `(key, capacity, refill_rate)` of the bucket of the request, or None when it is not throttled.
+        """
+        if not settings.THROTTLE_ENABLED:
+            return None
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return None
+        user = request.user
+        ident = f'user:{user.pk}' if user and user.is_authenticated else f'ip:{self.get_ident(request)}'
+        return (f'throttle:{scope}:{ident}', *parse_rate(rate))
+
+    def allow_request(self, request, view):
+        bucket = self.bucket(request, view)
+        if bucket is None:
+            return True
+        self.wait_time = get_store().consume(*bucket, self.timer())
+        return not self.wait_time
+
+    async def aallow_request(self, request, view):
+        """
+        Async counterpart of `allow_request`, used by the ASGI views.
+        """
+        bucket = self.bucket(request, view)
+        if bucket is None:
+            return True
+        self.wait_time = await get_store().aconsume(*bucket, self.timer())
+        return not self.wait_time
+
+    timer = staticmethod(time.time)  # Wall clock: the buckets of CacheBucketStore are shared between hosts
+
+    def wait(self):
+        return self.wait_time
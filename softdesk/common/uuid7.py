@@ -0,0 +1,56 @@
+"""
+Time-ordered UUIDs (version 7, RFC 9562).
+
+The first 48 bits are a Unix timestamp in milliseconds, so new keys are appended at the end of the
+primary-key index instead of being scattered across it like `uuid.uuid4`, and sorting by the key
+sorts by creation time. Within the same millisecond, the 12 `rand_a` bits are used as a counter,
+so the keys generated by one process are strictly increasing.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_MAX = 0xFFF
+_RAND_B_MASK = (1 << 62) - 1
+
+
+def _build(ms, rand_a, rand_b):
+    # 48 bits timestamp | version 7 | 12 bits rand_a | variant 0b10 | 62 bits rand_b
+    value = (((ms & 0xFFFF_FFFF_FFFF) << 80) | (0x7 << 76) | ((rand_a & 0xFFF) << 64)
+             | (0b10 << 62) | (rand_b & _RAND_B_MASK))
+    return uuid.UUID(int=value)
+
+
+def uuid7():
+    """
+    Return a new version 7 UUID, greater than the previous one returned in this process.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # Start low in the counter range, so many keys can follow in the same millisecond
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x1FF
+        else:
+            ms = _last_ms
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                ms += 1
+                _counter = 0
+        _last_ms = ms
+        counter = _counter
+    return _build(ms, counter, int.from_bytes(os.urandom(8), 'big'))
+
+
+def uuid7_from(moment, source):
+    """
+    Return a version 7 UUID for a past `moment` (aware datetime), keeping the random bits of `source`.
+    Used to rekey existing rows deterministically: the same row always gets the same new key.
+    """
+    ms = int(moment.timestamp() * 1000)
+    return _build(ms, source.int >> 64, source.int)
@@ -0,0 +1,115 @@
+"""
+Visibility policy: the rules of `common.permissions` compiled into queryset filters.
+
+- staff: every row,
+- contributor: the projects they contribute to, and the issues and comments of these projects,
+- manager: the projects they can modify,
+- author: the comments they can modify.
+
+The viewsets apply the policy once in `get_queryset`: membership is an `EXISTS` subquery of the statement
+fetching the rows, so authorizing and fetching cost one query. When nothing matches, `explain_denial` runs the
+individual checks (on this failure path only) to answer with the same 403 as the permission classes. These checks
+go through `common.lookups`, with the keys of the permission classes, so the sub-requests of a batch share them.
+"""
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import PermissionDenied
+
+from application.models import Project, Issue, Comment
+from user.models import Contributor
+from .lookups import memoize
+from .permissions import log_decision
+
+
+def project_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise PermissionDenied("Le paramètre project_pk est invalide ou mal formé.")
+
+
+def membership(user, project=OuterRef('pk'), roles=None):
+    """
+    `EXISTS` subquery: `user` contributes to `project` (an id or an `OuterRef`), with one of `roles` if given.
+    """
+    contributors = Contributor.objects.filter(project=project, user=user)
+    if roles:
+        contributors = contributors.filter(role__in=roles)
+    return Exists(contributors)
+
+
+def is_contributor(user, project_pk):
+    """
+    `user` contributes to the project: the check of `IsProjectContributorOrAdmin`, shared with it within a batch.
+    """
+    return memoize(('contributor', str(project_pk), user.pk),
+                   Contributor.objects.filter(project_id=project_pk, user=user).exists)
+
+
+def projects(user, roles=None):
+    """
+    Projects visible to `user`; with `roles`, only those where the user has one of these roles.
+    """
+    queryset = Project.objects.all()
+    if user.is_staff:
+        return queryset
+    return queryset.filter(membership(user, OuterRef('pk'), roles))
+
+
+def restrict(queryset, user, project_pk):
+    """
+    Rows of `queryset`, already filtered on the project `project_pk`, if `user` may see this project.
+    """
+    if user.is_staff:
+        return queryset
+    return queryset.filter(membership(user, project_pk))
+
+
+def issues(user, project_pk, model=Issue):
+    """
+    Issues of the project (hot ones, or archived ones with `model=ArchivedIssue`) visible to `user`.
+    """
+    project_pk = project_id(project_pk)
+    return restrict(model.objects.filter(project_id=project_pk), user, project_pk)
+
+
+def comments(user, project_pk, issue_pk, authored=False):
+    """
+    Comments of the issue visible to `user`; with `authored`, only those `user` can modify (staff: all).
+    The issue is fetched along (the change-feed signals read its project).
+    """
+    project_pk = project_id(project_pk)
+    queryset = Comment.objects.filter(issue_id=issue_pk, issue__project_id=project_pk).select_related('issue')
+    if authored and not user.is_staff:
+        queryset = queryset.filter(author=user)
+    return restrict(queryset, user, project_pk)
+
+
+def explain_denial(user, project_pk, issue_pk=None):
+    """
+    Called when a filtered queryset matched nothing: raise the 403 of the failing rule, if any.
+    Returns when the project (and issue) exist and are visible: the rows are just missing.
+    """
+    project_pk = project_id(project_pk)
+    if not user.is_staff and not is_contributor(user, project_pk):
+        log_decision('visibility.contributor', user, False, project=project_pk)
+        raise PermissionDenied("Vous devez être administrateur ou contributeur pour accéder à cet élément.")
+    if not memoize(('project', str(project_pk)), Project.objects.filter(pk=project_pk).exists):
+        raise PermissionDenied("Le projet spécifié n'existe pas.")
+    if issue_pk is not None and not memoize(('issue', str(project_pk), str(issue_pk)),
+                                            Issue.objects.filter(pk=issue_pk, project_id=project_pk).exists):
+        raise PermissionDenied("L'issue spécifiée n'existe pas dans ce projet.")
+
+
+def explain_project_denial(user, pk, manager=False):
+    """
+    Called when the project `pk` is not in `projects(user)`: raise the 403 of the failing rule, if any.
+    Returns when the project is just missing (404).
+    """
+    if user.is_staff:
+        return
+    if not memoize(('contributor', None, user.pk), Contributor.objects.filter(user=user).exists):
+        log_decision('visibility.contributor', user, False, project=pk)
+        raise PermissionDenied("Vous n'êtes pas associé à un projet.")
+    if manager and str(pk).isdigit() and is_contributor(user, pk):
+        log_decision('visibility.manager', user, False, project=pk)
+        raise PermissionDenied("Vous devez être responsable du projet ou administrateur pour le modifier.")
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from common.admin import ScalableModelAdmin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(ScalableModelAdmin):
+    """
+    Admin interface for background jobs (read-only monitoring).
+    """
+    list_display = ('id', 'name', 'status', 'attempts', 'created_by', 'created_time', 'finished_time')
+    list_filter = ('status', 'name')
+    list_select_related = ('created_by',)
+    readonly_fields = ('name', 'payload', 'status', 'progress', 'result', 'error', 'attempts', 'created_by',
+                       'created_time', 'started_time', 'finished_time')
+    ordering = ('-id',)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import work
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (cascading deletes, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty.")
+        parser.add_argument('--sleep', type=float, help="Polling interval in seconds (default: JOBS_POLL_INTERVAL).")
+
+    def handle(self, *args, **options):
+        processed = work(once=options['once'], sleep=options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"{processed} job(s) processed."))
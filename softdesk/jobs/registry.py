@@ -0,0 +1,33 @@
+"""
+Registry of the functions that can run as background jobs.
+"""
+from django.db import transaction
+
+from .models import Job
+
+TASKS = {}
+
+
+def task(name):
+    """
+    Register a function as a background task. It is called as `function(job, **payload)`
+    and its return value (JSON serializable) is stored in `Job.result`.
+    """
+    def decorator(function):
+        TASKS[name] = function
+        return function
+    return decorator
+
+
+def enqueue(name, payload=None, user=None):
+    """
+    Queue a job, or return the unfinished job already queued with the same name and payload.
+    """
+    if name not in TASKS:
+        raise KeyError(f"Unknown task: {name}")
+    payload = payload or {}
+    with transaction.atomic():
+        existing = Job.objects.filter(name=name, payload=payload, status__in=['QUEUED', 'RUNNING']).first()
+        if existing:
+            return existing
+        return Job.objects.create(name=name, payload=payload, created_by=user)
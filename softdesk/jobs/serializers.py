@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    # The stored error is the traceback of the worker: staff only, the owner gets the exception type
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'payload', 'status', 'progress', 'result', 'error', 'attempts',
+                  'created_time', 'started_time', 'finished_time']
+        read_only_fields = fields
+
+    def get_error(self, job):
+        request = self.context.get('request')
+        if not job.error or (request is not None and request.user.is_staff):
+            return job.error
+        return job.error.strip().splitlines()[-1].split(':', 1)[0]
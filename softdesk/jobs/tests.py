@@ -0,0 +1,71 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from application.models import Project, Issue, Comment, SyncLog
+from user.models import User, Contributor
+from .models import Job
+from .worker import work
+
+
+class DeletionJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('manager')
+        cls.other = User.objects.create_user('other')
+        cls.project = Project.objects.create(name='Project', type='BACKEND', author=cls.manager)
+        manager_row = Contributor.objects.create(project=cls.project, user=cls.manager, role='MANAGER')
+        cls.issue = Issue.objects.create(name='Issue', priority='LOW', tag='BUG', author=cls.manager,
+                                         project=cls.project, assignee=manager_row)
+        Comment.objects.create(description='Comment', author=cls.manager, issue=cls.issue)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_project_destroy_queues_a_job(self):
+        response = self.client_for(self.manager).delete(f'/api/projects/{self.project.pk}/')
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.json()['id'])
+        self.assertEqual((job.name, job.payload, job.status), ('delete_project', {'project_id': self.project.pk},
+                                                               'QUEUED'))
+        self.assertTrue(response['Location'].endswith(f'/api/jobs/{job.pk}/'))
+        self.assertTrue(Project.objects.filter(pk=self.project.pk).exists())
+
+    def test_second_destroy_returns_the_pending_job(self):
+        client = self.client_for(self.manager)
+        first = client.delete(f'/api/projects/{self.project.pk}/').json()
+        second = client.delete(f'/api/projects/{self.project.pk}/').json()
+        self.assertEqual(first['id'], second['id'])
+
+    def test_worker_deletes_the_project_with_its_rows(self):
+        job_id = self.client_for(self.manager).delete(f'/api/projects/{self.project.pk}/').json()['id']
+
+        self.assertEqual(work(once=True), 1)
+
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'SUCCEEDED')
+        self.assertEqual(job.result, {'comment': 1, 'issue': 1, 'contributor': 1})
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertTrue(SyncLog.objects.filter(model='issue', object_id=str(self.issue.pk), action='DELETE').exists())
+
+    def test_user_destroy_queues_a_job(self):
+        response = self.client_for(self.other).delete(f'/api/users/{self.other.pk}/')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get(pk=response.json()['id']).payload, {'user_id': self.other.pk})
+
+    def test_jobs_are_visible_to_their_creator_only(self):
+        job_id = self.client_for(self.manager).delete(f'/api/projects/{self.project.pk}/').json()['id']
+
+        self.assertEqual(self.client_for(self.manager).get(f'/api/jobs/{job_id}/').status_code, 200)
+        self.assertEqual(self.client_for(self.other).get(f'/api/jobs/{job_id}/').status_code, 404)
+
+    def test_traceback_is_shown_to_staff_only(self):
+        staff = User.objects.create_user('staff', is_staff=True)
+        job = Job.objects.create(name='delete_project', payload={}, status='FAILED', created_by=self.manager,
+                                 error='Traceback (most recent call last):\n  File "x.py"\nValueError: secret\n')
+
+        self.assertEqual(self.client_for(self.manager).get(f'/api/jobs/{job.pk}/').json()['error'], 'ValueError')
+        self.assertEqual(self.client_for(staff).get(f'/api/jobs/{job.pk}/').json()['error'], job.error)
@@ -0,0 +1,73 @@
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from django.urls import reverse
+from rest_framework.viewsets import ReadOnlyModelViewSet
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from .models import Job
+from .serializers import JobSerializer
+
+
+def accepted_response(request, job):
+    """
+    `202 Accepted` response for an action handed over to a background job,
+    pointing to the job status resource.
+    """
+    location = request.build_absolute_uri(reverse('job-detail', args=[job.pk]))
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+class JobViewSet(ReadOnlyModelViewSet):
+    """
+    Status of the background jobs started by the user (all jobs for admins).
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    queryset = Job.objects.none()
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Job.objects.none()
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(created_by=self.request.user)
+
+    @swagger_auto_schema(
+        operation_summary="List background jobs",
+        tags=["Jobs"],
+        operation_description=(
+                "Retrieve the background jobs started by the authenticated user (all jobs for admins).\n\n"
+                "**Permissions required:**\n"
+                "- `IsAuthenticated`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        responses={
+            200: openapi.Response(description="List of jobs retrieved successfully."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+        },
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary="Retrieve a background job",
+        tags=["Jobs"],
+        operation_description=(
+                "Retrieve the status, progress and result of a background job.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAuthenticated`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        responses={
+            200: openapi.Response(description="Job retrieved successfully."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+            404: openapi.Response(description="Not Found. The job does not exist."),
+        },
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,81 @@
+"""
+Job execution: claiming, running and recovering jobs.
+
+Claiming is a conditional UPDATE (`status='QUEUED'` → `'RUNNING'`), so several worker processes
+can poll the same table without running a job twice, including on SQLite.
+"""
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import TASKS
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next():
+    """
+    Return the oldest queued job after marking it as running, or None.
+    """
+    for job_id in Job.objects.filter(status='QUEUED').order_by('id').values_list('id', flat=True)[:10]:
+        claimed = Job.objects.filter(pk=job_id, status='QUEUED').update(
+            status='RUNNING', attempts=F('attempts') + 1, started_time=timezone.now(), updated_time=timezone.now(),
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """
+    Execute a claimed job and store its result, or its error (re-queued while attempts remain).
+    """
+    try:
+        result = TASKS[job.name](job, **job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        job.status = 'QUEUED' if job.attempts < job.max_attempts else 'FAILED'
+        job.finished_time = timezone.now() if job.status == 'FAILED' else None
+        job.save(update_fields=['error', 'status', 'finished_time', 'updated_time'])
+        logger.exception("Job %s failed (attempt %s/%s)", job.pk, job.attempts, job.max_attempts)
+        return job
+    job.result = result
+    job.status = 'SUCCEEDED'
+    job.finished_time = timezone.now()
+    job.save(update_fields=['result', 'status', 'finished_time', 'updated_time'])
+    return job
+
+
+def requeue_stale():
+    """
+    Put back in the queue the running jobs of workers that stopped reporting (crash, kill).
+    """
+    limit = timezone.now() - timedelta(seconds=settings.JOBS_STALE_AFTER)
+    return Job.objects.filter(status='RUNNING', updated_time__lt=limit).update(status='QUEUED')
+
+
+def work(once=False, sleep=None):
+    """
+    Worker loop: run jobs until the queue is empty (`once`) or forever, polling every `JOBS_POLL_INTERVAL`.
+    """
+    poll_interval = settings.JOBS_POLL_INTERVAL if sleep is None else sleep
+    requeue_stale()
+    processed = 0
+    while True:
+        close_old_connections()
+        job = claim_next()
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            requeue_stale()
+            continue
+        run_job(job)
+        processed += 1
@@ -0,0 +1,23 @@
+"""
+Admin app without startup discovery: the `admin.py` modules are imported with the admin routes
+(`softdesk/urls_admin.py`), on the first admin request.
+"""
+from django.contrib import admin
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+
+
+def check_registered_admins(app_configs, **kwargs):
+    """
+    The admin checks of `AdminConfig`, on the `ModelAdmin` classes of the apps: their modules are imported first,
+    so that `manage.py check` (and the test runner) validates them even though the workers load them lazily.
+    """
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_registered_admins, checks.Tags.admin)
@@ -0,0 +1,95 @@
+"""
+Precompiled OpenAPI schema.
+
+Introspecting every viewset and `swagger_auto_schema` block is slow, so the schema is generated once:
+- at build time with `python manage.py build_openapi_schema`, which writes `OPENAPI_SCHEMA_PATH`,
+- otherwise on the first request of the process, and kept in memory.
+The file is used whenever it exists (DEBUG included, the default of the repository): a stale file is rebuilt
+with the command, or ignored with `OPENAPI_SCHEMA_USE_FILE = False` so that the schema follows the code.
+
+The schema is served with an `ETag` (hash of its content) and `Cache-Control: max-age=OPENAPI_SCHEMA_MAX_AGE`;
+clients revalidating an unchanged schema get a `304 Not Modified`.
+"""
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+API_INFO = openapi.Info(
+    title="SoftDesk API",
+    default_version='v1',
+    description="API documentation for SoftDesk projects.",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="polonio.sally@gmail.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+
+class SchemaArtifact:
+    def __init__(self, content):
+        self.content = content
+        self.etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+_artifact = None
+_lock = threading.Lock()
+
+
+def generate():
+    """
+    Introspect the API and return the JSON schema as bytes.
+    """
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write(path=None):
+    path = Path(path or settings.OPENAPI_SCHEMA_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    artifact = SchemaArtifact(generate())
+    path.write_bytes(artifact.content)
+    return path, artifact
+
+
+def get_artifact():
+    global _artifact
+    if _artifact is None:
+        with _lock:
+            if _artifact is None:
+                path = Path(settings.OPENAPI_SCHEMA_PATH)
+                if settings.OPENAPI_SCHEMA_USE_FILE and path.exists():
+                    _artifact = SchemaArtifact(path.read_bytes())
+                else:
+                    _artifact = SchemaArtifact(generate())
+    return _artifact
+
+
+def schema_response(request):
+    """
+    Serve the precompiled schema, or `304 Not Modified` when the client already has it.
+    """
+    artifact = get_artifact()
+    response = get_conditional_response(request, etag=artifact.etag)
+    if response is None:
+        response = HttpResponse(artifact.content, content_type='application/json')
+    response['ETag'] = artifact.etag
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+def with_precompiled_schema(ui_view):
+    """
+    Serve `?format=openapi` (the URL fetched by Swagger UI and ReDoc) from the precompiled schema,
+    and the rest with the documentation page `ui_view`.
+    """
+    def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD') and request.GET.get('format') == 'openapi':
+            return schema_response(request)
+        return ui_view(request, *args, **kwargs)
+    return view
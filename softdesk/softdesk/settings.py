@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -30,10 +31,15 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 
+# Deployment mode, from the SOFTDESK_DEPLOYMENT_MODE environment variable:
+# - 'full': API, documentation and admin. The documentation and admin stacks are imported on first use.
+# - 'api': API only. The documentation and admin routes and apps are not loaded at all (faster worker startup).
+DEPLOYMENT_MODE = os.environ.get('SOFTDESK_DEPLOYMENT_MODE', 'full')
+
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'softdesk.apps.LazyAdminConfig',  # admin.py modules are discovered by softdesk/urls_admin.py and the checks
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -45,18 +51,29 @@ INSTALLED_APPS = [
     'corsheaders',
     'user',
     'application',
+    'jobs',
 ]
+if DEPLOYMENT_MODE == 'api':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS
+                      if app not in ('softdesk.apps.LazyAdminConfig', 'drf_yasg')]
 
+# Session, CSRF, authentication and messages are skipped for the JWT-only paths of LEAN_PATH_PREFIXES
+# (see common/middleware.py); the admin, api-auth and documentation pages get the full chain.
 MIDDLEWARE = [
+    'common.middleware.RequestLogMiddleware',
+    'common.profiling.ProfilingMiddleware',  # Removes itself unless PROFILING_ENABLED
+    'common.memory.MemoryTrackingMiddleware',  # Removes itself unless MEMORY_TRACKING_ENABLED
+    'common.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'common.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'common.middleware.CsrfViewMiddleware',
+    'common.middleware.AuthenticationMiddleware',
+    'common.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
 ]
+LEAN_PATH_PREFIXES = ('/api/',)
 
 ROOT_URLCONF = 'softdesk.urls'
 
@@ -133,10 +150,23 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'user.User'
 
+TEST_RUNNER = 'common.testing.TestRunner'  # python manage.py test
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',)
+    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_THROTTLE_CLASSES': ('common.throttling.BucketThrottle',),
+    # Budgets per user (per IP address when anonymous); see common/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'read': '600/min',
+        'write': '120/min',
+        'auth': '10/min',
+        'bulk': '30/min',
+    },
+    # Reverse proxies in front of the app: anonymous clients are keyed on the address they added to
+    # X-Forwarded-For. 0 (no proxy): on REMOTE_ADDR, so clients can't pick their bucket with a forged header
+    'NUM_PROXIES': int(os.environ.get('SOFTDESK_NUM_PROXIES', 0)),
 }
 
 
@@ -146,7 +176,7 @@ SIMPLE_JWT = {
 }
 
 SWAGGER_SETTINGS = {
-    'DEFAULT_INFO': 'softdesk.urls.schema_view',  # Le chemin vers votre schema_view
+    'DEFAULT_INFO': 'softdesk.schema.API_INFO',
     'USE_SESSION_AUTH': False,  # Désactiver l'authentification par session
     'SECURITY_DEFINITIONS': {
         'Bearer': {
@@ -161,3 +191,94 @@ SWAGGER_SETTINGS = {
 CORS_ALLOWED_ORIGINS = [
     "https://apiary.io",
 ]
+
+# Change feed (Server-Sent Events)
+CHANGE_FEED_BROKER = 'application.feed.InMemoryBroker'  # Must implement application.feed.Broker
+CHANGE_FEED_HEARTBEAT = 15  # Seconds between keep-alive comments on idle connections
+
+# Background jobs (manage.py run_worker)
+JOBS_POLL_INTERVAL = 1  # Seconds between two polls of an empty queue
+JOBS_STALE_AFTER = 300  # Seconds without progress before a running job is re-queued
+JOBS_BATCH_SIZE = 500  # Rows deleted per transaction by the cascading deletes
+
+# Archival of DONE issues (manage.py archive_issues)
+ARCHIVE_DONE_ISSUES_AFTER_DAYS = 180
+
+# Most comments embedded per issue by GET .../issues/?include=latest_comments:N
+LATEST_COMMENTS_MAX = 10
+
+# Per-user cache of GET /api/me/bootstrap/ (seconds)
+BOOTSTRAP_CACHE_TIMEOUT = 60
+
+# Response compression (common/compression.py); zstd and br need the zstandard and brotli packages
+COMPRESSION_ENCODINGS = ('zstd', 'br', 'gzip')  # Server preference, when the client accepts several equally
+COMPRESSION_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}  # See manage.py benchmark_compression
+COMPRESSION_MIN_SIZE = 1024  # Bytes; smaller responses are sent uncompressed
+COMPRESSION_CONTENT_TYPES = ('application/json', 'text/event-stream')
+
+# Idempotency-Key of the create actions (common/idempotency.py); use a cache shared by the workers in production
+IDEMPOTENCY_CACHE = 'default'
+IDEMPOTENCY_TTL = 24 * 60 * 60  # Seconds a response is replayed for its key
+IDEMPOTENCY_LOCK_TIMEOUT = 60  # Seconds a key stays claimed by a request that never completes
+
+# POST /api/batch/
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4  # Threads running the consecutive reads of a batch (1 to run them in sequence)
+
+# Precompiled OpenAPI schema (manage.py build_openapi_schema)
+OPENAPI_SCHEMA_PATH = BASE_DIR / 'openapi' / 'schema.json'
+# Serve the file of build_openapi_schema when it exists, whatever DEBUG; SOFTDESK_OPENAPI_SCHEMA_FILE=0 ignores it
+# and generates the schema in each process (it then follows the code without rebuilding)
+OPENAPI_SCHEMA_USE_FILE = os.environ.get('SOFTDESK_OPENAPI_SCHEMA_FILE', '1') == '1'
+OPENAPI_SCHEMA_MAX_AGE = 86400  # Seconds; clients then revalidate with the ETag
+
+# Admin lists: rows counted at most, beyond which unfiltered lists show the estimated table size
+ADMIN_COUNT_LIMIT = 10_000
+
+# Throttling (budgets in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'])
+THROTTLE_ENABLED = True
+THROTTLE_STORE = 'common.throttling.InMemoryBucketStore'  # CacheBucketStore to share the budgets between workers
+
+# Logging: JSON lines on stderr, written by a background thread (common/log.py)
+LOG_LEVEL = os.environ.get('SOFTDESK_LOG_LEVEL', 'INFO')
+SLOW_REQUEST_THRESHOLD = 0.5  # Seconds; slower requests are logged as warnings
+SLOW_QUERY_THRESHOLD = 0.1  # Seconds; slower statements are logged and explained (common/slowqueries.py), None: off
+SLOW_QUERY_MAX_SHAPES = 500  # Distinct statements kept for the /api/slow-queries/ report, per process
+
+# Sampling profiler of live requests (common/profiling.py), off unless SOFTDESK_PROFILING=1
+PROFILING_ENABLED = os.environ.get('SOFTDESK_PROFILING') == '1'
+PROFILING_HEADER = 'X-Profile'  # Profiles the request when sent by a staff user
+PROFILING_SAMPLE_RATE = float(os.environ.get('SOFTDESK_PROFILING_SAMPLE_RATE', '0'))  # Share of all requests profiled
+PROFILING_INTERVAL = 0.005  # Seconds between two samples of a profiled request
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 500  # Ring of profiles: the oldest are deleted
+
+# Per-request memory allocation tracking with tracemalloc (common/memory.py), off unless SOFTDESK_MEMORY_TRACKING=1
+MEMORY_TRACKING_ENABLED = os.environ.get('SOFTDESK_MEMORY_TRACKING') == '1'
+MEMORY_TRACKING_FRAMES = 25  # Frames kept per allocation, to reach the project's code from json/DRF internals
+MEMORY_TRACKING_TOP_SITES = 10  # Allocation sites reported per view action
+LOG_SAMPLING = {  # Share of the records below WARNING kept, per logger (decided per request)
+    'softdesk.requests': 0.01,
+    'softdesk.permissions': 0.01,
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'common.log.RequestIdFilter'},
+        'sampling': {'()': 'common.log.SamplingFilter', 'rates': LOG_SAMPLING},
+    },
+    'handlers': {
+        'background': {
+            '()': 'common.log.BackgroundHandler',
+            'stream': 'ext://sys.stderr',
+            'filters': ['sampling', 'request_id'],
+        },
+    },
+    'loggers': {
+        'softdesk': {'handlers': ['background'], 'level': LOG_LEVEL, 'propagate': False},
+        'django': {'handlers': ['background'], 'level': 'INFO', 'propagate': False},
+        'django.server': {'handlers': ['background'], 'level': 'INFO', 'propagate': False},
+    },
+    'root': {'handlers': ['background'], 'level': 'WARNING'},
+}
@@ -0,0 +1,33 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from . import schema
+
+
+class SchemaArtifactTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'schema.json'
+        self.path.write_bytes(b'{"built": true}')
+        patcher = mock.patch.object(schema, '_artifact', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_built_file_is_served_in_debug(self):
+        with override_settings(DEBUG=True, OPENAPI_SCHEMA_PATH=self.path), \
+                mock.patch.object(schema, 'generate') as generate:
+            response = self.client.get('/swagger/', {'format': 'openapi'})
+
+        generate.assert_not_called()
+        self.assertEqual(response.content, b'{"built": true}')
+        revalidated = self.client.get('/swagger/', {'format': 'openapi'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_file_can_be_ignored(self):
+        with override_settings(OPENAPI_SCHEMA_USE_FILE=False, OPENAPI_SCHEMA_PATH=self.path), \
+                mock.patch.object(schema, 'generate', return_value=b'{"generated": true}'):
+            self.assertEqual(schema.get_artifact().content, b'{"generated": true}')
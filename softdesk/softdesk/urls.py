@@ -14,20 +14,25 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, URLResolver
+from django.urls.resolvers import RegexPattern
 from rest_framework_nested.routers import DefaultRouter, NestedDefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from user.views import UserViewSet, ContributorViewSet
-from application.views import ProjectViewSet, IssueViewSet, CommentViewSet
+from user.views import UserViewSet, ContributorViewSet, MeViewSet
+from jobs.views import JobViewSet
+from application.views import ProjectViewSet, IssueViewSet, CommentViewSet, SyncViewSet
+from application.async_views import AsyncProjectView, AsyncIssueView, AsyncCommentView, ProjectFeedView
+from common.batch import BatchView
+from common.memory import MemoryReportView
+from common.slowqueries import SlowQueryReportView
 
 # Main router
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'projects', ProjectViewSet, basename='projects')
+router.register(r'jobs', JobViewSet, basename='job')
+router.register(r'me', MeViewSet, basename='me')
 
 # Nested router for issues within a project
 projects_router = NestedDefaultRouter(router, r'projects', lookup='project')
@@ -40,28 +45,47 @@ issues_router.register(r'comments', CommentViewSet, basename='issue-comments')
 # Nested router for contributors within a project
 projects_router.register(r'contributors', ContributorViewSet, basename='project-contributors')
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="SoftDesk API",
-        default_version='v1',
-        description="API documentation for SoftDesk projects.",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="polonio.sally@gmail.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+# Delta sync of a project
+projects_router.register(r'sync', SyncViewSet, basename='project-sync')
+
+
+def lazy_include(prefix_regex, urlconf):
+    """
+    Mount `urlconf` under the paths matching `prefix_regex` (zero-width, the sub-URLconf has the full paths),
+    importing it only when such a path is first resolved or when URLs are first reversed.
+    """
+    return URLResolver(RegexPattern(prefix_regex), urlconf)
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/', include(projects_router.urls)),
     path('api/', include(issues_router.urls)),
+    # ASGI-native read endpoints (list/retrieve only)
+    path('api/async/projects/', AsyncProjectView.as_view(), name='async-projects'),
+    path('api/async/projects/<int:pk>/', AsyncProjectView.as_view(), name='async-project-detail'),
+    path('api/async/projects/<int:project_pk>/issues/', AsyncIssueView.as_view(), name='async-issues'),
+    path('api/async/projects/<int:project_pk>/issues/<int:pk>/', AsyncIssueView.as_view(),
+         name='async-issue-detail'),
+    path('api/async/projects/<int:project_pk>/issues/<int:issue_pk>/comments/', AsyncCommentView.as_view(),
+         name='async-comments'),
+    path('api/async/projects/<int:project_pk>/issues/<int:issue_pk>/comments/<uuid:pk>/',
+         AsyncCommentView.as_view(), name='async-comment-detail'),
+    path('api/async/projects/<int:project_pk>/feed/', ProjectFeedView.as_view(), name='project-feed'),
+    # Several API calls in one round trip
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    # Slow statements recorded by this process (staff)
+    path('api/slow-queries/', SlowQueryReportView.as_view(), name='slow-queries'),
+    # Memory allocated per view action, measured by this process (staff)
+    path('api/memory/', MemoryReportView.as_view(), name='memory-report'),
     path('api-auth/', include('rest_framework.urls')),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-
 ]
+
+# Documentation and admin: imported on first use in the `full` deployment mode, not mounted in `api` mode
+if settings.DEPLOYMENT_MODE == 'full':
+    urlpatterns += [
+        lazy_include(r'^(?=(?:swagger|redoc)\b)', 'softdesk.urls_docs'),
+        lazy_include(r'^(?=admin/)', 'softdesk.urls_admin'),
+    ]
@@ -0,0 +1,12 @@
+"""
+Admin routes, mounted lazily by `softdesk/urls.py`.
+The `admin.py` modules of the apps are discovered here rather than at startup (`LazyAdminConfig`).
+"""
+from django.contrib import admin
+from django.urls import path
+
+admin.autodiscover()
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+]
@@ -0,0 +1,22 @@
+"""
+Documentation routes (Swagger UI, ReDoc and the OpenAPI schema), mounted lazily by `softdesk/urls.py`.
+"""
+from django.urls import path
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from .schema import API_INFO, schema_response, with_precompiled_schema
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+urlpatterns = [
+    # The documentation pages load the precompiled schema (`?format=openapi` or `swagger.json`)
+    path('swagger.json', schema_response, name='schema-json'),
+    path('swagger/', with_precompiled_schema(schema_view.with_ui('swagger', cache_timeout=0)),
+         name='schema-swagger-ui'),
+    path('redoc/', with_precompiled_schema(schema_view.with_ui('redoc', cache_timeout=0)), name='schema-redoc'),
+]
@@ -2,11 +2,14 @@ from django.contrib import admin
 from django.contrib.auth.models import Group
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
+
+from application.cascade import delete_users
+from common.admin import BoundedCountPaginator, TombstoneDeleteMixin
 from .models import User
 
 
 @admin.register(User)
-class CustomUserAdmin(BaseUserAdmin):
+class CustomUserAdmin(TombstoneDeleteMixin, BaseUserAdmin):
     """
     Custom admin interface for the User model.
     - Displays additional fields like 'age', 'can_be_contacted', and 'can_data_be_shared'.
@@ -15,6 +18,9 @@ class CustomUserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'age', 'is_staff', 'is_superuser', 'is_active', 'last_login', 'date_joined')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'can_be_contacted', 'can_data_be_shared', 'groups')
     search_fields = ('username', 'email', 'first_name', 'last_name')
+    paginator = BoundedCountPaginator
+    show_full_result_count = False
+    delete_rows = staticmethod(delete_users)
 
     # Fields displayed when editing/creating a user
     fieldsets = (
@@ -0,0 +1,78 @@
+"""
+Data of `GET /api/me/bootstrap/`: the profile of the user, their projects with their role and summary counts.
+
+The projects and all their counts are read in a single query (correlated count subqueries, no join
+fan-out), so the cost does not depend on the number of projects. The payload is cached per user for
+`BOOTSTRAP_CACHE_TIMEOUT` seconds and dropped when the user, one of their memberships or one of their projects
+changes (deletions included, see `application.cascade`); issue counts may therefore lag by up to the timeout.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from application.models import Project, Issue
+from .models import Contributor
+from .serializers import UserDetailSerializer, BootstrapProjectSerializer
+
+
+def cache_key(user_id):
+    return f'bootstrap:{user_id}'
+
+
+def invalidate(*user_ids):
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_members(project_id):
+    invalidate(*Contributor.objects.filter(project_id=project_id).values_list('user_id', flat=True))
+
+
+def _count(queryset):
+    counted = queryset.order_by().values('project').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def projects_of(user):
+    """
+    Projects the user contributes to, annotated with `role` and the counts.
+    """
+    issues = Issue.objects.filter(project=OuterRef('pk'))
+    return (
+        Project.objects.filter(contributors__user=user)
+        .annotate(
+            role=F('contributors__role'),
+            contributors_count=_count(Contributor.objects.filter(project=OuterRef('pk'))),
+            issues_count=_count(issues),
+            open_issues_count=_count(issues.filter(~Q(status='DONE'))),
+            assigned_issues_count=_count(issues.filter(assignee__user=user)),
+        )
+        .order_by('id')
+    )
+
+
+def build(user):
+    projects = BootstrapProjectSerializer(projects_of(user), many=True).data
+    return {
+        'user': UserDetailSerializer(user).data,
+        'projects': projects,
+        'summary': {
+            'projects': len(projects),
+            'managed_projects': sum(project['role'] == 'MANAGER' for project in projects),
+            'issues': sum(project['issues_count'] for project in projects),
+            'open_issues': sum(project['open_issues_count'] for project in projects),
+            'assigned_issues': sum(project['assigned_issues_count'] for project in projects),
+        },
+    }
+
+
+def get_bootstrap(user):
+    """
+    Return the cached payload of the user, building it on a miss.
+    """
+    key = cache_key(user.pk)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build(user)
+        cache.set(key, payload, settings.BOOTSTRAP_CACHE_TIMEOUT)
+    return payload
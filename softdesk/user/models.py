@@ -31,6 +31,7 @@ class Contributor(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='contributions')
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='contributors')
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='CONTRIBUTOR')
+    updated_time = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'project')
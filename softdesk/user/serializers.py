@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import User, Contributor
+from .models import User, Contributor, Project
+from application.models import Issue
 from rest_framework.exceptions import ValidationError
 
 
@@ -59,5 +60,29 @@ class ContributorSerializer(serializers.ModelSerializer):
     project_name = serializers.CharField(source='project.name', read_only=True)
     class Meta:
         model = Contributor
-        fields = ['id', 'user', 'user_username', 'role', 'project', 'project_name']
+        fields = ['id', 'user', 'user_username', 'role', 'project', 'project_name', 'updated_time']
         read_only_fields = ['id', 'project']
+
+
+class BootstrapProjectSerializer(serializers.ModelSerializer):
+    role = serializers.CharField(read_only=True)
+    contributors_count = serializers.IntegerField(read_only=True)
+    issues_count = serializers.IntegerField(read_only=True)
+    open_issues_count = serializers.IntegerField(read_only=True)
+    assigned_issues_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Project
+        fields = ['id', 'name', 'type', 'role', 'contributors_count', 'issues_count', 'open_issues_count',
+                  'assigned_issues_count', 'created_time']
+
+
+class AssignedIssueSerializer(serializers.ModelSerializer):
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    author_username = serializers.CharField(source='author.username', read_only=True)
+
+    class Meta:
+        model = Issue
+        fields = ['id', 'name', 'priority', 'tag', 'status', 'project', 'project_name', 'author_username',
+                  'created_time', 'updated_time']
+        read_only_fields = fields
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from application.models import Project
+from .bootstrap import invalidate, invalidate_members
+from .models import User, Contributor
+
+# Deleted memberships are invalidated by `application.cascade`: a `post_delete` receiver would disable the
+# fast deletes of the contributors, and the chunked deletion of the jobs sends no signals.
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Contributor)
+def membership_changed(sender, instance, **kwargs):
+    invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    if not created:  # The members of a new project are added afterwards, each invalidating their own payload
+        invalidate_members(instance.pk)
@@ -0,0 +1,9 @@
+from application import cascade
+from application.tasks import job_progress
+from jobs.registry import task
+
+
+@task('delete_user')
+def delete_user(job, user_id):
+    cascade.delete_user(user_id, progress=job_progress(job))
+    return job.progress
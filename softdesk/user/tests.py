@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from application.models import Issue, Project
+from jobs.worker import work
+from .models import User, Contributor
+
+
+class BootstrapCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('manager')
+        cls.contributor = User.objects.create_user('contributor')
+        cls.project = Project.objects.create(name='Project', type='BACKEND', author=cls.manager)
+        Contributor.objects.create(project=cls.project, user=cls.manager, role='MANAGER')
+        Contributor.objects.create(project=cls.project, user=cls.contributor)
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def project_names(self, user):
+        response = self.client_for(user).get('/api/me/bootstrap/')
+        self.assertEqual(response.status_code, 200)
+        return [project['name'] for project in response.json()['projects']]
+
+    def test_renamed_project_is_refreshed_for_every_member(self):
+        self.assertEqual(self.project_names(self.contributor), ['Project'])
+
+        self.client_for(self.manager).patch(f'/api/projects/{self.project.pk}/', {'name': 'Renamed'})
+
+        self.assertEqual(self.project_names(self.contributor), ['Renamed'])
+
+    def test_removed_contributor_loses_the_project(self):
+        self.assertEqual(self.project_names(self.contributor), ['Project'])
+        row = Contributor.objects.get(project=self.project, user=self.contributor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_for(self.manager).delete(f'/api/projects/{self.project.pk}/contributors/{row.pk}/')
+
+        self.assertEqual(self.project_names(self.contributor), [])
+
+    def test_project_deleted_by_a_job_is_dropped_for_every_member(self):
+        self.assertEqual(self.project_names(self.contributor), ['Project'])
+        self.client_for(self.manager).delete(f'/api/projects/{self.project.pk}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            work(once=True)
+
+        self.assertEqual(self.project_names(self.contributor), [])
+
+
+class AssignedIssuesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('user')
+        cls.other = User.objects.create_user('other')
+        cls.project = Project.objects.create(name='Project', type='BACKEND', author=cls.user)
+        cls.second = Project.objects.create(name='Second', type='FRONTEND', author=cls.other)
+        user_row = Contributor.objects.create(project=cls.project, user=cls.user, role='MANAGER')
+        other_row = Contributor.objects.create(project=cls.project, user=cls.other)
+        second_row = Contributor.objects.create(project=cls.second, user=cls.user)
+        Contributor.objects.create(project=cls.second, user=cls.other, role='MANAGER')
+
+        def create_issue(name, assignee, project=cls.project, **fields):
+            return Issue.objects.create(name=name, priority=fields.pop('priority', 'LOW'), tag='BUG',
+                                        author=cls.other, project=project, assignee=assignee, **fields)
+
+        create_issue('Todo', user_row)
+        create_issue('Urgent', user_row, priority='HIGH', status='IN_PROGRESS')
+        create_issue('Done', second_row, project=cls.second, status='DONE')
+        create_issue('Not mine', other_row)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, **params):
+        response = self.client.get('/api/me/issues/', params)
+        self.assertEqual(response.status_code, 200)
+        return [issue['name'] for issue in response.json()['results']]
+
+    def test_issues_assigned_in_every_project_newest_first(self):
+        self.assertEqual(self.names(), ['Done', 'Urgent', 'Todo'])
+
+    def test_status_and_priority_filters(self):
+        self.assertEqual(self.names(status='TO_DO,IN_PROGRESS'), ['Urgent', 'Todo'])
+        self.assertEqual(self.names(priority='HIGH'), ['Urgent'])
+        self.assertEqual(self.names(status='TO_DO', priority='HIGH'), [])
+
+    def test_invalid_filter_values_are_rejected(self):
+        response = self.client.get('/api/me/issues/', {'status': 'TO_DO,CLOSED'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('CLOSED', response.json()['status'])
+        self.assertEqual(self.client.get('/api/me/issues/', {'priority': 'URGENT'}).status_code, 400)
+
+    def test_cursor_pagination(self):
+        response = self.client.get('/api/me/issues/', {'page_size': 2})
+        page = response.json()
+        self.assertEqual([issue['name'] for issue in page['results']], ['Done', 'Urgent'])
+        self.assertIsNone(page['previous'])
+
+        page = self.client.get(page['next']).json()
+        self.assertEqual([issue['name'] for issue in page['results']], ['Todo'])
+        self.assertIsNone(page['next'])
+
+    def test_page_is_served_in_one_query(self):
+        # The user is already authenticated here; with a token, authentication adds its own user lookup
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/me/issues/', {'status': 'TO_DO,DONE'})
+        self.assertEqual(response.json()['results'][0]['project_name'], 'Second')
+
+    def test_authentication_is_required(self):
+        self.assertEqual(APIClient().get('/api/me/issues/').status_code, 401)
@@ -1,13 +1,23 @@
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from rest_framework.viewsets import ModelViewSet
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework.decorators import action
+from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework.exceptions import ValidationError
 from .models import User, Contributor, Project
-from .serializers import UserListSerializer, UserDetailSerializer, ContributorSerializer
+from .serializers import UserListSerializer, UserDetailSerializer, ContributorSerializer, AssignedIssueSerializer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from common.permissions import IsAccountOwnerOrAdmin, IsProjectManagerOrAdmin, IsProjectContributorOrAdmin
+from common.idempotency import idempotent, IDEMPOTENCY_KEY_PARAMETER, IDEMPOTENCY_RESPONSES
+from jobs.registry import enqueue
+from jobs.views import accepted_response
+from .bootstrap import get_bootstrap
+from application.models import Issue
+from application.cascade import delete_contributors
+from common.pagination import AssignedIssuePagination
 
 
 class UserViewSet(ModelViewSet):
@@ -86,11 +96,14 @@ class UserViewSet(ModelViewSet):
                 "**Security:**\n"
                 "- No authentication required."
         ),
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={
             201: openapi.Response(description="User created successfully."),
             400: openapi.Response(description="Invalid input data."),
+            **IDEMPOTENCY_RESPONSES,
         }
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         if isinstance(request.data, list):
             serializer = self.get_serializer(data=request.data, many=True)
@@ -158,7 +171,9 @@ class UserViewSet(ModelViewSet):
         operation_summary="Delete a user",
         tags=["Users"],
         operation_description=(
-                "Delete an existing user account.\n\n"
+                "Delete an existing user account.\n"
+                "The account and everything the user authored are deleted by a background job: "
+                "follow its status with the URL given in the `Location` header.\n\n"
                 "**Permissions required:**\n"
                 "- `IsAccountOwnerOrAdmin`\n\n"
                 "**Security:**\n"
@@ -166,13 +181,15 @@ class UserViewSet(ModelViewSet):
         ),
         security=[{"Bearer": []}],
         responses={
-            204: openapi.Response(description="User deleted successfully."),
+            202: openapi.Response(description="Accepted. The deletion job was queued (the job status is returned)."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
             403: openapi.Response(description="Forbidden. You do not have permission to perform this action."),
         }
     )
     def destroy(self, request, *args, **kwargs):
-        return super().destroy(request, *args, **kwargs)
+        user = self.get_object()
+        job = enqueue('delete_user', {'user_id': user.pk}, user=request.user)
+        return accepted_response(request, job)
 
 
 class ContributorViewSet(ModelViewSet):
@@ -199,10 +216,12 @@ class ContributorViewSet(ModelViewSet):
             return Contributor.objects.none()
 
         # Normal runtime behavior
+        # `user_username` and `project_name` of the serializer are read from the joined rows
+        queryset = Contributor.objects.select_related('user', 'project').order_by('id')
         project_id = self.kwargs.get('project_pk')
         if project_id:
-            return Contributor.objects.filter(project_id=project_id).order_by('id')
-        return Contributor.objects.all().order_by('id')
+            return queryset.filter(project_id=project_id)
+        return queryset
 
     @swagger_auto_schema(
         operation_summary="List contributors",
@@ -259,13 +278,16 @@ class ContributorViewSet(ModelViewSet):
                 "- Bearer Token authentication is required."
         ),
         security=[{"Bearer": []}],
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={
             201: openapi.Response(description="Contributor added successfully."),
             400: openapi.Response(description="Invalid input data."),
             401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
             403: openapi.Response(description="Forbidden. You do not have permission to perform this action."),
+            **IDEMPOTENCY_RESPONSES,
         }
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         self.check_permissions(request)
         project_id = self.kwargs.get('project_pk')
@@ -307,5 +329,93 @@ class ContributorViewSet(ModelViewSet):
             contributor = Contributor.objects.get(id=contributor_id, project__id=project_id)
         except Contributor.DoesNotExist:
             return Response({"detail": "Contributor not found for this project."}, status=status.HTTP_404_NOT_FOUND)
-        contributor.delete()
+        delete_contributors([contributor])
         return Response({"detail": "Contributor successfully deleted."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class MeViewSet(GenericViewSet):
+    """
+    Endpoints about the authenticated user.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Bootstrap data of the authenticated user",
+        tags=["Users"],
+        operation_description=(
+                "Return, in one call, the profile of the authenticated user, every project they contribute to "
+                "with their role and counts (contributors, issues, open issues, issues assigned to them), "
+                "and the totals.\n"
+                "- Computed in a constant number of queries, whatever the number of projects.\n"
+                "- Cached per user for `BOOTSTRAP_CACHE_TIMEOUT` seconds; membership changes are visible at once, "
+                "issue counts may lag by up to the timeout.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAuthenticated`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        responses={
+            200: openapi.Response(description="Profile, projects with roles and counts."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def bootstrap(self, request):
+        response = Response(get_bootstrap(request.user))
+        patch_cache_control(response, private=True, max_age=settings.BOOTSTRAP_CACHE_TIMEOUT)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    @staticmethod
+    def _choices_filter(request, name, choices):
+        """
+        Values of the `name` query parameter (comma-separated), checked against `choices`.
+        """
+        values = [value for value in request.query_params.get(name, '').split(',') if value]
+        allowed = [choice for choice, _ in choices]
+        invalid = [value for value in values if value not in allowed]
+        if invalid:
+            raise ValidationError({name: f"Invalid value(s): {', '.join(invalid)}. Allowed: {', '.join(allowed)}."})
+        return values
+
+    @swagger_auto_schema(
+        operation_summary="Issues assigned to the authenticated user",
+        tags=["Users"],
+        operation_description=(
+                "List the issues assigned to the authenticated user in all their projects, newest first.\n"
+                "- Filter with `?status=` and `?priority=` (comma-separated values, e.g. `status=TO_DO,IN_PROGRESS`).\n"
+                "- Cursor-paginated: follow the `next` link; `?page_size=` up to 100 (default 50).\n"
+                "- Served in one query by the `(assignee, status, created_time)` index of the issues. "
+                "Archived issues are not listed.\n\n"
+                "**Permissions required:**\n"
+                "- `IsAuthenticated`\n\n"
+                "**Security:**\n"
+                "- Bearer Token authentication is required."
+        ),
+        security=[{"Bearer": []}],
+        manual_parameters=[
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="TO_DO, IN_PROGRESS and/or DONE, comma-separated."),
+            openapi.Parameter('priority', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="LOW, MEDIUM and/or HIGH, comma-separated."),
+        ],
+        responses={
+            200: openapi.Response(description="A page of the issues assigned to the user."),
+            400: openapi.Response(description="Bad Request. Invalid status or priority."),
+            401: openapi.Response(description="Unauthorized. Authentication credentials were not provided."),
+        }
+    )
+    @action(detail=False, methods=['get'], serializer_class=AssignedIssueSerializer,
+            pagination_class=AssignedIssuePagination)
+    def issues(self, request):
+        statuses = self._choices_filter(request, 'status', Issue.ISSUE_STATUS_CHOICES)
+        priorities = self._choices_filter(request, 'priority', Issue.ISSUE_PRIORITY_CHOICES)
+        # `assignee` is a Contributor row: the user's rows of all projects, joined in the same query
+        queryset = Issue.objects.filter(assignee__user=request.user).select_related('project', 'author')
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        if priorities:
+            queryset = queryset.filter(priority__in=priorities)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)